@@ -1,11 +1,22 @@
 """Adaptive package - Context management and decision-making"""
 
 from kerangka_ml.adaptive.context_manager import ContextManager, RaceContext
-from kerangka_ml.adaptive.priority_cascade import apply_priority_cascade, get_aggressiveness_level
+from kerangka_ml.adaptive.priority_cascade import (
+    CASCADE_CONTEXT_KEYS,
+    apply_priority_cascade,
+    apply_priority_cascade_batch,
+    clear_energy_cache,
+    get_aggressiveness_level,
+    release_cascade_result
+)
 
 __all__ = [
     "ContextManager",
     "RaceContext",
+    "CASCADE_CONTEXT_KEYS",
     "apply_priority_cascade",
-    "get_aggressiveness_level"
+    "apply_priority_cascade_batch",
+    "clear_energy_cache",
+    "get_aggressiveness_level",
+    "release_cascade_result"
 ]
@@ -3,10 +3,17 @@ Context Manager - Manages race context and state
 Tracks: race phase, SOC, position, weather, track conditions, etc.
 """
 
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Mapping, Tuple
+from types import MappingProxyType
+from dataclasses import dataclass, fields
 from enum import Enum
+from collections import deque
+from functools import lru_cache
 import time
+import numpy as np
+
+from kerangka_ml.adaptive.priority_cascade import get_aggressiveness_level
+from kerangka_ml.utils.jit import njit
 
 
 class RacePhase(Enum):
@@ -28,17 +35,17 @@ class TrackCondition(Enum):
     UNKNOWN = "UNKNOWN"
 
 
-@dataclass
+@dataclass(slots=True)
 class RaceContext:
     """
     Race context data class
     """
-    race_phase: str = "UNKNOWN"
+    race_phase: RacePhase = RacePhase.UNKNOWN
     current_lap: int = 0
     laps_remaining: int = 0
     current_soc: float = 100.0
     soc_target: float = 5.0
-    track_condition: str = "UNKNOWN"
+    track_condition: TrackCondition = TrackCondition.UNKNOWN
     weather_factor: float = 1.0
     current_rank: int = 0
     ranking_confidence: float = 0.0
@@ -46,11 +53,47 @@ class RaceContext:
     driver_status: str = "NORMAL"
     pit_stop_planned: bool = False
     pit_stop_eta: int = 0
-    timestamp: float = 0.0
+    timestamp: float = 0.0  # time.time() of the last update
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return asdict(self)
+        """Convert to dictionary (enum fields emitted as their string values)"""
+        data = {name: getattr(self, name) for name in _FIELD_NAMES}
+        data["race_phase"] = self.race_phase.value
+        data["track_condition"] = self.track_condition.value
+        return data
+
+
+# Field names resolved once so per-tick updates avoid dataclass introspection
+_FIELD_NAMES = tuple(f.name for f in fields(RaceContext))
+
+# Enum-typed fields; plain strings passed to update_context are mapped onto members
+_ENUM_FIELDS = {
+    "race_phase": RacePhase,
+    "track_condition": TrackCondition
+}
+
+
+def _coerce_enum(enum_type: type, value: Any) -> Enum:
+    """Map a string (e.g. from an API payload) onto an enum member, UNKNOWN if unmatched"""
+    if isinstance(value, enum_type):
+        return value
+    return enum_type.__members__.get(str(value).upper(), enum_type.UNKNOWN)
+
+
+@lru_cache(maxsize=64)
+def _classify_phase(current_lap: int, total_laps: int) -> RacePhase:
+    """Pure (lap, total_laps) -> phase mapping, cached for the handful of real pairs"""
+    if current_lap == 0:
+        return RacePhase.PRACTICE
+    elif current_lap <= 2:
+        return RacePhase.EARLY
+    elif current_lap == 3:
+        return RacePhase.MID
+    elif current_lap == total_laps:
+        return RacePhase.LATE
+    elif current_lap > total_laps:
+        return RacePhase.FINISH
+    return RacePhase.UNKNOWN
 
 
 class ContextManager:
@@ -58,11 +101,16 @@ class ContextManager:
     Manages race context and state throughout race
     """
     
-    def __init__(self):
-        """Initialize context manager"""
+    def __init__(self, max_history: int = 1024):
+        """
+        Initialize context manager
+        
+        Args:
+            max_history: Maximum number of state changes kept (oldest are dropped)
+        """
         self.context = RaceContext()
-        self.history = []
-        self.state_changes = []
+        self.history = deque(maxlen=max_history)
+        self.state_changes = deque(maxlen=max_history)
         print("[+] Context Manager initialized")
     
     def update_context(self, **kwargs) -> None:
@@ -72,33 +120,50 @@ class ContextManager:
         Args:
             **kwargs: Context parameters to update
         """
-        old_context = asdict(self.context).copy()
+        context = self.context
+        ts = time.time()
+        
+        for key, enum_type in _ENUM_FIELDS.items():
+            if key in kwargs:
+                kwargs[key] = _coerce_enum(enum_type, kwargs[key])
+        
+        # Only fields whose value actually differs can produce a state change
+        changed = {
+            key: value for key, value in kwargs.items()
+            if key in _FIELD_NAMES and getattr(context, key) != value
+        }
+        
+        if not changed:
+            context.timestamp = ts
+            return
         
-        for key, value in kwargs.items():
-            if hasattr(self.context, key):
-                setattr(self.context, key, value)
+        old_state = {key: getattr(context, key) for key in changed}
+        for key, value in changed.items():
+            setattr(context, key, value)
         
         # Track changes
-        self.context.timestamp = time.time()
-        self._record_state_change(old_context, asdict(self.context))
+        context.timestamp = ts
+        self._record_state_change(old_state, changed, ts)
     
     def _record_state_change(
         self,
         old_state: Dict[str, Any],
-        new_state: Dict[str, Any]
+        new_state: Dict[str, Any],
+        ts: float
     ) -> None:
-        """Record significant state changes"""
+        """Record significant state changes (only keys present in new_state)"""
         changes = {}
-        for key in old_state:
-            if old_state[key] != new_state[key]:
+        for key, new_value in new_state.items():
+            old_value = old_state[key]
+            if old_value != new_value:
                 changes[key] = {
-                    "old": old_state[key],
-                    "new": new_state[key]
+                    "old": old_value,
+                    "new": new_value
                 }
         
         if changes:
             self.state_changes.append({
-                "timestamp": time.time(),
+                "timestamp": ts,
                 "changes": changes
             })
     
@@ -118,21 +183,11 @@ class ContextManager:
             Race phase string
         """
         
-        if current_lap == 0:
-            phase = "PRACTICE"
-        elif current_lap <= 2:
-            phase = "EARLY"
-        elif current_lap == 3:
-            phase = "MID"
-        elif current_lap == total_laps:
-            phase = "LATE"
-        elif current_lap > total_laps:
-            phase = "FINISH"
-        else:
-            phase = "UNKNOWN"
+        phase = _classify_phase(current_lap, total_laps)
         
-        self.update_context(race_phase=phase)
-        return phase
+        if phase is not self.context.race_phase:
+            self.update_context(race_phase=phase)
+        return phase.value
     
     def assess_track_condition(
         self,
@@ -153,23 +208,23 @@ class ContextManager:
         """
         
         if rain_intensity > 0.5:
-            condition = "RAIN"
+            condition = TrackCondition.RAIN
             weather_factor = 0.85
         elif rain_intensity > 0.2:
-            condition = "WET"
+            condition = TrackCondition.WET
             weather_factor = 0.90
         elif wind_speed > 8:
-            condition = "STRONG_WIND"
+            condition = TrackCondition.STRONG_WIND
             weather_factor = 0.92
         else:
-            condition = "DRY"
+            condition = TrackCondition.DRY
             weather_factor = 1.0
         
         self.update_context(
             track_condition=condition,
             weather_factor=weather_factor
         )
-        return condition
+        return condition.value
     
     def update_soc_and_eta(
         self,
@@ -219,14 +274,16 @@ class ContextManager:
         
         Args:
             our_efficiency: Our estimated efficiency
-            competitor_efficiencies: List of competitor efficiencies
+            competitor_efficiencies: List or ndarray of competitor efficiencies
+                                     (a float64 ndarray is used without conversion)
             confidence: Confidence in prediction (0-1)
         
         Returns:
             Rank prediction dictionary
         """
         
-        better_count = sum(1 for eff in competitor_efficiencies if eff < our_efficiency)
+        competitors = np.asarray(competitor_efficiencies, dtype=np.float64)
+        better_count = int(np.count_nonzero(competitors < our_efficiency))
         predicted_rank = better_count + 1
         
         self.update_context(
@@ -248,44 +305,25 @@ class ContextManager:
             Parameters for adaptive behavior
         """
         
-        context = asdict(self.context)
+        context = self.context
         
         # Map context to aggressive levels
-        phase = context["race_phase"]
-        soc = context["current_soc"]
-        
-        # Determine aggressiveness matrix entry
-        if phase in ["PRACTICE", "EARLY"]:
-            aggressiveness = "MODERATE"
-            safety_margin = 1.5
-        elif phase == "MID":
-            if soc > 25:
-                aggressiveness = "MODERATE"
-                safety_margin = 1.5
-            elif soc > 15:
-                aggressiveness = "BALANCED"
-                safety_margin = 1.3
-            else:
-                aggressiveness = "CONSERVATIVE"
-                safety_margin = 1.8
-        else:  # LATE
-            if soc > 15:
-                aggressiveness = "MODERATE"
-                safety_margin = 1.3
-            elif soc > 8:
-                aggressiveness = "CONSERVATIVE"
-                safety_margin = 2.0
-            else:
-                aggressiveness = "SURVIVAL"
-                safety_margin = 3.0
+        phase = context.race_phase
+        soc = context.current_soc
+        
+        # Determine aggressiveness matrix entry (any later phase is treated as LATE)
+        if phase in (RacePhase.PRACTICE, RacePhase.EARLY, RacePhase.MID):
+            entry = get_aggressiveness_level({"race_phase": phase.value, "current_soc": soc})
+        else:
+            entry = get_aggressiveness_level({"race_phase": "LATE", "current_soc": soc})
         
         return {
-            "aggressiveness": aggressiveness,
-            "safety_margin": safety_margin,
-            "phase": phase,
+            "aggressiveness": entry["aggressiveness"],
+            "safety_margin": entry["safety_margin"],
+            "phase": phase.value,
             "soc": soc,
-            "track_condition": context["track_condition"],
-            "weather_factor": context["weather_factor"]
+            "track_condition": context.track_condition.value,
+            "weather_factor": context.weather_factor
         }
     
     def get_current_context(self) -> Dict[str, Any]:
@@ -293,8 +331,8 @@ class ContextManager:
         return self.context.to_dict()
     
     def get_context_history(self) -> list:
-        """Get historical context changes"""
-        return self.state_changes
+        """Get historical context changes (most recent max_history entries)"""
+        return list(self.state_changes)
     
     def plan_pit_stop(
         self,
@@ -344,41 +382,108 @@ class ContextManager:
         }
 
 
-def _get_pit_actions(reason: str) -> list:
+def estimate_final_rank_batch(
+    our_efficiencies: np.ndarray,
+    competitor_matrix: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized rank estimate for many scenarios at once (e.g. Monte-Carlo projections)
+    
+    Args:
+        our_efficiencies: Our efficiency per scenario, shape (n_scenarios,)
+        competitor_matrix: Competitor efficiencies, shape (n_scenarios, n_competitors)
+    
+    Returns:
+        Predicted rank per scenario, shape (n_scenarios,)
+    """
+    our = np.asarray(our_efficiencies, dtype=np.float64)
+    competitors = np.asarray(competitor_matrix, dtype=np.float64)
+    
+    return np.count_nonzero(competitors < our[:, None], axis=1) + 1
+
+
+# Recommended pit actions per reason (immutable, shared across all plans)
+_PIT_ACTIONS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "TIRE_PRESSURE": (
+        "Check tire pressure on all wheels",
+        "Adjust pressure to optimal ±0.1 bar",
+        "Test handling after adjustment"
+    ),
+    "ENERGY_STRATEGY": (
+        "Analyze efficiency trends",
+        "Adjust driver throttle strategy",
+        "Brief driver on track sections"
+    ),
+    "MECHANICAL": (
+        "Inspect motor connections",
+        "Check battery parameters",
+        "Verify all sensors",
+        "Tighten any loose components"
+    ),
+    "DRIVER_REST": (
+        "Driver takes 5-minute rest",
+        "Rehydration and cooling",
+        "Fatigue assessment",
+        "Driver change if needed"
+    ),
+    "EVALUATION": (
+        "Full system diagnostic",
+        "Review telemetry data",
+        "Plan strategy adjustment",
+        "Check weather forecast"
+    )
+})
+
+_DEFAULT_PIT_ACTIONS = ("General pit stop",)
+
+
+def _get_pit_actions(reason: str) -> Tuple[str, ...]:
     """Get recommended pit actions based on reason"""
+    return _PIT_ACTIONS.get(reason, _DEFAULT_PIT_ACTIONS)
+
+
+# Integer phase codes used by the compiled simulation core (index into _PHASE_NAMES)
+_PHASE_NAMES = ("PRACTICE", "EARLY", "MID", "LATE", "FINISH", "UNKNOWN")
+
+
+@njit(cache=True)
+def _simulate_core(
+    start_lap: int,
+    end_lap: int,
+    initial_soc: float,
+    target_soc: float
+):
+    """
+    Numeric core of simulate_race_progression (Numba-compiled when available)
     
-    pit_actions = {
-        "TIRE_PRESSURE": [
-            "Check tire pressure on all wheels",
-            "Adjust pressure to optimal ±0.1 bar",
-            "Test handling after adjustment"
-        ],
-        "ENERGY_STRATEGY": [
-            "Analyze efficiency trends",
-            "Adjust driver throttle strategy",
-            "Brief driver on track sections"
-        ],
-        "MECHANICAL": [
-            "Inspect motor connections",
-            "Check battery parameters",
-            "Verify all sensors",
-            "Tighten any loose components"
-        ],
-        "DRIVER_REST": [
-            "Driver takes 5-minute rest",
-            "Rehydration and cooling",
-            "Fatigue assessment",
-            "Driver change if needed"
-        ],
-        "EVALUATION": [
-            "Full system diagnostic",
-            "Review telemetry data",
-            "Plan strategy adjustment",
-            "Check weather forecast"
-        ]
-    }
+    Returns:
+        Tuple of (soc per lap as float64 array, phase code per lap as int8 array)
+    """
+    n_laps = end_lap - start_lap + 1
+    soc_per_lap = (initial_soc - target_soc) / n_laps
+    
+    socs = np.empty(n_laps, dtype=np.float64)
+    phases = np.empty(n_laps, dtype=np.int8)
     
-    return pit_actions.get(reason, ["General pit stop"])
+    for i in range(n_laps):
+        lap = start_lap + i
+        socs[i] = initial_soc - i * soc_per_lap
+        
+        # Same classification as ContextManager.determine_race_phase
+        if lap == 0:
+            phases[i] = 0
+        elif lap <= 2:
+            phases[i] = 1
+        elif lap == 3:
+            phases[i] = 2
+        elif lap == end_lap:
+            phases[i] = 3
+        elif lap > end_lap:
+            phases[i] = 4
+        else:
+            phases[i] = 5
+    
+    return socs, phases
 
 
 def simulate_race_progression(
@@ -402,23 +507,24 @@ def simulate_race_progression(
         Simulated race progression
     """
     
-    manager = ContextManager()
-    progression = []
+    socs, phases = _simulate_core(
+        int(start_lap),
+        int(end_lap),
+        float(initial_soc),
+        float(target_soc)
+    )
     
-    soc_per_lap = (initial_soc - target_soc) / (end_lap - start_lap + 1)
+    progression = [
+        {
+            "lap": start_lap + i,
+            "soc": float(socs[i]),
+            "laps_remaining": end_lap - (start_lap + i) + 1,
+            "phase": _PHASE_NAMES[phases[i]]
+        }
+        for i in range(len(socs))
+    ]
     
-    for lap in range(start_lap, end_lap + 1):
-        current_soc = initial_soc - (lap - start_lap) * soc_per_lap
-        laps_remaining = end_lap - lap + 1
-        
-        manager.determine_race_phase(lap, end_lap)
-        
-        progression.append({
-            "lap": lap,
-            "soc": float(current_soc),
-            "laps_remaining": laps_remaining,
-            "phase": manager.context.race_phase
-        })
+    current_soc = socs[-1]
     
     return {
         "simulation": progression,
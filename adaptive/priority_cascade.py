@@ -3,10 +3,107 @@ Priority Cascade - Decision-making logic based on race context
 Implements: Safety > Energy > Performance
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Mapping, Optional, Tuple
+from types import MappingProxyType
+from operator import itemgetter
+from functools import lru_cache
+import bisect
+import heapq
+import queue
 import numpy as np
 
 
+# SOC thresholds of the aggressiveness matrix. bisect_left keeps the strict
+# "soc > threshold" semantics: an SOC equal to a threshold falls below it.
+# Buckets: 0 = SOC<=8, 1 = 8<SOC<=15, 2 = 15<SOC<=25, 3 = SOC>25
+_SOC_EDGES = (8, 15, 25)
+
+
+def _aggressiveness_entry(
+    aggressiveness: str,
+    safety_margin: float,
+    confidence_threshold: float
+) -> Mapping[str, Any]:
+    """Build one read-only row of the aggressiveness matrix"""
+    return MappingProxyType({
+        "aggressiveness": aggressiveness,
+        "safety_margin": safety_margin,
+        "confidence_threshold": confidence_threshold,
+        "optimization_allowed": aggressiveness != "SURVIVAL",
+        # CONSERVATIVE/SURVIVAL only occur at SOC <= 15, always under the 20% pit threshold
+        "pit_recommended": aggressiveness in ("CONSERVATIVE", "SURVIVAL")
+    })
+
+
+_MODERATE = _aggressiveness_entry("MODERATE", 1.5, 0.7)
+
+# Matrix from documentation, keyed by (race_phase, soc_bucket)
+_AGG_TABLE: Dict[tuple, Mapping[str, Any]] = {
+    **{(phase, bucket): _MODERATE for phase in ("EARLY", "PRACTICE") for bucket in range(4)},
+    ("MID", 3): _MODERATE,
+    ("MID", 2): _aggressiveness_entry("BALANCED", 1.3, 0.75),
+    ("MID", 1): _aggressiveness_entry("CONSERVATIVE", 1.8, 0.8),
+    ("MID", 0): _aggressiveness_entry("CONSERVATIVE", 1.8, 0.8),
+    ("LATE", 3): _aggressiveness_entry("MODERATE", 1.3, 0.7),
+    ("LATE", 2): _aggressiveness_entry("MODERATE", 1.3, 0.7),
+    ("LATE", 1): _aggressiveness_entry("CONSERVATIVE", 2.0, 0.8),
+    ("LATE", 0): _aggressiveness_entry("SURVIVAL", 3.0, 0.85),
+}
+
+
+def _lookup_aggressiveness(race_phase: str, soc: float) -> Mapping[str, Any]:
+    """Resolve the aggressiveness matrix row for a phase and SOC level"""
+    bucket = bisect.bisect_left(_SOC_EDGES, soc)
+    return _AGG_TABLE.get((race_phase, bucket), _MODERATE)
+
+
+# race_context fields apply_priority_cascade decides on; the rest of the context
+# (e.g. the per-update timestamp) is only echoed back under "race_context"
+CASCADE_CONTEXT_KEYS = ("race_phase",)
+
+
+# Severity groups used by the cascade (frozensets: O(1) membership, built once)
+_ALERT_LEVELS = frozenset(("CRITICAL", "HIGH", "WARNING"))
+_OVERRIDE_LEVELS = frozenset(("CRITICAL", "EMERGENCY"))
+_ENERGY_WARNING_LEVELS = frozenset(("CRITICAL", "HIGH"))
+
+
+# Recycled result dicts for apply_priority_cascade (see release_cascade_result).
+# Pooling only pays off because the lifetime is explicit: a caller releases a
+# result once it has copied what it needs, and must not touch it afterwards.
+_RESULT_POOL: "queue.LifoQueue[Dict[str, Any]]" = queue.LifoQueue(maxsize=32)
+
+
+def _acquire_result() -> Dict[str, Any]:
+    """Take a cleared result dict (with an empty cascade_actions list) from the pool"""
+    try:
+        result = _RESULT_POOL.get_nowait()
+    except queue.Empty:
+        return {"cascade_actions": []}
+    
+    actions = result["cascade_actions"]
+    actions.clear()
+    result.clear()
+    result["cascade_actions"] = actions
+    return result
+
+
+def release_cascade_result(result: Dict[str, Any]) -> None:
+    """
+    Hand an apply_priority_cascade result back for reuse on a later tick
+    
+    The dict and its cascade_actions list are cleared and refilled by the next
+    call, so the caller must not keep references to either after releasing.
+    Results without a cascade_actions list (e.g. safety overrides) are ignored.
+    """
+    if not isinstance(result, dict) or not isinstance(result.get("cascade_actions"), list):
+        return
+    try:
+        _RESULT_POOL.put_nowait(result)
+    except queue.Full:
+        pass
+
+
 def apply_priority_cascade(
     model_results: Dict[str, Any],
     race_context: Dict[str, Any]
@@ -24,20 +121,18 @@ def apply_priority_cascade(
         race_context: Dict with race_phase, soc%, laps_remaining, etc.
     
     Returns:
-        Combined decision with actions
+        Combined decision with actions (may be recycled via release_cascade_result)
     """
     
-    actions = []
     severity_level = "NORMAL"
     
     # Phase 1: SAFETY checks (HARD STOPS)
     safety_action = _check_safety_constraints(model_results, race_context)
     if safety_action:
-        actions.append(safety_action)
         severity_level = safety_action.get("severity", "WARNING")
         
         # If critical, stop here - don't consider other optimizations
-        if severity_level in ["CRITICAL", "EMERGENCY"]:
+        if severity_level in _OVERRIDE_LEVELS:
             return {
                 "primary_action": safety_action,
                 "actions": [safety_action],
@@ -45,11 +140,16 @@ def apply_priority_cascade(
                 "severity": severity_level
             }
     
+    result = _acquire_result()
+    actions = result["cascade_actions"]
+    if safety_action:
+        actions.append(safety_action)
+    
     # Phase 2: ENERGY checks (DNF prevention)
     energy_action = _check_energy_constraints(model_results, race_context)
     if energy_action:
         actions.append(energy_action)
-        if energy_action.get("severity") in ["CRITICAL", "HIGH"]:
+        if energy_action.get("severity") in _ENERGY_WARNING_LEVELS:
             severity_level = "WARNING"
     
     # Phase 3: PERFORMANCE optimization (if safe)
@@ -65,30 +165,126 @@ def apply_priority_cascade(
     # Consolidate into single recommendation
     primary_action = actions[0] if actions else {"action": "NORMAL_OPERATION"}
     
-    return {
-        "primary_action": primary_action,
-        "cascade_actions": actions,
-        "severity": severity_level,
-        "race_context": race_context,
-        "count_alerts": len([a for a in actions if a.get("severity") in ["CRITICAL", "HIGH", "WARNING"]])
-    }
+    result["primary_action"] = primary_action
+    result["severity"] = severity_level
+    result["race_context"] = race_context
+    result["count_alerts"] = sum(1 for a in actions if a.get("severity") in _ALERT_LEVELS)
+    return result
 
 
-def _check_safety_constraints(
-    model_results: Dict[str, Any],
-    race_context: Dict[str, Any]
-) -> Dict[str, Any]:
+# Per-tick record layout for apply_priority_cascade_batch
+CASCADE_BATCH_DTYPE = np.dtype([
+    ("anomaly_detected", np.bool_),
+    ("anomaly_critical", np.bool_),    # anomaly severity == CRITICAL
+    ("medical_alert", np.int8),        # 0 = none, 2 = HIGH, 3 = CRITICAL (CASCADE_SEVERITIES index)
+    ("fatigue_level", np.int8),
+    ("will_finish", np.bool_),
+    ("margin", np.float32),
+    ("racing_line_conf", np.float32),
+    ("eff_gain", np.float32),
+    ("slip_detected", np.bool_),
+    ("coast_ratio", np.float32)
+])
+
+CASCADE_ACTIONS = (
+    "NORMAL_OPERATION",
+    "ANOMALY_DETECTED",
+    "MEDICAL_ALERT",
+    "HIGH_FATIGUE",
+    "DNF_RISK",
+    "LOW_ENERGY_MARGIN",
+    "PERFORMANCE_OPTIMIZATION"
+)
+
+CASCADE_SEVERITIES = ("NORMAL", "WARNING", "HIGH", "CRITICAL")
+
+
+def apply_priority_cascade_batch(tick_results: Any) -> Dict[str, Any]:
     """
-    Check SAFETY constraints (Phase 1 - Hard stops)
+    Vectorized priority cascade over a window of ticks (what-if / replay analysis)
     
-    Checks:
-    - Anomalies detected
-    - High fatigue
-    - Medical alerts (hypoxia, high HR)
+    Mirrors the primary action and severity decisions of apply_priority_cascade
+    using boolean masks, without building per-tick recommendation dicts.
+    
+    Args:
+        tick_results: Structured array with CASCADE_BATCH_DTYPE fields, or a
+                      DataFrame with the same columns
+    
+    Returns:
+        Dictionary containing:
+        - primary_action_idx: Index into CASCADE_ACTIONS per tick
+        - severity_idx: Index into CASCADE_SEVERITIES per tick
+        - safety_override: True where a CRITICAL safety action stops the cascade
+        - count_alerts: Number of HIGH/CRITICAL/WARNING actions per tick
+        - alerts: List of dicts, only for ticks with severity above NORMAL
     """
     
-    # Check anomalies
-    anomaly = model_results.get("anomaly", {})
+    anomaly = np.asarray(tick_results["anomaly_detected"], dtype=bool)
+    anomaly_critical = np.asarray(tick_results["anomaly_critical"], dtype=bool)
+    medical = np.asarray(tick_results["medical_alert"], dtype=np.int8)
+    high_fatigue = np.asarray(tick_results["fatigue_level"]) == 3
+    will_finish = np.asarray(tick_results["will_finish"], dtype=bool)
+    margin = np.asarray(tick_results["margin"], dtype=np.float32)
+    
+    # Phase 1: SAFETY (first matching rule wins)
+    safety_masks = [anomaly, medical > 0, high_fatigue]
+    safety_idx = np.select(safety_masks, [1, 2, 3], default=0)
+    safety_severity = np.select(
+        safety_masks,
+        [np.where(anomaly_critical, 3, 2), medical, 2],
+        default=0
+    )
+    safety_override = safety_severity == 3
+    
+    # Phase 2: ENERGY
+    energy_idx = np.select([~will_finish, margin < 10], [4, 5], default=0)
+    
+    # Phase 3: PERFORMANCE (only when safety and energy are both clear)
+    performance = (
+        (np.asarray(tick_results["racing_line_conf"]) > 0.7)
+        | (np.asarray(tick_results["eff_gain"]) > 2)
+        | np.asarray(tick_results["slip_detected"], dtype=bool)
+        | (np.asarray(tick_results["coast_ratio"]) > 50)
+    )
+    performance &= (safety_idx == 0) & (energy_idx == 0)
+    
+    primary_idx = np.select(
+        [safety_idx > 0, energy_idx > 0, performance],
+        [safety_idx, energy_idx, 6],
+        default=0
+    ).astype(np.int8)
+    severity_idx = np.select(
+        [safety_override, energy_idx > 0],
+        [3, 1],
+        default=safety_severity
+    ).astype(np.int8)
+    count_alerts = np.where(
+        safety_override,
+        0,
+        (safety_idx > 0).astype(np.int8) + (energy_idx > 0)
+    ).astype(np.int8)
+    
+    alert_ticks = np.flatnonzero(severity_idx > 0)
+    alerts = [
+        {
+            "tick": int(tick),
+            "action": CASCADE_ACTIONS[primary_idx[tick]],
+            "severity": CASCADE_SEVERITIES[severity_idx[tick]]
+        }
+        for tick in alert_ticks
+    ]
+    
+    return {
+        "primary_action_idx": primary_idx,
+        "severity_idx": severity_idx,
+        "safety_override": safety_override,
+        "count_alerts": count_alerts,
+        "alerts": alerts
+    }
+
+
+def _anomaly_rule(anomaly: Dict[str, Any]) -> Dict[str, Any]:
+    """Safety rule: anomaly detector fired"""
     if anomaly.get("anomaly_detected"):
         return {
             "action": "ANOMALY_DETECTED",
@@ -97,18 +293,19 @@ def _check_safety_constraints(
             "recommendation": anomaly.get("action_recommend"),
             "reason": f"Anomaly: {anomaly.get('anomaly_type')}"
         }
-    
-    # Check fatigue
-    fatigue = model_results.get("fatigue", {})
-    if fatigue.get("medical_alerts"):
-        alerts = fatigue.get("medical_alerts", [])
-        if alerts:
-            return {
-                "action": "MEDICAL_ALERT",
-                "severity": "CRITICAL" if alerts[0].get("severity") == "CRITICAL" else "HIGH",
-                "recommendation": alerts[0].get("action"),
-                "reason": alerts[0].get("alert")
-            }
+    return None
+
+
+def _fatigue_rule(fatigue: Dict[str, Any]) -> Dict[str, Any]:
+    """Safety rule: medical alerts first, then high fatigue"""
+    alerts = fatigue.get("medical_alerts")
+    if alerts:
+        return {
+            "action": "MEDICAL_ALERT",
+            "severity": "CRITICAL" if alerts[0].get("severity") == "CRITICAL" else "HIGH",
+            "recommendation": alerts[0].get("action"),
+            "reason": alerts[0].get("alert")
+        }
     
     if fatigue.get("fatigue_level") == 3:  # High fatigue
         return {
@@ -118,10 +315,78 @@ def _check_safety_constraints(
             "recommendation": "Recommend driver rest, pit for evaluation, or abort race",
             "reason": "Driver fatigue at critical level"
         }
+    return None
+
+
+# Safety rules in priority order: (model_results key, rule)
+_SAFETY_RULES = (
+    ("anomaly", _anomaly_rule),
+    ("fatigue", _fatigue_rule),
+)
+
+
+def _check_safety_constraints(
+    model_results: Dict[str, Any],
+    race_context: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Check SAFETY constraints (Phase 1 - Hard stops)
+    
+    Checks:
+    - Anomalies detected
+    - High fatigue
+    - Medical alerts (hypoxia, high HR)
+    """
+    
+    for key, rule in _SAFETY_RULES:
+        result = model_results.get(key)
+        if result and (action := rule(result)):
+            return action
     
     return None
 
 
+_DNF_RISK_RECOMMENDATION = "Reduce speed 20%, maximize coasting, pit for energy strategy review"
+_DNF_RISK_REASON = "Vehicle will not finish race at current pace"
+_LOW_MARGIN_RECOMMENDATION = "Reduce speed 10%, increase coast ratio +15%, plan pit strategy"
+
+
+@lru_cache(maxsize=256)
+def _energy_decision(
+    dnf_risk: bool,
+    low_margin: bool,
+    margin_q: Optional[float]
+) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Cached branch decision of the energy check
+    
+    Args:
+        dnf_risk: True if the energy model predicts the vehicle will not finish
+        low_margin: True if the margin is under 10%
+        margin_q: Margin rounded to 0.1 (only used for the LOW_ENERGY_MARGIN reason)
+    
+    Returns:
+        (action, severity, recommendation, reason) or None
+    """
+    if dnf_risk:
+        return ("DNF_RISK", "CRITICAL", _DNF_RISK_RECOMMENDATION, _DNF_RISK_REASON)
+    
+    if low_margin:
+        return (
+            "LOW_ENERGY_MARGIN",
+            "HIGH",
+            _LOW_MARGIN_RECOMMENDATION,
+            f"Energy margin only {margin_q:.1f}%, risk of DNF"
+        )
+    
+    return None
+
+
+def clear_energy_cache() -> None:
+    """Drop cached energy decisions (they depend only on their arguments, so this only frees memory)"""
+    _energy_decision.cache_clear()
+
+
 def _check_energy_constraints(
     model_results: Dict[str, Any],
     race_context: Dict[str, Any]
@@ -135,29 +400,30 @@ def _check_energy_constraints(
     - Should we reduce speed?
     """
     
-    energy = model_results.get("energy", {})
-    
-    if energy.get("will_finish") == False:
-        return {
-            "action": "DNF_RISK",
-            "severity": "CRITICAL",
-            "predicted_final_soc": energy.get("predicted_final_soc"),
-            "margin": energy.get("margin"),
-            "recommendation": "Reduce speed 20%, maximize coasting, pit for energy strategy review",
-            "reason": "Vehicle will not finish race at current pace"
-        }
-    
-    if energy.get("margin") < 10:  # Less than 10% margin
-        return {
-            "action": "LOW_ENERGY_MARGIN",
-            "severity": "HIGH",
-            "predicted_final_soc": energy.get("predicted_final_soc"),
-            "margin": energy.get("margin"),
-            "recommendation": "Reduce speed 10%, increase coast ratio +15%, plan pit strategy",
-            "reason": f"Energy margin only {energy.get('margin'):.1f}%, risk of DNF"
-        }
+    energy = model_results.get("energy") or {}
+    margin = energy.get("margin")
+    
+    # Only the 0.1-rounded margin reaches the reason text, so the key stays
+    # constant across steady-cruise ticks (+ 0.0 folds -0.0 into 0.0, which
+    # share a cache slot)
+    low_margin = margin is not None and margin < 10  # Less than 10% margin
+    decision = _energy_decision(
+        energy.get("will_finish") == False,
+        low_margin,
+        round(margin, 1) + 0.0 if low_margin else None
+    )
+    if decision is None:
+        return None
     
-    return None
+    action, severity, recommendation, reason = decision
+    return {
+        "action": action,
+        "severity": severity,
+        "predicted_final_soc": energy.get("predicted_final_soc"),
+        "margin": margin,
+        "recommendation": recommendation,
+        "reason": reason
+    }
 
 
 def _recommend_performance_optimization(
@@ -236,61 +502,15 @@ def get_aggressiveness_level(
     Context Factors:
     - Race phase (early/mid/late)
     - SOC level
-    - Competition rank
-    - Lap progress
     
     Returns:
-        Aggressiveness settings with safety margins
+        Aggressiveness settings with safety margins (a fresh dict per call)
     """
     
     race_phase = race_context.get("race_phase", "UNKNOWN")
     soc = race_context.get("current_soc", 50)
-    laps_remaining = race_context.get("laps_remaining", 4)
-    current_rank = race_context.get("current_rank", 5)
-    
-    # Matrix from documentation
-    if race_phase in ["EARLY", "PRACTICE"]:
-        aggressiveness = "MODERATE"
-        safety_margin = 1.5
-        confidence_threshold = 0.7
-    elif race_phase == "MID":
-        if soc > 25:
-            aggressiveness = "MODERATE"
-            safety_margin = 1.5
-            confidence_threshold = 0.7
-        elif soc > 15:
-            aggressiveness = "BALANCED"
-            safety_margin = 1.3
-            confidence_threshold = 0.75
-        else:
-            aggressiveness = "CONSERVATIVE"
-            safety_margin = 1.8
-            confidence_threshold = 0.8
-    elif race_phase == "LATE":
-        if soc > 15:
-            aggressiveness = "MODERATE"
-            safety_margin = 1.3
-            confidence_threshold = 0.7
-        elif soc > 8:
-            aggressiveness = "CONSERVATIVE"
-            safety_margin = 2.0
-            confidence_threshold = 0.8
-        else:
-            aggressiveness = "SURVIVAL"
-            safety_margin = 3.0
-            confidence_threshold = 0.85
-    else:
-        aggressiveness = "MODERATE"
-        safety_margin = 1.5
-        confidence_threshold = 0.7
     
-    return {
-        "aggressiveness": aggressiveness,
-        "safety_margin": safety_margin,
-        "confidence_threshold": confidence_threshold,
-        "optimization_allowed": aggressiveness != "SURVIVAL",
-        "pit_recommended": aggressiveness in ["CONSERVATIVE", "SURVIVAL"] and soc < 20
-    }
+    return dict(_lookup_aggressiveness(race_phase, soc))
 
 
 def prioritize_model_outputs(
@@ -303,7 +523,17 @@ def prioritize_model_outputs(
     Priority: Safety > Actionability > Confidence
     """
     
-    scored_results = []
+    top = heapq.nlargest(
+        max_recommendations,
+        _score_model_outputs(model_results),
+        key=itemgetter(0)
+    )
+    
+    return [result for _, result in top]
+
+
+def _score_model_outputs(model_results: Dict[str, Any]):
+    """Yield (priority score, result) for each non-empty model output"""
     
     for model_name, result in model_results.items():
         if not result:
@@ -327,14 +557,4 @@ def prioritize_model_outputs(
         if result.get("recommendation"):
             score += 5
         
-        scored_results.append({
-            "model": model_name,
-            "score": score,
-            "result": result
-        })
-    
-    # Sort by score descending
-    scored_results.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Return top N
-    return [item["result"] for item in scored_results[:max_recommendations]]
+        yield score, result
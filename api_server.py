@@ -9,16 +9,26 @@ Endpoints:
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Dict, List
+from types import MappingProxyType
+from typing import Any, Deque, Dict, List, Mapping, NamedTuple, Tuple
+import asyncio
+import hashlib
+import os
 import time
 
-import pandas as pd
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from kerangka_ml.adaptive.context_manager import ContextManager
+from kerangka_ml.adaptive.priority_cascade import release_cascade_result
 from kerangka_ml.inference.inference_engine import create_inference_engine
 
 
@@ -49,7 +59,34 @@ class ActiveMapRequest(BaseModel):
     code: str = "default"
 
 
+_DEFAULT_TRAINING_MODELS: Mapping[str, bool] = MappingProxyType({
+    "energy": True,
+    "racing_line": True,
+    "h2_purge": True,
+    "fatigue": True,
+    "anomaly": True,
+    "efficiency": True,
+    "slip_coast": True,
+    "rank": True,
+})
+
+
 class AppState:
+    __slots__ = (
+        "catalog",
+        "model_keys",
+        "engine",
+        "mode",
+        "models_loaded",
+        "context_manager",
+        "training_config",
+        "training_status",
+        "active_map",
+        "inference_history",
+        "history_lock",
+        "map_lock",
+    )
+
     def __init__(self) -> None:
         self.catalog = [
             {"key": "energy", "module": "kerangka_ml.models.energy_predictor"},
@@ -61,6 +98,8 @@ class AppState:
             {"key": "slip_coast", "module": "kerangka_ml.models.slip_coast"},
             {"key": "rank", "module": "kerangka_ml.models.rank_predictor"},
         ]
+        # Catalog is fixed for the process lifetime; rebuild this if it ever changes
+        self.model_keys = tuple(m["key"] for m in self.catalog)
         self.engine = None
         self.mode = "heuristic_fallback"
         self.models_loaded = 0
@@ -71,16 +110,7 @@ class AppState:
             "retrain_between_attempts": True,
             "synthetic_data_enabled": True,
             "transfer_learning_enabled": True,
-            "models": {
-                "energy": True,
-                "racing_line": True,
-                "h2_purge": True,
-                "fatigue": True,
-                "anomaly": True,
-                "efficiency": True,
-                "slip_coast": True,
-                "rank": True,
-            },
+            "models": dict(_DEFAULT_TRAINING_MODELS),
         }
         self.training_status = {
             "last_run_at": None,
@@ -94,10 +124,20 @@ class AppState:
             "code": "default",
             "updated_at": None,
         }
-        self.inference_history: List[Dict[str, Any]] = []
+        # Newest first, bounded to the last 100 inferences
+        self.inference_history: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self.history_lock = asyncio.Lock()
+        self.map_lock = asyncio.Lock()
+
+    def try_load_engine(self, force: bool = False) -> None:
+        """Attempt loading serialized models if present.
+
+        Safe to call repeatedly (e.g. once per uvicorn worker); an already
+        loaded engine is kept unless ``force`` is set.
+        """
+        if self.engine is not None and not force:
+            return
 
-    def try_load_engine(self) -> None:
-        """Attempt loading serialized models if present."""
         model_dir = Path(__file__).resolve().parent / "artifacts"
         model_paths = {
             "energy": model_dir / "energy.pkl",
@@ -118,7 +158,8 @@ class AppState:
             return
 
         try:
-            self.engine = create_inference_engine(existing)
+            # Memory-mapped so uvicorn workers share model arrays via the page cache
+            self.engine = create_inference_engine(existing, mmap_mode="r")
             self.mode = "kerangka_ml_engine"
             self.models_loaded = len(getattr(self.engine, "models", {}) or {})
         except Exception:
@@ -128,9 +169,31 @@ class AppState:
 
 
 STATE = AppState()
-STATE.try_load_engine()
 
-app = FastAPI(title="Apatte Kerangka ML API", version="1.0.0")
+# Engine inference is blocking (sklearn predict); run it here so the event loop
+# keeps serving other requests meanwhile. API_INFER_THREADS caps it when several
+# uvicorn workers share the machine (see scripts/run-api.sh)
+INFER_POOL = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("API_INFER_THREADS") or os.cpu_count() or 1),
+    thread_name_prefix="ml-infer",
+)
+
+CATALOG_MAX_AGE_S = 60
+HEALTH_MAX_AGE_S = 5
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    STATE.try_load_engine()
+    yield
+
+
+app = FastAPI(
+    title="Apatte Kerangka ML API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -142,14 +205,20 @@ app.add_middleware(
 
 
 def _to_number(value: Any, default: float = 0.0) -> float:
+    # JSON numbers usually arrive as floats already
+    if type(value) is float:
+        return value
     try:
         return float(value)
-    except Exception:
+    except (TypeError, ValueError, OverflowError):
         return default
 
 
-def _prepare_telemetry_frame(payload: Dict[str, Any]) -> pd.DataFrame:
-    """Convert dashboard telemetry payload into feature frame expected by inference engine."""
+def _prepare_telemetry_row(payload: Dict[str, Any]) -> Dict[str, float]:
+    """Convert dashboard telemetry payload into the feature row expected by inference engine.
+
+    The row stays a plain dict; the engine builds its DataFrame once, off the event loop.
+    """
     ph2 = payload.get("ph2") or {}
     ucbe = payload.get("ucbe") or {}
 
@@ -178,11 +247,27 @@ def _prepare_telemetry_frame(payload: Dict[str, Any]) -> pd.DataFrame:
         "heading": 180.0,
     }
 
-    return pd.DataFrame([row])
+    return row
+
 
+# Insight message templates, bound once
+_H2_ENERGY_FMT = "%.1f km remaining fuel".__mod__
+_BE_ENERGY_FMT = "%.1f km remaining charge".__mod__
+_PURGE_FMT = "Purge in %d minutes".__mod__
+_FATIGUE_FMT = "Driver alert level: %s".__mod__
 
-def _heuristic_insights(payload: Dict[str, Any]) -> Dict[str, Any]:
-    telemetry = payload.get("telemetry") or {}
+
+class _HeuristicCore(NamedTuple):
+    h2_energy: float
+    be_energy: float
+    purge_min: int
+    fatigue: str
+    avg_speed: float
+
+
+def _heuristic_core(telemetry: Dict[str, Any]) -> _HeuristicCore:
+    """Scalar heuristics shared by the engine payload and the full fallback."""
+    telemetry = telemetry or {}
     ph2 = telemetry.get("ph2") or {}
     ucbe = telemetry.get("ucbe") or {}
 
@@ -190,32 +275,72 @@ def _heuristic_insights(payload: Dict[str, Any]) -> Dict[str, Any]:
     ucbe_speed = _to_number(ucbe.get("speed"), 52.0)
     avg_speed = (ph2_speed + ucbe_speed) / 2.0
 
-    h2_energy = max(6.0, 46.0 - avg_speed * 0.08)
-    be_energy = max(6.0, 40.0 - avg_speed * 0.07)
-    purge_min = max(3, round(11 - ph2_speed * 0.035))
-    fatigue = "MEDIUM" if ucbe_speed > 62 else "LOW"
+    return _HeuristicCore(
+        h2_energy=max(6.0, 46.0 - avg_speed * 0.08),
+        be_energy=max(6.0, 40.0 - avg_speed * 0.07),
+        purge_min=max(3, round(11 - ph2_speed * 0.035)),
+        fatigue="MEDIUM" if ucbe_speed > 62 else "LOW",
+        avg_speed=avg_speed,
+    )
+
+
+def _heuristic_full(core: _HeuristicCore) -> Dict[str, Any]:
+    """Complete heuristic response, only built when the engine path is not used."""
+    h2_energy, be_energy, purge_min, fatigue, avg_speed = core
 
     return {
         "source": "heuristic_fallback",
-        "models_executed": [m["key"] for m in STATE.catalog],
+        "models_executed": STATE.model_keys,
         "insights": {
             "ph2": {
-                "energy": f"{h2_energy:.1f} km remaining fuel",
-                "purge": f"Purge in {purge_min} minutes",
+                "energy": _H2_ENERGY_FMT(h2_energy),
+                "purge": _PURGE_FMT(purge_min),
                 "anomaly": "Minor vibration pattern detected" if avg_speed > 63 else "No anomalies detected",
             },
             "ucbe": {
-                "energy": f"{be_energy:.1f} km remaining charge",
+                "energy": _BE_ENERGY_FMT(be_energy),
                 "efficiency": "Recommended: ease throttle 3%" if avg_speed > 58 else "Maintain current RPM",
-                "fatigue": f"Driver alert level: {fatigue}",
+                "fatigue": _FATIGUE_FMT(fatigue),
             },
             "racingLine": "Optimize late apex on next sector" if avg_speed > 60 else "Line stable, continue current trajectory",
         },
     }
 
 
-def _context_from_payload(payload_context: Dict[str, Any], telemetry_frame: pd.DataFrame) -> Dict[str, Any]:
-    current_soc = float(telemetry_frame["soc_current"].iloc[0])
+def _map_identity(incoming_map: Any) -> tuple | None:
+    """Normalize an active_map value from the inference context into (id, name, code)."""
+    if isinstance(incoming_map, dict):
+        return (
+            incoming_map.get("id") or "default",
+            incoming_map.get("name") or "Default Track",
+            incoming_map.get("code") or "default",
+        )
+    if isinstance(incoming_map, str) and incoming_map.strip():
+        name = incoming_map.strip()
+        slug = name.lower().replace(" ", "-")
+        return (slug, name, slug)
+    return None
+
+
+def _update_active_map(map_id: str, name: str, code: str) -> None:
+    """Replace STATE.active_map unless it already names the same map.
+
+    Dashboards resend the current map on every poll; skipping identical
+    updates keeps the dict (and its updated_at) stable.
+    """
+    current = STATE.active_map
+    if current["id"] == map_id and current["name"] == name and current["code"] == code:
+        return
+    STATE.active_map = {
+        "id": map_id,
+        "name": name,
+        "code": code,
+        "updated_at": time.time(),
+    }
+
+
+def _context_from_payload(payload_context: Dict[str, Any], telemetry_row: Dict[str, float]) -> Dict[str, Any]:
+    current_soc = telemetry_row["soc_current"]
     phase = payload_context.get("race_phase") or "MID"
 
     STATE.context_manager.update_context(
@@ -227,40 +352,34 @@ def _context_from_payload(payload_context: Dict[str, Any], telemetry_frame: pd.D
     return STATE.context_manager.get_current_context()
 
 
-def _engine_to_dashboard_payload(engine_result: Dict[str, Any], fallback: Dict[str, Any]) -> Dict[str, Any]:
-    primary = engine_result.get("primary_action") or {}
-
-    ph2_energy = fallback["insights"]["ph2"]["energy"]
-    ucbe_energy = fallback["insights"]["ucbe"]["energy"]
+def _engine_to_dashboard_payload(engine_result: Dict[str, Any], core: _HeuristicCore) -> Dict[str, Any]:
+    result_get = engine_result.get
+    primary = result_get("primary_action") or {}
+    primary_get = primary.get
 
-    reason = primary.get("reason") or primary.get("action") or "No critical events"
-    recommendation = primary.get("recommendation") or "Line stable, continue current trajectory"
-
-    payload = {
+    return {
         "source": "kerangka_ml_engine",
-        "models_executed": engine_result.get("models_executed") or fallback["models_executed"],
+        "models_executed": result_get("models_executed") or STATE.model_keys,
         "engine": {
-            "severity": engine_result.get("severity", "NORMAL"),
+            "severity": result_get("severity", "NORMAL"),
             "primary_action": primary,
-            "total_inference_ms": engine_result.get("total_inference_ms", 0),
+            "total_inference_ms": result_get("total_inference_ms", 0),
         },
         "insights": {
             "ph2": {
-                "energy": ph2_energy,
+                "energy": _H2_ENERGY_FMT(core.h2_energy),
                 "purge": "Purge recommendation computed from H2 scheduler",
-                "anomaly": reason,
+                "anomaly": primary_get("reason") or primary_get("action") or "No critical events",
             },
             "ucbe": {
-                "energy": ucbe_energy,
+                "energy": _BE_ENERGY_FMT(core.be_energy),
                 "efficiency": "Efficiency map optimized from current telemetry",
-                "fatigue": fallback["insights"]["ucbe"]["fatigue"],
+                "fatigue": _FATIGUE_FMT(core.fatigue),
             },
-            "racingLine": recommendation,
+            "racingLine": primary_get("recommendation") or "Line stable, continue current trajectory",
         },
     }
 
-    return payload
-
 
 def _append_inference_history(response_payload: Dict[str, Any]) -> None:
     severity = (
@@ -275,105 +394,120 @@ def _append_inference_history(response_payload: Dict[str, Any]) -> None:
         "active_map": STATE.active_map,
         "insights": response_payload.get("insights") or {},
     }
-    STATE.inference_history.insert(0, item)
-    if len(STATE.inference_history) > 100:
-        STATE.inference_history = STATE.inference_history[:100]
+    STATE.inference_history.appendleft(item)
 
 
-def _normalize_training_models(model_flags: Dict[str, bool]) -> Dict[str, bool]:
-    default = {
-        "energy": True,
-        "racing_line": True,
-        "h2_purge": True,
-        "fatigue": True,
-        "anomaly": True,
-        "efficiency": True,
-        "slip_coast": True,
-        "rank": True,
-    }
+@lru_cache(maxsize=4)
+def _catalog_body(mode: str) -> Tuple[bytes, str]:
+    """Serialized catalog response and its strong ETag (the catalog itself never changes)."""
+    body = orjson.dumps({"mode": mode, "models": STATE.catalog})
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
 
+def _etag_matches(http_request: Request, etag: str) -> bool:
+    if_none_match = http_request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _normalize_training_models(model_flags: Dict[str, bool]) -> Dict[str, bool]:
+    result = dict(_DEFAULT_TRAINING_MODELS)
     if not model_flags:
-        return default
+        return result
 
-    for key in default.keys():
+    for key in result:
         if key in model_flags:
-            default[key] = bool(model_flags[key])
-    return default
+            result[key] = bool(model_flags[key])
+    return result
 
 
 @app.get("/api/ml/health")
-def health() -> Dict[str, Any]:
-    return {
-        "status": "ok",
-        "mode": STATE.mode,
-        "models_loaded": STATE.models_loaded,
-        "training_enabled": STATE.training_config.get("global_enabled", True),
-        "service": "kerangka_ml_api",
-    }
+async def health(http_request: Request) -> Response:
+    training_enabled = STATE.training_config.get("global_enabled", True)
+    # Weak validator: only these fields ever change
+    etag = f'W/"{STATE.mode}-{STATE.models_loaded}-{int(bool(training_enabled))}"'
+    headers = {"ETag": etag, "Cache-Control": f"max-age={HEALTH_MAX_AGE_S}"}
+    if _etag_matches(http_request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return ORJSONResponse(
+        {
+            "status": "ok",
+            "mode": STATE.mode,
+            "models_loaded": STATE.models_loaded,
+            "training_enabled": training_enabled,
+            "service": "kerangka_ml_api",
+        },
+        headers=headers,
+    )
 
 
 @app.get("/api/ml/catalog")
-def catalog() -> Dict[str, Any]:
-    return {
-        "mode": STATE.mode,
-        "models": STATE.catalog,
-    }
+async def catalog(http_request: Request) -> Response:
+    body, etag = _catalog_body(STATE.mode)
+    headers = {"ETag": etag, "Cache-Control": f"max-age={CATALOG_MAX_AGE_S}"}
+    if _etag_matches(http_request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.post("/api/ml/inference")
-def inference(request: InferenceRequest) -> Dict[str, Any]:
-    fallback = _heuristic_insights(request.model_dump())
+async def inference(request: InferenceRequest) -> Dict[str, Any]:
+    core = _heuristic_core(request.telemetry)
 
     incoming_map = request.context.get("active_map") if isinstance(request.context, dict) else None
-    if isinstance(incoming_map, dict):
-        STATE.active_map = {
-            "id": incoming_map.get("id") or "default",
-            "name": incoming_map.get("name") or "Default Track",
-            "code": incoming_map.get("code") or "default",
-            "updated_at": time.time(),
-        }
-    elif isinstance(incoming_map, str) and incoming_map.strip():
-        STATE.active_map = {
-            "id": incoming_map.strip().lower().replace(" ", "-"),
-            "name": incoming_map.strip(),
-            "code": incoming_map.strip().lower().replace(" ", "-"),
-            "updated_at": time.time(),
-        }
-
-    if STATE.engine is None:
+    new_map = _map_identity(incoming_map)
+    if new_map is not None:
+        async with STATE.map_lock:
+            _update_active_map(*new_map)
+
+    engine = STATE.engine
+    if engine is None:
+        fallback = _heuristic_full(core)
         fallback["active_map"] = STATE.active_map
-        _append_inference_history(fallback)
+        async with STATE.history_lock:
+            _append_inference_history(fallback)
         return fallback
 
     try:
-        telemetry = _prepare_telemetry_frame(request.telemetry)
+        telemetry = _prepare_telemetry_row(request.telemetry)
         context = _context_from_payload(request.context, telemetry)
-        result = STATE.engine.run_real_time_inference(
-            telemetry=telemetry,
-            race_context=context,
-            timeout_ms=100,
+        result = await asyncio.get_running_loop().run_in_executor(
+            INFER_POOL,
+            partial(
+                engine.run_real_time_inference,
+                telemetry=telemetry,
+                race_context=context,
+                timeout_ms=100,
+            ),
         )
-        payload = _engine_to_dashboard_payload(result, fallback)
+        payload = _engine_to_dashboard_payload(result, core)
+        release_cascade_result(result)
         payload["active_map"] = STATE.active_map
-        _append_inference_history(payload)
+        async with STATE.history_lock:
+            _append_inference_history(payload)
         return payload
     except Exception:
+        fallback = _heuristic_full(core)
         fallback["active_map"] = STATE.active_map
-        _append_inference_history(fallback)
+        async with STATE.history_lock:
+            _append_inference_history(fallback)
         return fallback
 
 
 @app.get("/api/ml/inference/history")
-def get_inference_history() -> Dict[str, Any]:
+async def get_inference_history() -> Dict[str, Any]:
     return {
         "status": "ok",
         "count": len(STATE.inference_history),
-        "history": STATE.inference_history,
+        "history": list(STATE.inference_history),
     }
 
 
 @app.get("/api/ml/maps/active")
-def get_active_map() -> Dict[str, Any]:
+async def get_active_map() -> Dict[str, Any]:
     return {
         "status": "ok",
         "active_map": STATE.active_map,
@@ -381,13 +515,14 @@ def get_active_map() -> Dict[str, Any]:
 
 
 @app.post("/api/ml/maps/active")
-def set_active_map(request: ActiveMapRequest) -> Dict[str, Any]:
-    STATE.active_map = {
-        "id": request.id,
-        "name": request.name,
-        "code": request.code,
-        "updated_at": time.time(),
-    }
+async def set_active_map(request: ActiveMapRequest) -> Dict[str, Any]:
+    async with STATE.map_lock:
+        STATE.active_map = {
+            "id": request.id,
+            "name": request.name,
+            "code": request.code,
+            "updated_at": time.time(),
+        }
     return {
         "status": "ok",
         "active_map": STATE.active_map,
@@ -395,7 +530,7 @@ def set_active_map(request: ActiveMapRequest) -> Dict[str, Any]:
 
 
 @app.get("/api/ml/training/config")
-def get_training_config() -> Dict[str, Any]:
+async def get_training_config() -> Dict[str, Any]:
     enabled_models = sum(1 for enabled in STATE.training_config["models"].values() if enabled)
     return {
         "training_config": STATE.training_config,
@@ -404,7 +539,7 @@ def get_training_config() -> Dict[str, Any]:
 
 
 @app.post("/api/ml/training/config")
-def set_training_config(request: TrainingConfigRequest) -> Dict[str, Any]:
+async def set_training_config(request: TrainingConfigRequest) -> Dict[str, Any]:
     STATE.training_config = {
         "global_enabled": request.global_enabled,
         "online_learning_enabled": request.online_learning_enabled,
@@ -423,7 +558,7 @@ def set_training_config(request: TrainingConfigRequest) -> Dict[str, Any]:
 
 
 @app.get("/api/ml/training/status")
-def get_training_status() -> Dict[str, Any]:
+async def get_training_status() -> Dict[str, Any]:
     return {
         "status": "ok",
         "training_status": STATE.training_status,
@@ -432,7 +567,7 @@ def get_training_status() -> Dict[str, Any]:
 
 
 @app.post("/api/ml/training/run")
-def run_training(request: TrainingRunRequest) -> Dict[str, Any]:
+async def run_training(request: TrainingRunRequest) -> Dict[str, Any]:
     if not STATE.training_config.get("global_enabled", True):
         STATE.training_status = {
             "last_run_at": time.time(),
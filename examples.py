@@ -9,6 +9,10 @@ Demonstrates how to:
 5. Generate recommendations
 """
 
+import io
+import sys
+from contextlib import redirect_stdout
+
 import pandas as pd
 import numpy as np
 from kerangka_ml import InferenceEngine, ContextManager, create_inference_engine
@@ -57,9 +61,9 @@ def example_1_early_race():
     )
     
     print(f"\n📊 Race Context:")
-    print(f"   Phase: {context.context.race_phase}")
+    print(f"   Phase: {context.context.race_phase.value}")
     print(f"   SOC: {context.context.current_soc:.1f}%")
-    print(f"   Track: {context.context.track_condition}")
+    print(f"   Track: {context.context.track_condition.value}")
     
     print(f"\n✅ Expected Recommendation:")
     print(f"   → Normal operation, maintain current strategy")
@@ -100,7 +104,7 @@ def example_2_energy_crisis():
     )
     
     print(f"\n📊 Race Context:")
-    print(f"   Phase: {context.context.race_phase}")
+    print(f"   Phase: {context.context.race_phase.value}")
     print(f"   SOC: {context.context.current_soc:.1f}%")
     print(f"   Energy Margin: {energy_result['energy_margin_pct']:.1f}%")
     print(f"   Will Finish: {energy_result['will_finish']}")
@@ -241,8 +245,8 @@ def example_6_complete_e2e():
     context.assess_track_condition(wind_speed=2.0, rain_intensity=0.0, track_grip=0.94)
     context.update_soc_and_eta(current_soc=75.0, remaining_distance=60, current_efficiency=42.5)
     
-    print(f"    ✓ Race Phase: {context.context.race_phase}")
-    print(f"    ✓ Track: {context.context.track_condition}")
+    print(f"    ✓ Race Phase: {context.context.race_phase.value}")
+    print(f"    ✓ Track: {context.context.track_condition.value}")
     print(f"    ✓ SOC: {context.context.current_soc:.1f}%")
     
     # 3. Create telemetry
@@ -329,17 +333,35 @@ def example_6_complete_e2e():
     print(f"       Status: ✅ READY")
 
 
+def run_scenario(scenario) -> None:
+    """Run one example; when stdout is piped, emit its output in a single write"""
+    if sys.stdout.isatty():
+        scenario()
+        return
+    
+    buf = io.StringIO()
+    try:
+        with redirect_stdout(buf):
+            scenario()
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
 if __name__ == "__main__":
     print("🚀 Kerangka-ML Example Scenarios")
     print("================================================================================")
     
     # Run all examples
-    example_1_early_race()
-    example_2_energy_crisis()
-    example_3_anomaly_detection()
-    example_4_fatigue_medical()
-    example_5_rank_strategy()
-    example_6_complete_e2e()
+    for scenario in (
+        example_1_early_race,
+        example_2_energy_crisis,
+        example_3_anomaly_detection,
+        example_4_fatigue_medical,
+        example_5_rank_strategy,
+        example_6_complete_e2e,
+    ):
+        run_scenario(scenario)
     
     print("\n" + "="*60)
     print("✅ All examples completed successfully!")
@@ -9,25 +9,66 @@ Combines all 8 ML models with:
 
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, NamedTuple, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, wait
+import os
 import time
 
+from kerangka_ml.adaptive.priority_cascade import CASCADE_CONTEXT_KEYS, apply_priority_cascade
+from kerangka_ml.utils.data_validators import validate_telemetry
+from kerangka_ml.models.anomaly_detection import (
+    load_anomaly_detector, predict_anomaly, predict_anomaly_batch, warm_anomaly_kernels
+)
+from kerangka_ml.models.efficiency_map import load_efficiency_map, predict_efficiency_map
+from kerangka_ml.models.energy_predictor import load_energy_predictor, predict_energy
+from kerangka_ml.models.fatigue_detector import load_fatigue_detector, predict_fatigue
+from kerangka_ml.models.h2_purge import load_h2_purge_scheduler, predict_h2_purge
+from kerangka_ml.models.racing_line import load_racing_line, predict_racing_line
+from kerangka_ml.models.rank_predictor import load_rank_predictor, predict_podium_probability
+from kerangka_ml.models.slip_coast import load_slip_coast_optimizer, predict_slip_coast
+
+
+class TelemetryRow(NamedTuple):
+    """One telemetry tick, normalized once by the engine and shared by all model runners"""
+    frame: pd.DataFrame          # single-row frame for models that predict on DataFrames
+    values: np.ndarray           # the same row as an ndarray
+    col_index: Dict[str, int]    # column name -> position in values
+    
+    def get(self, col: str, default: Any = None) -> Any:
+        """Scalar value of a column, or default when the column is missing"""
+        i = self.col_index.get(col)
+        return default if i is None else self.values[i]
+
 
 class InferenceEngine:
     """
     Central inference orchestrator for all 8 ML models
     """
     
-    def __init__(self, models: Dict[str, Any]):
+    __slots__ = (
+        "models",
+        "inference_times",
+        "warmup_times",
+        "priority_order",
+        "_dispatch",
+        "_pool",
+        "_col_key",
+        "_col_index",
+        "_last_decision",
+    )
+    
+    def __init__(self, models: Dict[str, Any], warmup: bool = True):
         """
         Initialize inference engine with trained models
         
         Args:
             models: Dictionary containing all 8 trained models
                    Keys: energy, racing_line, h2_purge, fatigue, anomaly, efficiency, slip_coast, rank
+            warmup: Run every model once on a dummy row so the first real tick is not the slow one
         """
         self.models = models
         self.inference_times = {}
+        self.warmup_times = {}
         self.priority_order = [
             "anomaly",      # 1. Safety first
             "fatigue",      # 2. Driver health
@@ -38,11 +79,30 @@ class InferenceEngine:
             "efficiency",   # 7. Efficiency
             "rank"          # 8. Strategizing
         ]
+        # Model name -> bound runner, resolved once instead of a per-call if/elif chain
+        self._dispatch = {
+            name: getattr(self, f"_run_{name}_inference") for name in self.priority_order
+        }
+        # Models are independent given the telemetry row, so they run side by side;
+        # sklearn/xgboost/lightgbm release the GIL inside their predict kernels.
+        # The top-priority model runs on the calling thread, the pool takes the rest.
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, min(len(self.priority_order) - 1, os.cpu_count() or 1)),
+            thread_name_prefix="apatte-inf"
+        )
+        # Column name -> position in the telemetry row, rebuilt only when the columns change
+        self._col_key: Optional[tuple] = None
+        self._col_index: Optional[Dict[str, int]] = None
+        # (input key, decision snapshot) of the last tick, for repeated identical telemetry
+        self._last_decision: Optional[tuple] = None
         print("[+] Inference Engine initialized with 8 models")
+        
+        if warmup:
+            self.warmup()
     
     def run_real_time_inference(
         self,
-        telemetry: pd.DataFrame,
+        telemetry: Union[pd.DataFrame, Dict[str, Any]],
         race_context: Dict[str, Any],
         timeout_ms: int = 100
     ) -> Dict[str, Any]:
@@ -50,18 +110,20 @@ class InferenceEngine:
         Run all models in real-time with priority cascade
         
         Args:
-            telemetry: Current telemetry data (must contain all feature columns)
+            telemetry: Current telemetry data (must contain all feature columns);
+                       a single-row dict is turned into a DataFrame once here
             race_context: Context dict with: race_phase, soc%, laps_remaining, etc.
             timeout_ms: Max inference time budget (100ms default)
         
         Returns:
             Orchestrated predictions with priority-based recommendations
         """
-        from kerangka_ml.utils.data_validators import validate_telemetry
-        from kerangka_ml.adaptive.priority_cascade import apply_priority_cascade
-        
         start_time = time.time()
         
+        # Models expect feature frames; build it once for all of them
+        if isinstance(telemetry, dict):
+            telemetry = pd.DataFrame([telemetry])
+        
         # Validate input
         is_valid = validate_telemetry(telemetry)
         if not is_valid:
@@ -70,37 +132,48 @@ class InferenceEngine:
         results = {}
         inference_budget = timeout_ms / 1000.0
         
-        # Priority cascade: Execute in order until timeout or all done
-        for model_name in self.priority_order:
-            if (time.time() - start_time) > inference_budget:
+        # Normalized once; scalar lookups go through the ndarray row instead of .iloc[0]
+        tick = TelemetryRow(telemetry, telemetry.to_numpy()[0], self._get_col_index(telemetry))
+        
+        # Sensors often repeat between ticks: same numeric row + same context fields the
+        # cascade decides on -> same decision (volatile ones like timestamp are left out)
+        memo_key = None
+        if tick.values.dtype != object:
+            memo_key = (tick.values.tobytes(), tuple(race_context.get(key) for key in CASCADE_CONTEXT_KEYS))
+            last = self._last_decision
+            if last is not None and last[0] is tick.col_index and last[1] == memo_key:
+                final_decision = _copy_decision(last[2])
+                if "race_context" in final_decision:
+                    final_decision["race_context"] = race_context
+                final_decision["total_inference_ms"] = (time.time() - start_time) * 1000
+                return final_decision
+        
+        # Run all models concurrently; wall time is the slowest model, not the sum.
+        # The safety-critical first model never waits on pool dispatch.
+        first_model, *pooled_models = self.priority_order
+        futures = {
+            model_name: self._pool.submit(self._run_model_timed, model_name, tick)
+            for model_name in pooled_models
+        }
+        result, elapsed = self._run_model_timed(first_model, tick)
+        if result:
+            results[first_model] = result
+            self.inference_times[first_model] = elapsed
+        
+        remaining = max(0.0, inference_budget - (time.time() - start_time))
+        wait(futures.values(), timeout=remaining)
+        
+        # Collect in priority order so the cascade sees the same results dict
+        for model_name, future in futures.items():
+            if not future.done():
+                future.cancel()
                 print(f"[!] Inference timeout reached at model: {model_name}")
-                break
-            
-            model_start = time.time()
-            
-            # Load model and run inference
-            if model_name == "anomaly":
-                result = self._run_anomaly_inference(telemetry)
-            elif model_name == "fatigue":
-                result = self._run_fatigue_inference(telemetry)
-            elif model_name == "energy":
-                result = self._run_energy_inference(telemetry)
-            elif model_name == "h2_purge":
-                result = self._run_h2_purge_inference(telemetry)
-            elif model_name == "racing_line":
-                result = self._run_racing_line_inference(telemetry)
-            elif model_name == "slip_coast":
-                result = self._run_slip_coast_inference(telemetry)
-            elif model_name == "efficiency":
-                result = self._run_efficiency_inference(telemetry)
-            elif model_name == "rank":
-                result = self._run_rank_inference(telemetry)
-            else:
-                result = None
+                continue
             
+            result, elapsed = future.result()
             if result:
                 results[model_name] = result
-                self.inference_times[model_name] = time.time() - model_start
+                self.inference_times[model_name] = elapsed
         
         # Apply priority cascade logic
         final_decision = apply_priority_cascade(results, race_context)
@@ -109,90 +182,221 @@ class InferenceEngine:
         final_decision["total_inference_ms"] = (time.time() - start_time) * 1000
         final_decision["models_executed"] = list(results.keys())
         
+        if memo_key is not None:
+            # Snapshot: callers may hand the returned dict back to the cascade's pool
+            self._last_decision = (tick.col_index, memo_key, _copy_decision(final_decision))
+        
         return final_decision
     
-    def _run_anomaly_inference(self, telemetry: pd.DataFrame) -> Optional[Dict]:
+    def warmup(self, telemetry: Optional[pd.DataFrame] = None) -> Dict[str, float]:
+        """
+        Compile JIT kernels and prime every model's predict path once
+        
+        Args:
+            telemetry: Optional sample row; defaults to zeros for every feature the models know
+        
+        Returns:
+            Warm-up time per model in ms (also kept in self.warmup_times, apart from inference stats)
+        """
+        warm_anomaly_kernels()
+        
+        if telemetry is None:
+            columns = self._known_feature_columns()
+            if not columns:
+                return self.warmup_times
+            telemetry = pd.DataFrame([dict.fromkeys(columns, 0.0)])
+        
+        tick = TelemetryRow(
+            telemetry, telemetry.to_numpy()[0], {col: i for i, col in enumerate(telemetry.columns)}
+        )
+        for model_name in self.priority_order:
+            if model_name in self.models:
+                _, elapsed = self._run_model_timed(model_name, tick)
+                self.warmup_times[model_name] = elapsed * 1000
+        
+        print(f"[+] Warm-up done in {sum(self.warmup_times.values()):.1f} ms")
+        return self.warmup_times
+    
+    def _known_feature_columns(self) -> List[str]:
+        """Feature names the loaded models were fitted on, in first-seen order"""
+        columns = {}
+        for model in self.models.values():
+            if isinstance(model, dict):
+                # Anomaly ensemble: stored column order, else the fitted forest's names
+                names = model.get("feature_columns")
+                if names is None and "isolation_forest" in model:
+                    names = getattr(model["isolation_forest"], "feature_names_in_", None)
+            else:
+                names = getattr(model, "feature_names_in_", None)
+                if names is None and hasattr(model, "feature_name"):
+                    names = model.feature_name()  # Natively loaded LightGBM Booster
+            if names is not None:
+                columns.update(dict.fromkeys(names))
+        return list(columns)
+    
+    def run_batch_inference(
+        self,
+        telemetry: pd.DataFrame,
+        race_context: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the full cascade for every row of a telemetry frame (replays, backfills)
+        
+        Anomaly detection scores all valid rows with one call per detector; the
+        other models still predict per row on the pool. No time budget is applied.
+        
+        Args:
+            telemetry: Telemetry frame, one row per tick
+            race_context: Context dict applied to every row
+        
+        Returns:
+            One decision per row, shaped like run_real_time_inference's result
+        """
+        row_frames = [telemetry.iloc[[i]] for i in range(len(telemetry))]
+        valid = [validate_telemetry(frame) for frame in row_frames]
+        valid_positions = [i for i, ok in enumerate(valid) if ok]
+        
+        # One detector pass over all valid rows
+        anomaly_results = {}
+        ensemble = self.models.get("anomaly")
+        if ensemble is not None and valid_positions:
+            batch_start = time.time()
+            try:
+                batch = predict_anomaly_batch(ensemble, telemetry.iloc[valid_positions])
+                anomaly_results = dict(zip(valid_positions, batch))
+                self.inference_times["anomaly"] = (time.time() - batch_start) / len(valid_positions)
+            except Exception as e:
+                print(f"[!] Anomaly inference error: {e}")
+        
+        col_index = self._get_col_index(telemetry)
+        rows = telemetry.to_numpy()
+        pooled_models = [name for name in self.priority_order if name != "anomaly"]
+        
+        decisions = []
+        for i, frame in enumerate(row_frames):
+            start_time = time.time()
+            if not valid[i]:
+                decisions.append(self._generate_fallback_response("Invalid telemetry"))
+                continue
+            
+            futures = {
+                model_name: self._pool.submit(self._run_model_timed, model_name, TelemetryRow(frame, rows[i], col_index))
+                for model_name in pooled_models
+            }
+            
+            # Same priority order as the real-time path
+            results = {}
+            for model_name in self.priority_order:
+                if model_name == "anomaly":
+                    result = anomaly_results.get(i)
+                else:
+                    result, elapsed = futures[model_name].result()
+                    if result:
+                        self.inference_times[model_name] = elapsed
+                if result:
+                    results[model_name] = result
+            
+            final_decision = apply_priority_cascade(results, race_context)
+            final_decision["total_inference_ms"] = (time.time() - start_time) * 1000
+            final_decision["models_executed"] = list(results.keys())
+            decisions.append(final_decision)
+        
+        return decisions
+    
+    def close(self):
+        """Release the worker threads (in-flight model calls are not waited for)"""
+        self._pool.shutdown(wait=False)
+    
+    def __del__(self):
+        # __init__ may have failed before the pool existed
+        if getattr(self, "_pool", None) is not None:
+            try:
+                self.close()
+            except Exception:
+                pass
+    
+    def _get_col_index(self, telemetry: pd.DataFrame) -> Dict[str, int]:
+        """Return the column -> position map for this frame's columns (cached)"""
+        key = tuple(telemetry.columns)
+        col_index = self._col_index
+        if col_index is None or key != self._col_key:
+            col_index = {col: i for i, col in enumerate(key)}
+            self._col_key, self._col_index = key, col_index
+        return col_index
+    
+    def _run_model_timed(self, model_name: str, tick: TelemetryRow) -> tuple:
+        """Run one model and report (result, elapsed seconds)"""
+        model_start = time.time()
+        fn = self._dispatch.get(model_name)
+        result = fn(tick) if fn else None
+        return result, time.time() - model_start
+    
+    def _run_anomaly_inference(self, tick: TelemetryRow) -> Optional[Dict]:
         """Run anomaly detection"""
         try:
-            from kerangka_ml.models.anomaly_detection import predict_anomaly
-            
             ensemble = self.models.get("anomaly")
             if ensemble is None:
                 return None
             
-            result = predict_anomaly(ensemble, telemetry)
+            result = predict_anomaly(ensemble, tick.frame)
             return result
         except Exception as e:
             print(f"[!] Anomaly inference error: {e}")
             return None
     
-    def _run_fatigue_inference(self, telemetry: pd.DataFrame) -> Optional[Dict]:
+    def _run_fatigue_inference(self, tick: TelemetryRow) -> Optional[Dict]:
         """Run fatigue detection"""
         try:
-            from kerangka_ml.models.fatigue_detector import predict_fatigue
-            
             model = self.models.get("fatigue")
             if model is None:
                 return None
             
-            hr = telemetry.get("heart_rate_bpm", None)
-            spo2 = telemetry.get("spo2_pct", None)
+            hr = tick.frame.get("heart_rate_bpm", None)
+            spo2 = tick.frame.get("spo2_pct", None)
             
-            result = predict_fatigue(model, telemetry, hr, spo2)
+            result = predict_fatigue(model, tick.frame, hr, spo2)
             return result
         except Exception as e:
             print(f"[!] Fatigue inference error: {e}")
             return None
     
-    def _run_energy_inference(self, telemetry: pd.DataFrame) -> Optional[Dict]:
+    def _run_energy_inference(self, tick: TelemetryRow) -> Optional[Dict]:
         """Run energy prediction"""
         try:
-            from kerangka_ml.models.energy_predictor import predict_energy
-            
             model = self.models.get("energy")
             if model is None:
                 return None
             
-            result = predict_energy(model, telemetry)
+            result = predict_energy(model, tick.frame)
             return result
         except Exception as e:
             print(f"[!] Energy inference error: {e}")
             return None
     
-    def _run_h2_purge_inference(self, telemetry: pd.DataFrame) -> Optional[Dict]:
+    def _run_h2_purge_inference(self, tick: TelemetryRow) -> Optional[Dict]:
         """Run H2 purge prediction"""
         try:
-            from kerangka_ml.models.h2_purge import predict_h2_purge
-            
             model = self.models.get("h2_purge")
             if model is None:
                 return None
             
-            lel = telemetry.get("LEL_sensor_pct", 0) if isinstance(telemetry, dict) else telemetry["LEL_sensor_pct"].iloc[0]
-            result = predict_h2_purge(model, telemetry, lel)
+            lel = tick.values[tick.col_index["LEL_sensor_pct"]]
+            result = predict_h2_purge(model, tick.frame, lel)
             return result
         except Exception as e:
             print(f"[!] H2 Purge inference error: {e}")
             return None
     
-    def _run_racing_line_inference(self, telemetry: pd.DataFrame) -> Optional[Dict]:
+    def _run_racing_line_inference(self, tick: TelemetryRow) -> Optional[Dict]:
         """Run racing line prediction"""
         try:
-            from kerangka_ml.models.racing_line import predict_racing_line
-            
             model = self.models.get("racing_line")
             if model is None:
                 return None
             
-            if isinstance(telemetry, dict):
-                current_pos = telemetry
-            else:
-                current_pos = {
-                    "gps_lat": telemetry["gps_lat"].iloc[0] if "gps_lat" in telemetry.columns else 0,
-                    "gps_lon": telemetry["gps_lon"].iloc[0] if "gps_lon" in telemetry.columns else 0,
-                    "speed": telemetry["speed"].iloc[0] if "speed" in telemetry.columns else 0,
-                    "heading": telemetry["heading"].iloc[0] if "heading" in telemetry.columns else 0
-                }
+            current_pos = {
+                col: tick.get(col, 0) for col in ("gps_lat", "gps_lon", "speed", "heading")
+            }
             
             result = predict_racing_line(model, current_pos)
             return result
@@ -200,41 +404,35 @@ class InferenceEngine:
             print(f"[!] Racing Line inference error: {e}")
             return None
     
-    def _run_slip_coast_inference(self, telemetry: pd.DataFrame) -> Optional[Dict]:
+    def _run_slip_coast_inference(self, tick: TelemetryRow) -> Optional[Dict]:
         """Run slip & coast prediction"""
         try:
-            from kerangka_ml.models.slip_coast import predict_slip_coast
-            
             model = self.models.get("slip_coast")
             if model is None:
                 return None
             
-            result = predict_slip_coast(model, telemetry)
+            result = predict_slip_coast(model, tick.frame)
             return result
         except Exception as e:
             print(f"[!] Slip & Coast inference error: {e}")
             return None
     
-    def _run_efficiency_inference(self, telemetry: pd.DataFrame) -> Optional[Dict]:
+    def _run_efficiency_inference(self, tick: TelemetryRow) -> Optional[Dict]:
         """Run efficiency map prediction"""
         try:
-            from kerangka_ml.models.efficiency_map import predict_efficiency_map
-            
             model = self.models.get("efficiency")
             if model is None:
                 return None
             
-            result = predict_efficiency_map(model, telemetry)
+            result = predict_efficiency_map(model, tick.frame)
             return result
         except Exception as e:
             print(f"[!] Efficiency inference error: {e}")
             return None
     
-    def _run_rank_inference(self, telemetry: pd.DataFrame) -> Optional[Dict]:
+    def _run_rank_inference(self, tick: TelemetryRow) -> Optional[Dict]:
         """Run rank prediction"""
         try:
-            from kerangka_ml.models.rank_predictor import predict_podium_probability
-            
             model = self.models.get("rank")
             if model is None:
                 return None
@@ -262,56 +460,66 @@ class InferenceEngine:
     
     def get_inference_stats(self) -> Dict[str, Any]:
         """Get inference timing statistics"""
+        # At most 8 entries: plain Python is cheaper than building an array for np.mean
+        times_ms = {k: v * 1000 for k, v in self.inference_times.items()}
+        total_ms = sum(times_ms.values())
         return {
-            "inference_times_ms": {k: v * 1000 for k, v in self.inference_times.items()},
-            "total_time_ms": sum(v * 1000 for v in self.inference_times.values()),
-            "avg_model_time_ms": np.mean([v * 1000 for v in self.inference_times.values()]) if self.inference_times else 0,
+            "inference_times_ms": times_ms,
+            "total_time_ms": total_ms,
+            "avg_model_time_ms": total_ms / len(times_ms) if times_ms else 0,
             "models_available": len(self.models)
         }
 
 
-def create_inference_engine(model_paths: Dict[str, str]) -> InferenceEngine:
+def _copy_decision(decision: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cascade decision deep enough that recycling one copy leaves the other intact"""
+    decision = dict(decision)
+    if isinstance(decision.get("cascade_actions"), list):
+        decision["cascade_actions"] = list(decision["cascade_actions"])
+    return decision
+
+
+# Model name -> loader used by create_inference_engine
+_MODEL_LOADERS = {
+    "energy": load_energy_predictor,
+    "racing_line": load_racing_line,
+    "h2_purge": load_h2_purge_scheduler,
+    "fatigue": load_fatigue_detector,
+    "anomaly": load_anomaly_detector,
+    "efficiency": load_efficiency_map,
+    "slip_coast": load_slip_coast_optimizer,
+    "rank": load_rank_predictor
+}
+
+
+def create_inference_engine(model_paths: Dict[str, str], mmap_mode: str = None) -> InferenceEngine:
     """
     Factory function to load all models and create inference engine
     
     Args:
         model_paths: Dict mapping model names to file paths
+        mmap_mode: Optional joblib mmap mode ("r" lets worker processes share model arrays)
     
     Returns:
         Ready-to-use InferenceEngine
     """
-    from kerangka_ml.models.energy_predictor import load_energy_predictor
-    from kerangka_ml.models.racing_line import load_racing_line
-    from kerangka_ml.models.h2_purge import load_h2_purge_scheduler
-    from kerangka_ml.models.fatigue_detector import load_fatigue_detector
-    from kerangka_ml.models.anomaly_detection import load_anomaly_detector
-    from kerangka_ml.models.efficiency_map import load_efficiency_map
-    from kerangka_ml.models.slip_coast import load_slip_coast_optimizer
-    from kerangka_ml.models.rank_predictor import load_rank_predictor
-    
     print("[+] Loading all models...")
     
+    # Loads are mostly file reads and numpy buffer copies, so they overlap well in threads;
+    # cold start becomes the slowest load instead of the sum of all eight
+    known = {name: path for name, path in model_paths.items() if name in _MODEL_LOADERS}
     models = {}
     
-    for model_name, path in model_paths.items():
-        try:
-            if model_name == "energy":
-                models["energy"] = load_energy_predictor(path)
-            elif model_name == "racing_line":
-                models["racing_line"] = load_racing_line(path)
-            elif model_name == "h2_purge":
-                models["h2_purge"] = load_h2_purge_scheduler(path)
-            elif model_name == "fatigue":
-                models["fatigue"] = load_fatigue_detector(path)
-            elif model_name == "anomaly":
-                models["anomaly"] = load_anomaly_detector(path)
-            elif model_name == "efficiency":
-                models["efficiency"] = load_efficiency_map(path)
-            elif model_name == "slip_coast":
-                models["slip_coast"] = load_slip_coast_optimizer(path)
-            elif model_name == "rank":
-                models["rank"] = load_rank_predictor(path)
-        except Exception as e:
-            print(f"[!] Failed to load {model_name}: {e}")
+    if known:
+        with ThreadPoolExecutor(max_workers=len(known), thread_name_prefix="apatte-load") as pool:
+            futures = {
+                name: pool.submit(_MODEL_LOADERS[name], path, mmap_mode=mmap_mode)
+                for name, path in known.items()
+            }
+            for model_name, future in futures.items():
+                try:
+                    models[model_name] = future.result()
+                except Exception as e:
+                    print(f"[!] Failed to load {model_name}: {e}")
     
     return InferenceEngine(models)
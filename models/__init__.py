@@ -10,7 +10,9 @@ from kerangka_ml.models.energy_predictor import (
 from kerangka_ml.models.racing_line import (
     train_racing_line,
     predict_racing_line,
-    load_racing_line
+    load_racing_line,
+    make_racing_line_predictor,
+    warm_racing_line_kernels
 )
 
 from kerangka_ml.models.h2_purge import (
@@ -22,13 +24,16 @@ from kerangka_ml.models.h2_purge import (
 from kerangka_ml.models.fatigue_detector import (
     train_fatigue_detector,
     predict_fatigue,
-    load_fatigue_detector
+    load_fatigue_detector,
+    warm_fatigue_kernels
 )
 
 from kerangka_ml.models.anomaly_detection import (
     train_anomaly_detector,
     predict_anomaly,
-    load_anomaly_detector
+    predict_anomaly_batch,
+    load_anomaly_detector,
+    warm_anomaly_kernels
 )
 
 from kerangka_ml.models.efficiency_map import (
@@ -40,7 +45,8 @@ from kerangka_ml.models.efficiency_map import (
 from kerangka_ml.models.slip_coast import (
     train_slip_coast_optimizer,
     predict_slip_coast,
-    load_slip_coast_optimizer
+    load_slip_coast_optimizer,
+    warm_slip_coast_kernels
 )
 
 from kerangka_ml.models.rank_predictor import (
@@ -60,6 +66,8 @@ __all__ = [
     "train_racing_line",
     "predict_racing_line",
     "load_racing_line",
+    "make_racing_line_predictor",
+    "warm_racing_line_kernels",
     
     # H2 Purge
     "train_h2_purge_scheduler",
@@ -70,11 +78,14 @@ __all__ = [
     "train_fatigue_detector",
     "predict_fatigue",
     "load_fatigue_detector",
+    "warm_fatigue_kernels",
     
     # Anomaly
     "train_anomaly_detector",
     "predict_anomaly",
+    "predict_anomaly_batch",
     "load_anomaly_detector",
+    "warm_anomaly_kernels",
     
     # Efficiency
     "train_efficiency_map",
@@ -85,6 +96,7 @@ __all__ = [
     "train_slip_coast_optimizer",
     "predict_slip_coast",
     "load_slip_coast_optimizer",
+    "warm_slip_coast_kernels",
     
     # Rank
     "train_rank_predictor",
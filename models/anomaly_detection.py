@@ -6,13 +6,20 @@ Target Metrics: Recall >95%, Precision >80%, Lead time >60 seconds
 Methods: One-Class SVM, Statistical Thresholding, FFT Analysis, Isolation Forest
 """
 
-from sklearn.svm import OneClassSVM
-from sklearn.ensemble import IsolationForest
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Tuple
 import joblib
 
+from kerangka_ml.utils.jit import njit, NUMBA_AVAILABLE
+
+
+# Inputs of the One-Class SVM vibration detector
+_VIBRATION_COLS = ("vibration_rms", "vibration_fft_50hz", "vibration_fft_100hz")
+
+# Ordering used to pick the most severe specific-pattern detection
+_SEV_RANK = {"CRITICAL": 3, "HIGH": 2, "MEDIUM": 1}
+
 
 def train_anomaly_detector(
     X_train: pd.DataFrame,
@@ -34,17 +41,18 @@ def train_anomaly_detector(
         - one_class_svm: For vibration pattern anomalies
         - isolation_forest: For multi-dimensional outliers
         - z_score_params: For statistical thresholding
+        - z_score_columns/z_score_means/z_score_stds: Same stats packed as arrays
+        - feature_columns: Column order the Isolation Forest was fitted on
     """
+    # sklearn is only needed to fit; prediction goes through the unpickled estimators
     from sklearn.svm import OneClassSVM
     from sklearn.ensemble import IsolationForest
-    import numpy as np
     
     print("[+] Training Hybrid Anomaly Detection System...")
     
     # 1. One-Class SVM for vibration patterns
     print("  [+] Training One-Class SVM for vibration anomalies...")
-    vibration_cols = ["vibration_rms", "vibration_fft_50hz", "vibration_fft_100hz"]
-    X_vibration = X_train[vibration_cols].fillna(0)
+    X_vibration = _vibration_array(X_train)
     
     svm_model = OneClassSVM(
         kernel="rbf",
@@ -60,7 +68,9 @@ def train_anomaly_detector(
         contamination=contamination,
         random_state=42
     )
-    iso_forest.fit(X_train)
+    # Trees split on float32 internally; hand them float32 directly so predict
+    # skips the float64 -> float32 copy (column order kept in "feature_columns")
+    iso_forest.fit(X_train.to_numpy(dtype=np.float32))
     
     # 3. Statistical parameters for thresholding
     print("  [+] Calculating statistical parameters...")
@@ -74,10 +84,17 @@ def train_anomaly_detector(
                 "max": float(X_train[col].max())
             }
     
+    # Packed copies of the same stats for the compiled z-score scan
+    z_score_columns = list(z_score_params)
+    
     ensemble = {
         "one_class_svm": svm_model,
         "isolation_forest": iso_forest,
         "z_score_params": z_score_params,
+        "z_score_columns": z_score_columns,
+        "z_score_means": np.array([z_score_params[c]["mean"] for c in z_score_columns], dtype=np.float64),
+        "z_score_stds": np.array([z_score_params[c]["std"] for c in z_score_columns], dtype=np.float64),
+        "feature_columns": list(X_train.columns),
         "contamination": contamination
     }
     
@@ -109,23 +126,110 @@ def predict_anomaly(
         - confidence: Detection confidence (0-1)
         - action_recommend: Recommended action
     """
-    import pandas as pd
-    import numpy as np
-    
     if isinstance(X_test, pd.Series):
         X_test = X_test.to_frame().T
     
+    # 1. One-Class SVM detection (vibration)
+    svm_model = ensemble["one_class_svm"]
+    svm_pred = svm_model.predict(_svm_input(svm_model, X_test))[0]  # -1 for anomaly, 1 for normal
+    
+    # 2. Isolation Forest detection (multi-dimensional)
+    # One walk over the trees: predict() is just score_samples() - offset_ < 0
+    iso_forest = ensemble["isolation_forest"]
+    iso_score = iso_forest.score_samples(_isolation_forest_input(ensemble, X_test))[0]  # Lower = more anomalous
+    
+    # 3 + 4. Statistical thresholding and specific patterns (one compiled pass when possible)
+    fused = _fused_anomaly_scan(ensemble, X_test)
+    if fused is not None:
+        z_score_anomalies, specific_anomalies = fused
+    else:
+        z_score_anomalies = _check_z_score_anomalies(X_test, ensemble)
+        specific_anomalies = _detect_specific_patterns(X_test)
+    
+    return _combine_anomaly_signals(
+        svm_pred, iso_score, iso_forest.offset_, z_score_anomalies, specific_anomalies
+    )
+
+
+def predict_anomaly_batch(
+    ensemble: Dict[str, Any],
+    X_test: pd.DataFrame
+) -> List[Dict[str, Any]]:
+    """
+    Detect anomalies for every row of X_test with one call per detector
+    
+    Args:
+        ensemble: Ensemble dict from train_anomaly_detector
+        X_test: Test features, one row per telemetry tick
+    
+    Returns:
+        List with one predict_anomaly-style dictionary per row
+    """
+    n_rows = len(X_test)
+    
+    svm_model = ensemble["one_class_svm"]
+    svm_preds = svm_model.predict(_svm_input(svm_model, X_test))
+    
+    iso_forest = ensemble["isolation_forest"]
+    iso_scores = iso_forest.score_samples(_isolation_forest_input(ensemble, X_test))
+    
+    # Z-scores for all rows at once; non-qualifying entries (std <= 0, NaN, |z| <= 3) zeroed
+    columns, means, stds = _z_score_arrays(ensemble)
+    Z = X_test if list(X_test.columns) == columns else X_test.reindex(columns=columns)
+    Z = Z.to_numpy(dtype=np.float64, copy=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.abs((Z - means) / stds, out=Z)
+    z_mask = (Z > 3) & (stds > 0)
+    np.copyto(Z, 0.0, where=~z_mask)
+    z_counts = np.count_nonzero(z_mask, axis=1)
+    z_max_idx = np.argmax(Z, axis=1) if len(columns) else np.zeros(n_rows, dtype=np.int64)
+    
+    # Pattern rules column by column; strict '>' keeps the first rule among equal severities
+    best_rule = np.full(n_rows, -1, dtype=np.int64)
+    best_sev = np.zeros(n_rows, dtype=np.int64)
+    best_value = np.zeros(n_rows, dtype=np.float64)
+    for r, rule in enumerate(_PATTERN_RULES):
+        if rule[0] not in X_test.columns:
+            continue
+        v = X_test[rule[0]].to_numpy(dtype=np.float64)
+        sev = np.where(v > _PATTERN_CRITICAL[r], 3, _PATTERN_SEVERITIES[r]) * (v > _PATTERN_THRESHOLDS[r])
+        better = sev > best_sev
+        best_rule[better] = r
+        best_sev[better] = sev[better]
+        best_value[better] = v[better]
+    
+    results = []
+    for i in range(n_rows):
+        z_row = Z[i]
+        max_idx = int(z_max_idx[i])
+        z_score_anomalies = _z_score_result(columns, z_row, max_idx, z_row[max_idx] if z_counts[i] else 0.0, z_counts[i])
+        specific_anomalies = _pattern_result(best_rule[i], best_sev[i], best_value[i])
+        results.append(_combine_anomaly_signals(
+            svm_preds[i], iso_scores[i], iso_forest.offset_, z_score_anomalies, specific_anomalies
+        ))
+    
+    return results
+
+
+def _combine_anomaly_signals(
+    svm_pred: int,
+    iso_score: float,
+    iso_offset: float,
+    z_score_anomalies: Dict[str, Any],
+    specific_anomalies: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Merge the detector outputs for one row into the predict_anomaly result
+    
+    Later signals override the anomaly type/severity of earlier ones, in the order
+    SVM -> Isolation Forest -> z-score -> specific pattern.
+    """
     anomaly_detected = False
     anomaly_type = "NONE"
     severity = "LOW"
     confidence = 0.0
     evidence = []
     
-    # 1. One-Class SVM detection (vibration)
-    vibration_cols = ["vibration_rms", "vibration_fft_50hz", "vibration_fft_100hz"]
-    X_vibration = X_test[vibration_cols].fillna(0)
-    svm_pred = ensemble["one_class_svm"].predict(X_vibration)[0]  # -1 for anomaly, 1 for normal
-    
     if svm_pred == -1:
         anomaly_detected = True
         anomaly_type = "VIBRATION_PATTERN"
@@ -133,9 +237,7 @@ def predict_anomaly(
         confidence = max(confidence, 0.7)
         evidence.append("SVM detected vibration anomaly")
     
-    # 2. Isolation Forest detection (multi-dimensional)
-    iso_pred = ensemble["isolation_forest"].predict(X_test)[0]  # -1 for anomaly, 1 for normal
-    iso_score = ensemble["isolation_forest"].score_samples(X_test)[0]  # Lower = more anomalous
+    iso_pred = -1 if iso_score - iso_offset < 0 else 1  # -1 for anomaly, 1 for normal
     
     if iso_pred == -1:
         anomaly_detected = True
@@ -144,8 +246,6 @@ def predict_anomaly(
         confidence = max(confidence, abs(iso_score) / 10.0)  # Normalize
         evidence.append("Isolation Forest detected multi-dimensional anomaly")
     
-    # 3. Statistical thresholding
-    z_score_anomalies = _check_z_score_anomalies(X_test, ensemble["z_score_params"])
     if z_score_anomalies:
         anomaly_detected = True
         anomaly_type = z_score_anomalies["type"]
@@ -153,8 +253,6 @@ def predict_anomaly(
         confidence = max(confidence, z_score_anomalies["confidence"])
         evidence.extend(z_score_anomalies["evidence"])
     
-    # 4. Specific pattern detection
-    specific_anomalies = _detect_specific_patterns(X_test)
     if specific_anomalies:
         anomaly_detected = True
         anomaly_type = specific_anomalies["type"]
@@ -169,54 +267,162 @@ def predict_anomaly(
         "anomaly_detected": bool(anomaly_detected),
         "anomaly_type": anomaly_type,
         "severity": severity,
-        "confidence": float(np.clip(confidence, 0.0, 1.0)),
+        "confidence": float(min(max(confidence, 0.0), 1.0)),
         "action_recommend": action_recommend,
         "evidence": evidence,
         "lead_time_estimate_seconds": 60 if anomaly_detected else 0
     }
 
 
+def _svm_input(svm_model: Any, X_test: pd.DataFrame):
+    """Build the One-Class SVM input (vibration columns, NaN -> 0)"""
+    if hasattr(svm_model, "feature_names_in_"):
+        # Fitted on a DataFrame by an older version; keep sklearn's name check happy
+        return X_test[list(_VIBRATION_COLS)].fillna(0)
+    return _vibration_array(X_test)
+
+
+def _vibration_array(X: pd.DataFrame) -> np.ndarray:
+    """Extract the vibration columns as float64 with NaN replaced by 0"""
+    X_vib = X[list(_VIBRATION_COLS)].to_numpy(dtype=np.float64, copy=True)  # writable for in-place fill
+    # Only NaN -> 0 (like fillna); infinities are left for sklearn to reject
+    return np.nan_to_num(X_vib, copy=False, nan=0.0, posinf=np.inf, neginf=-np.inf)
+
+
+def _isolation_forest_input(ensemble: Dict[str, Any], X_test: pd.DataFrame):
+    """
+    Build the Isolation Forest input as a float32 array in training column order
+    
+    Ensembles fitted on a DataFrame (before feature_columns was stored) keep
+    getting the DataFrame so sklearn's feature-name checks still apply.
+    """
+    if hasattr(ensemble["isolation_forest"], "feature_names_in_"):
+        return X_test
+    
+    columns = ensemble.get("feature_columns")
+    if columns is not None and list(X_test.columns) != columns:
+        X_test = X_test[columns]
+    return X_test.to_numpy(dtype=np.float32)
+
+
+@njit(cache=True)
+def _zscore_kernel(
+    values: np.ndarray,
+    means: np.ndarray,
+    stds: np.ndarray,
+    z_out: np.ndarray
+):
+    """
+    Compute |z| per column into z_out (Numba-compiled when available)
+    
+    Columns with a non-positive std (or NaN input) never count as anomalous.
+    
+    Returns:
+        Tuple of (index of largest |z| above 3 or -1, that |z|, number of columns above 3)
+    """
+    max_idx = -1
+    max_z = 0.0
+    count_exceed = 0
+    
+    for i in range(values.shape[0]):
+        z = 0.0
+        if stds[i] > 0:
+            z = abs((values[i] - means[i]) / stds[i])
+        z_out[i] = z
+        
+        if z > 3:
+            count_exceed += 1
+            if max_idx < 0 or z > max_z:
+                max_idx = i
+                max_z = z
+    
+    return max_idx, max_z, count_exceed
+
+
+def _zscore_numpy(
+    values: np.ndarray,
+    means: np.ndarray,
+    stds: np.ndarray,
+    z_out: np.ndarray
+):
+    """
+    Vectorized equivalent of _zscore_kernel for when Numba is not installed
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.subtract(values, means, out=z_out)
+        np.divide(z_out, stds, out=z_out)
+        np.abs(z_out, out=z_out)
+    
+    mask = z_out > 3
+    mask &= stds > 0
+    count_exceed = int(np.count_nonzero(mask))
+    if not count_exceed:
+        return -1, 0.0, 0
+    
+    # Zero everything that did not qualify (incl. NaN/inf) so argmax and callers see only hits
+    np.copyto(z_out, 0.0, where=~mask)
+    max_idx = int(np.argmax(z_out))
+    return max_idx, float(z_out[max_idx]), count_exceed
+
+
+# Python-level loop is only worth it when it gets compiled
+_zscore_scan = _zscore_kernel if NUMBA_AVAILABLE else _zscore_numpy
+
+
+def _z_score_arrays(ensemble: Dict[str, Any]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Get packed (columns, means, stds) for the z-score scan
+    
+    Ensembles saved before the packed arrays existed only carry the
+    z_score_params dict; those are packed once and stored back on the ensemble.
+    """
+    if "z_score_columns" not in ensemble:
+        params = ensemble["z_score_params"]
+        columns = list(params)
+        ensemble["z_score_means"] = np.array([params[c]["mean"] for c in columns], dtype=np.float64)
+        ensemble["z_score_stds"] = np.array([params[c]["std"] for c in columns], dtype=np.float64)
+        ensemble["z_score_columns"] = columns
+    
+    return ensemble["z_score_columns"], ensemble["z_score_means"], ensemble["z_score_stds"]
+
+
 def _check_z_score_anomalies(
     X_test: pd.DataFrame,
-    z_score_params: Dict[str, Dict[str, float]]
+    ensemble: Dict[str, Any]
 ) -> Dict[str, Any]:
     """
     Check for statistical anomalies using z-scores
     
     Anomaly threshold: |z| > 3 (99.7% confidence)
     """
-    import pandas as pd
-    import numpy as np
+    columns, means, stds = _z_score_arrays(ensemble)
     
-    anomalies = []
+    if list(X_test.columns) == columns:
+        values = X_test.iloc[0].to_numpy(dtype=np.float64)
+    else:
+        # Columns missing from X_test become NaN and are never flagged
+        values = X_test.reindex(columns=columns).iloc[0].to_numpy(dtype=np.float64)
     
-    for col in X_test.columns:
-        if col not in z_score_params:
-            continue
-        
-        params = z_score_params[col]
-        value = X_test[col].iloc[0]
-        
-        if params["std"] > 0:
-            z_score = abs((value - params["mean"]) / params["std"])
-            
-            if z_score > 3:
-                anomalies.append({
-                    "column": col,
-                    "z_score": float(z_score),
-                    "value": float(value)
-                })
-    
-    if anomalies:
-        # Find most significant anomaly
-        main_anom = max(anomalies, key=lambda x: x["z_score"])
-        
+    z = np.empty(len(columns), dtype=np.float64)
+    max_idx, max_z, count_exceed = _zscore_scan(values, means, stds, z)
+    return _z_score_result(columns, z, max_idx, max_z, count_exceed)
+
+
+def _z_score_result(
+    columns: List[str],
+    z: np.ndarray,
+    max_idx: int,
+    max_z: float,
+    count_exceed: int
+) -> Dict[str, Any]:
+    """Format the z-score scan output (None when nothing exceeded the threshold)"""
+    if count_exceed:
         return {
             "detected": True,
-            "type": f"STATISTICAL_{main_anom['column'].upper()}",
-            "severity": "HIGH" if main_anom["z_score"] > 5 else "MEDIUM",
-            "confidence": min(main_anom["z_score"] / 5.0, 1.0),
-            "evidence": [f"{a['column']}: z={a['z_score']:.2f}" for a in anomalies]
+            "type": f"STATISTICAL_{columns[max_idx].upper()}",
+            "severity": "HIGH" if max_z > 5 else "MEDIUM",
+            "confidence": min(float(max_z) / 5.0, 1.0),
+            "evidence": [f"{columns[i]}: z={z[i]:.2f}" for i in np.flatnonzero(z > 3)]
         }
     
     return None
@@ -232,16 +438,17 @@ def _detect_specific_patterns(X_test: pd.DataFrame) -> Dict[str, Any]:
     - Electrical: Current surge
     - Slip/Lock: Wheel speed variance
     """
-    import pandas as pd
-    import numpy as np
+    # Most severe detection so far (first one wins among equal severities)
+    main = None
     
-    detections = []
+    # Read the single row once instead of one Series lookup per signal
+    row = dict(zip(X_test.columns, X_test.to_numpy()[0]))
     
     # Bearing failure (50Hz resonance)
-    if "vibration_fft_50hz" in X_test.columns:
-        fft_50hz = X_test["vibration_fft_50hz"].iloc[0]
+    fft_50hz = row.get("vibration_fft_50hz")
+    if fft_50hz is not None:
         if fft_50hz > 100:  # Threshold (device-specific)
-            detections.append({
+            main = _more_severe(main, {
                 "type": "BEARING_UNBALANCE",
                 "severity": "HIGH",
                 "confidence": 0.85,
@@ -249,10 +456,10 @@ def _detect_specific_patterns(X_test: pd.DataFrame) -> Dict[str, Any]:
             })
     
     # Motor overheating
-    if "motor_temp" in X_test.columns:
-        motor_temp = X_test["motor_temp"].iloc[0]
+    motor_temp = row.get("motor_temp")
+    if motor_temp is not None:
         if motor_temp > 90:
-            detections.append({
+            main = _more_severe(main, {
                 "type": "MOTOR_OVERHEAT",
                 "severity": "CRITICAL" if motor_temp > 100 else "HIGH",
                 "confidence": 0.9,
@@ -260,10 +467,10 @@ def _detect_specific_patterns(X_test: pd.DataFrame) -> Dict[str, Any]:
             })
     
     # Battery overheating
-    if "battery_cell_temp_max" in X_test.columns:
-        batt_temp = X_test["battery_cell_temp_max"].iloc[0]
+    batt_temp = row.get("battery_cell_temp_max")
+    if batt_temp is not None:
         if batt_temp > 60:
-            detections.append({
+            main = _more_severe(main, {
                 "type": "BATTERY_OVERHEAT",
                 "severity": "HIGH",
                 "confidence": 0.85,
@@ -271,10 +478,10 @@ def _detect_specific_patterns(X_test: pd.DataFrame) -> Dict[str, Any]:
             })
     
     # Wheel slip/lock detection
-    if "wheel_speed_variance" in X_test.columns:
-        wheel_var = X_test["wheel_speed_variance"].iloc[0]
+    wheel_var = row.get("wheel_speed_variance")
+    if wheel_var is not None:
         if wheel_var > 50:
-            detections.append({
+            main = _more_severe(main, {
                 "type": "WHEEL_SLIP_LOCK",
                 "severity": "MEDIUM",
                 "confidence": 0.75,
@@ -282,19 +489,17 @@ def _detect_specific_patterns(X_test: pd.DataFrame) -> Dict[str, Any]:
             })
     
     # Electrical anomaly (current surge)
-    if "current_draw" in X_test.columns:
-        current = X_test["current_draw"].iloc[0]
+    current = row.get("current_draw")
+    if current is not None:
         if current > 200:  # Threshold
-            detections.append({
+            main = _more_severe(main, {
                 "type": "CURRENT_SURGE",
                 "severity": "HIGH",
                 "confidence": 0.8,
                 "evidence": f"Current draw: {current:.1f}A"
             })
     
-    if detections:
-        # Return most severe detection
-        main = max(detections, key=lambda x: {"CRITICAL": 3, "HIGH": 2, "MEDIUM": 1}.get(x["severity"], 0))
+    if main is not None:
         return {
             "detected": True,
             "type": main["type"],
@@ -306,6 +511,169 @@ def _detect_specific_patterns(X_test: pd.DataFrame) -> Dict[str, Any]:
     return None
 
 
+def _more_severe(current: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the more severe of two detections (current on ties)"""
+    if current is None or _SEV_RANK.get(candidate["severity"], 0) > _SEV_RANK.get(current["severity"], 0):
+        return candidate
+    return current
+
+
+# Specific-pattern rules in the order _detect_specific_patterns checks them:
+# (column, anomaly type, confidence, evidence format)
+_PATTERN_RULES = (
+    ("vibration_fft_50hz", "BEARING_UNBALANCE", 0.85, "FFT 50Hz spike: {:.1f}"),
+    ("motor_temp", "MOTOR_OVERHEAT", 0.9, "Motor temp: {:.1f}°C"),
+    ("battery_cell_temp_max", "BATTERY_OVERHEAT", 0.85, "Battery cell temp: {:.1f}°C"),
+    ("wheel_speed_variance", "WHEEL_SLIP_LOCK", 0.75, "Wheel variance: {:.1f}"),
+    ("current_draw", "CURRENT_SURGE", 0.8, "Current draw: {:.1f}A")
+)
+_SEVERITY_NAMES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+# Same thresholds as _detect_specific_patterns, per rule: fires above _PATTERN_THRESHOLDS
+# with severity code _PATTERN_SEVERITIES, escalated to CRITICAL above _PATTERN_CRITICAL
+_PATTERN_THRESHOLDS = np.array([100.0, 90.0, 60.0, 50.0, 200.0])
+_PATTERN_SEVERITIES = np.array([2, 2, 2, 1, 2], dtype=np.int64)
+_PATTERN_CRITICAL = np.array([np.inf, 100.0, np.inf, np.inf, np.inf])
+
+
+@njit(cache=True)
+def _anomaly_kernel(
+    values: np.ndarray,
+    means: np.ndarray,
+    stds: np.ndarray,
+    z_out: np.ndarray,
+    pattern_idx: np.ndarray,
+    thresholds: np.ndarray,
+    severities: np.ndarray,
+    critical: np.ndarray
+):
+    """
+    Z-score scan plus the specific-pattern rules in one compiled pass
+    
+    pattern_idx[r] is the position of _PATTERN_RULES[r]'s column in values (-1 if absent);
+    thresholds/severities/critical are the _PATTERN_* tables.
+    
+    Returns:
+        Tuple of (z max index, z max, z exceed count, winning rule or -1, its severity code)
+    """
+    max_idx, max_z, count_exceed = _zscore_kernel(values, means, stds, z_out)
+    
+    best_rule = -1
+    best_sev = 0
+    for r in range(pattern_idx.shape[0]):
+        i = pattern_idx[r]
+        if i < 0:
+            continue
+        v = values[i]
+        
+        # Severity codes index _SEVERITY_NAMES; NaN never fires
+        sev = 0
+        if v > thresholds[r]:
+            sev = 3 if v > critical[r] else severities[r]
+        
+        # Strict '>' keeps the first rule among equally severe ones
+        if sev > best_sev:
+            best_rule = r
+            best_sev = sev
+    
+    return max_idx, max_z, count_exceed, best_rule, best_sev
+
+
+def warm_anomaly_kernels():
+    """Trigger Numba compilation (or the on-disk cache load) of the anomaly kernels"""
+    if not NUMBA_AVAILABLE:
+        return
+    
+    values = np.zeros(1, dtype=np.float64)
+    stds = np.ones(1, dtype=np.float64)
+    pattern_idx = np.full(len(_PATTERN_RULES), -1, dtype=np.int64)
+    _zscore_kernel(values, values, stds, np.empty(1, dtype=np.float64))
+    _anomaly_kernel(
+        values, values, stds, np.empty(1, dtype=np.float64), pattern_idx,
+        _PATTERN_THRESHOLDS, _PATTERN_SEVERITIES, _PATTERN_CRITICAL
+    )
+
+
+def _fused_anomaly_scan(ensemble: Dict[str, Any], X_test: pd.DataFrame):
+    """
+    Run _anomaly_kernel and format its codes like the two Python checks would
+    
+    Only used when Numba is available and X_test has exactly the z-score columns;
+    returns None otherwise so the caller falls back to the separate checks.
+    """
+    if not NUMBA_AVAILABLE:
+        return None
+    
+    columns, means, stds = _z_score_arrays(ensemble)
+    if list(X_test.columns) != columns:
+        return None
+    
+    pattern_idx = ensemble.get("z_score_pattern_idx")
+    if pattern_idx is None:
+        pattern_idx = np.array(
+            [columns.index(rule[0]) if rule[0] in columns else -1 for rule in _PATTERN_RULES],
+            dtype=np.int64
+        )
+        ensemble["z_score_pattern_idx"] = pattern_idx
+    
+    values = X_test.iloc[0].to_numpy(dtype=np.float64)
+    z = np.empty(len(columns), dtype=np.float64)
+    max_idx, max_z, count_exceed, rule, sev = _anomaly_kernel(
+        values, means, stds, z, pattern_idx,
+        _PATTERN_THRESHOLDS, _PATTERN_SEVERITIES, _PATTERN_CRITICAL
+    )
+    
+    z_score_anomalies = _z_score_result(columns, z, max_idx, max_z, count_exceed)
+    specific_anomalies = _pattern_result(rule, sev, values[pattern_idx[rule]] if rule >= 0 else 0.0)
+    
+    return z_score_anomalies, specific_anomalies
+
+
+def _pattern_result(rule: int, sev: int, value: float) -> Dict[str, Any]:
+    """Format a winning pattern rule like _detect_specific_patterns (None when rule < 0)"""
+    if rule < 0:
+        return None
+    
+    _, anomaly_type, confidence, evidence_fmt = _PATTERN_RULES[rule]
+    return {
+        "detected": True,
+        "type": anomaly_type,
+        "severity": _SEVERITY_NAMES[sev],
+        "confidence": confidence,
+        "evidence": [evidence_fmt.format(value)]
+    }
+
+
+# Recommended action per (anomaly_type, severity)
+_ACTIONS: Dict[Tuple[str, str], str] = {
+    ("BEARING_UNBALANCE", "CRITICAL"): "🛑 STOP: Bearing failure imminent. Limp into pits.",
+    ("BEARING_UNBALANCE", "HIGH"): "⚠ Slow to 20 km/h, reduce cornering. Inspect front bearing in pits.",
+    ("BEARING_UNBALANCE", "MEDIUM"): "⚠ Reduce speed 10%, monitor bearing temp closely.",
+    ("MOTOR_OVERHEAT", "CRITICAL"): "🛑 EMERGENCY: Motor shutdown risk. Reduce power to 50%, pit immediately.",
+    ("MOTOR_OVERHEAT", "HIGH"): "⚠ Reduce throttle to 75%, increase coast ratio, pit stop if continues.",
+    ("MOTOR_OVERHEAT", "MEDIUM"): "⚠ Monitor motor temp, avoid full throttle.",
+    ("BATTERY_OVERHEAT", "CRITICAL"): "🛑 Battery at risk. Reduce power 50%, pit immediately for cooling.",
+    ("BATTERY_OVERHEAT", "HIGH"): "⚠ Increase coast ratio +10%, reduce speed, monitor cell temp.",
+    ("BATTERY_OVERHEAT", "MEDIUM"): "⚠ Maintain current speed, increase ventilation.",
+    ("CURRENT_SURGE", "CRITICAL"): "🛑 Electrical failure risk. Check motor connection, pit immediately.",
+    ("CURRENT_SURGE", "HIGH"): "⚠ Unplug non-essential load, monitor power draw.",
+    ("CURRENT_SURGE", "MEDIUM"): "⚠ Monitor current, reduce speed if continues.",
+    ("WHEEL_SLIP_LOCK", "CRITICAL"): "🛑 Loss of traction. Slow down, pit for tire inspection.",
+    ("WHEEL_SLIP_LOCK", "HIGH"): "⚠ Adjust tire pressure, reduce speed, increase coast.",
+    ("WHEEL_SLIP_LOCK", "MEDIUM"): "⚠ Check tire pressure, ready for adjustment.",
+    ("MULTI_DIMENSIONAL", "CRITICAL"): "🛑 Multiple anomalies detected. Pit immediately for diagnosis.",
+    ("MULTI_DIMENSIONAL", "HIGH"): "⚠ Multiple parameters abnormal. pit stop recommended.",
+    ("MULTI_DIMENSIONAL", "MEDIUM"): "⚠ Several metrics outside normal range. Monitor closely."
+}
+
+# Fallback when the anomaly type has no entry for this severity
+_DEFAULT_ACTIONS: Dict[str, str] = {
+    "CRITICAL": "🛑 Anomaly confidence high. Pit immediately for inspection.",
+    "HIGH": "⚠ Stop and pit for troubleshooting recommended.",
+    "MEDIUM": "📊 Monitor continuously, pit if condition worsens."
+}
+
+
 def _generate_anomaly_action(
     anomaly_type: str,
     severity: str,
@@ -314,65 +682,21 @@ def _generate_anomaly_action(
     """
     Generate recommended action based on anomaly type
     """
-    
-    recommendations = {
-        "BEARING_UNBALANCE": {
-            "CRITICAL": "🛑 STOP: Bearing failure imminent. Limp into pits.",
-            "HIGH": "⚠ Slow to 20 km/h, reduce cornering. Inspect front bearing in pits.",
-            "MEDIUM": "⚠ Reduce speed 10%, monitor bearing temp closely."
-        },
-        "MOTOR_OVERHEAT": {
-            "CRITICAL": "🛑 EMERGENCY: Motor shutdown risk. Reduce power to 50%, pit immediately.",
-            "HIGH": "⚠ Reduce throttle to 75%, increase coast ratio, pit stop if continues.",
-            "MEDIUM": "⚠ Monitor motor temp, avoid full throttle."
-        },
-        "BATTERY_OVERHEAT": {
-            "CRITICAL": "🛑 Battery at risk. Reduce power 50%, pit immediately for cooling.",
-            "HIGH": "⚠ Increase coast ratio +10%, reduce speed, monitor cell temp.",
-            "MEDIUM": "⚠ Maintain current speed, increase ventilation."
-        },
-        "CURRENT_SURGE": {
-            "CRITICAL": "🛑 Electrical failure risk. Check motor connection, pit immediately.",
-            "HIGH": "⚠ Unplug non-essential load, monitor power draw.",
-            "MEDIUM": "⚠ Monitor current, reduce speed if continues."
-        },
-        "WHEEL_SLIP_LOCK": {
-            "CRITICAL": "🛑 Loss of traction. Slow down, pit for tire inspection.",
-            "HIGH": "⚠ Adjust tire pressure, reduce speed, increase coast.",
-            "MEDIUM": "⚠ Check tire pressure, ready for adjustment."
-        },
-        "MULTI_DIMENSIONAL": {
-            "CRITICAL": "🛑 Multiple anomalies detected. Pit immediately for diagnosis.",
-            "HIGH": "⚠ Multiple parameters abnormal. pit stop recommended.",
-            "MEDIUM": "⚠ Several metrics outside normal range. Monitor closely."
-        }
-    }
-    
-    default_actions = {
-        "CRITICAL": "🛑 Anomaly confidence high. Pit immediately for inspection.",
-        "HIGH": "⚠ Stop and pit for troubleshooting recommended.",
-        "MEDIUM": "📊 Monitor continuously, pit if condition worsens."
-    }
-    
-    if anomaly_type in recommendations:
-        return recommendations[anomaly_type].get(severity, default_actions[severity])
-    else:
-        return default_actions.get(severity, "⚠ Anomaly detected. Monitor system.")
+    return _ACTIONS.get((anomaly_type, severity)) or _DEFAULT_ACTIONS.get(severity, "⚠ Anomaly detected. Monitor system.")
 
 
-def load_anomaly_detector(model_path: str) -> Dict[str, Any]:
+def load_anomaly_detector(model_path: str, mmap_mode: str = None) -> Dict[str, Any]:
     """
     Load pre-trained Anomaly Detection ensemble from disk
     
     Args:
         model_path: Path to saved ensemble
+        mmap_mode: Passed to joblib.load; "r" memory-maps array data read-only
     
     Returns:
         Loaded ensemble
     """
-    import joblib
-    
-    ensemble = joblib.load(model_path)
+    ensemble = joblib.load(model_path, mmap_mode=mmap_mode)
     print(f"[+] Anomaly Detection ensemble loaded from {model_path}")
     return ensemble
 
@@ -392,8 +716,6 @@ def calculate_anomaly_metrics(
         Metrics dictionary
     """
     from sklearn.metrics import recall_score, precision_score, f1_score, roc_auc_score
-    import numpy as np
-    
     recall = recall_score(y_true, y_pred, zero_division=0)
     precision = precision_score(y_true, y_pred, zero_division=0)
     f1 = f1_score(y_true, y_pred, zero_division=0)
@@ -9,8 +9,34 @@ Impact: Expected improvement +8-12% overall efficiency
 import lightgbm as lgb
 import numpy as np
 import pandas as pd
-from typing import Dict, Any
+import base64
+import os
+import weakref
+from typing import Dict, Any, Sequence, Tuple, Union
 import joblib
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from kerangka_ml.utils.compiled_trees import attach_compiled, attach_onnx, compiled_predict
+from kerangka_ml.utils.jit import njit, prange, NUMBA_AVAILABLE
+
+
+# Feature order the model is trained on
+FEATURE_NAMES = ("motor_rpm", "throttle_pct", "battery_current", "motor_temp", "vehicle_speed", "battery_voltage", "road_grade")
+
+# model_path extension that selects LightGBM's native text format over joblib
+NATIVE_MODEL_EXTENSION = ".txt"
+
+# Inputs with at most this many rows predict on one thread: OpenMP fork/join
+# costs more than the tree walk for a handful of rows
+THREAD_HINT_ROW_CUTOFF = 64
+
+# Zone color by |efficiency gain| (%): <2 GREEN, 2-5 YELLOW, >=5 RED (as in predict_efficiency_map)
+ZONE_BOUNDS = np.array([2.0, 5.0])
+ZONE_LUT = np.array(["GREEN", "YELLOW", "RED"])
+
+# Model object -> feature-importance confidence; feature_importances_ is
+# recomputed from the booster on every access, so compute it once
+_IMPORTANCE_CONFIDENCE = weakref.WeakKeyDictionary()
 
 
 def train_efficiency_map(
@@ -26,7 +52,8 @@ def train_efficiency_map(
                 - motor_rpm, throttle_pct, battery_current
                 - motor_temp, vehicle_speed, battery_voltage, road_grade
         y_train: Target - optimal_throttle_pct (0-100%)
-        model_path: Optional path to save model
+        model_path: Optional path to save model (".txt" saves the booster in
+                    LightGBM's native text format, anything else uses joblib)
     
     Returns:
         Trained LightGBM model
@@ -35,23 +62,32 @@ def train_efficiency_map(
         - num_leaves: 31 (balanced complexity)
         - learning_rate: 0.05 (careful learning)
         - n_estimators: 100 (sufficient trees)
+        - max_bin: 63 (coarser histograms, fast enough for 7 numeric features)
+        - force_col_wise: True (skip LightGBM's row/col-wise benchmark; col-wise suits 7 features)
     """
-    import lightgbm as lgb
-    
     model = lgb.LGBMRegressor(
         num_leaves=31,
         learning_rate=0.05,
         n_estimators=100,
         objective="regression",
+        max_bin=63,
+        min_data_in_bin=3,
+        force_col_wise=True,
+        feature_pre_filter=True,
+        n_jobs=os.cpu_count(),
         random_state=42,
         verbose=-1
     )
     
     print("[+] Training Efficiency Map Recommender (LightGBM)...")
-    model.fit(X_train, y_train, verbose_eval=-1)
+    model.fit(X_train, y_train)
+    _importance_confidence(model)
     
     if model_path:
-        joblib.dump(model, model_path)
+        if model_path.endswith(NATIVE_MODEL_EXTENSION):
+            model.booster_.save_model(model_path)
+        else:
+            joblib.dump(model, model_path)
         print(f"[+] Model saved to {model_path}")
     
     return model
@@ -59,14 +95,14 @@ def train_efficiency_map(
 
 def predict_efficiency_map(
     model: lgb.LGBMRegressor,
-    X_test: pd.DataFrame
+    X_test: Union[pd.DataFrame, np.ndarray]
 ) -> Dict[str, Any]:
     """
     Predict optimal operating point and efficiency gain
     
     Args:
         model: Trained LightGBM model
-        X_test: Test features
+        X_test: Test features; a 2-D ndarray must be in FEATURE_NAMES order
     
     Returns:
         Dictionary containing:
@@ -77,19 +113,24 @@ def predict_efficiency_map(
         - zone_color: Heatmap color (green/yellow/red)
         - confidence: Confidence (0-1)
     """
-    import lightgbm as lgb
-    import pandas as pd
-    import numpy as np
-    
     if isinstance(X_test, pd.Series):
         X_test = X_test.to_frame().T
     
-    # Get prediction
-    optimal_throttle = model.predict(X_test)[0] if len(X_test) == 1 else model.predict(X_test)[0]
+    # Get prediction (compiled library when attached, else the LightGBM model;
+    # a raw ndarray goes straight to the booster, skipping feature-name checks)
+    predictions = compiled_predict(model, X_test)
+    if predictions is None:
+        predictions = _model_predict(model, X_test)
+    optimal_throttle = predictions[0]
     optimal_throttle = float(np.clip(optimal_throttle, 0, 100))
     
     # Calculate efficiency relative metrics
-    current_throttle = X_test["throttle_pct"].iloc[0] if "throttle_pct" in X_test.columns else 50
+    if isinstance(X_test, np.ndarray):
+        current_throttle = X_test[0, 1]
+        motor_rpm = float(X_test[0, 0])
+    else:
+        current_throttle = X_test["throttle_pct"].to_numpy(copy=False)[0] if "throttle_pct" in X_test.columns else 50
+        motor_rpm = float(X_test["motor_rpm"].to_numpy(copy=False)[0]) if "motor_rpm" in X_test.columns else 0
     throttle_diff = optimal_throttle - current_throttle
     
     # Estimate efficiency gain from throttle change
@@ -115,9 +156,8 @@ def predict_efficiency_map(
     else:
         zone = "RED"  # Very inefficient
     
-    # Confidence based on feature importance
-    feature_importance = model.feature_importances_
-    confidence = float(feature_importance.max() / 100.0)
+    # Confidence based on feature importance (cached per model)
+    confidence = _importance_confidence(model)
     
     return {
         "optimal_throttle_pct": optimal_throttle,
@@ -127,13 +167,105 @@ def predict_efficiency_map(
         "zone_color": zone,
         "confidence": float(np.clip(confidence, 0.0, 1.0)),
         "current_throttle": float(current_throttle),
-        "motor_rpm": float(X_test["motor_rpm"].iloc[0]) if "motor_rpm" in X_test.columns else 0
+        "motor_rpm": motor_rpm
     }
 
 
+def _model_predict(
+    model: lgb.LGBMRegressor,
+    X: Union[pd.DataFrame, np.ndarray]
+) -> np.ndarray:
+    """
+    model.predict, routed by input type and size
+    
+    ndarrays (FEATURE_NAMES order) and DataFrames with exactly the training columns
+    go straight to the booster as float64 arrays; anything else goes through the
+    wrapper (or the booster itself when natively loaded) so its input checks still
+    apply. Small inputs predict with num_threads=1.
+    
+    Args:
+        model: Trained LightGBM model
+        X: Input features
+    
+    Returns:
+        Predictions
+    """
+    thread_hint = {"num_threads": 1} if len(X) <= THREAD_HINT_ROW_CUTOFF else {}
+    booster = _booster(model)
+    
+    if isinstance(X, pd.DataFrame) and list(X.columns) == booster.feature_name():
+        X = X.to_numpy(dtype=np.float64)
+    if isinstance(X, np.ndarray) or booster is model:
+        return booster.predict(X, **thread_hint)
+    return model.predict(X, **thread_hint)
+
+
+def _booster(model: Union[lgb.LGBMRegressor, lgb.Booster]) -> lgb.Booster:
+    """The underlying Booster of a fitted wrapper, or the model itself if natively loaded"""
+    return model.booster_ if isinstance(model, lgb.LGBMModel) else model
+
+
+def _importance_confidence(model: lgb.LGBMRegressor) -> float:
+    """
+    Largest feature importance scaled to 0-1, cached per model
+    
+    Args:
+        model: Trained model
+    
+    Returns:
+        Unclipped confidence (max importance / 100)
+    """
+    confidence = _IMPORTANCE_CONFIDENCE.get(model)
+    if confidence is None:
+        if isinstance(model, lgb.LGBMModel):
+            feature_importance = model.feature_importances_
+        else:
+            feature_importance = model.feature_importance()  # Split counts, the wrapper default
+        confidence = float(feature_importance.max() / 100.0)
+        _IMPORTANCE_CONFIDENCE[model] = confidence
+    return confidence
+
+
+def predict_efficiency_map_fast(
+    model: lgb.LGBMRegressor,
+    features: Sequence[float]
+) -> float:
+    """
+    Optimal throttle only, for hot paths that do not need the recommendation dict
+    
+    Args:
+        model: Trained LightGBM model
+        features: One row of 7 values in FEATURE_NAMES order
+    
+    Returns:
+        Optimal throttle (%), clipped to 0-100 like predict_efficiency_map
+    """
+    # Straight to the booster: no DataFrame, and no OpenMP fork/join for a single row
+    row = np.array([features], dtype=np.float64)
+    predictions = compiled_predict(model, row)
+    if predictions is None:
+        predictions = _booster(model).predict(row, num_threads=1)
+    optimal_throttle = predictions[0]
+    return float(min(max(optimal_throttle, 0.0), 100.0))
+
+
+def classify_zones_batch(gain_arr: np.ndarray) -> np.ndarray:
+    """
+    Zone colors for many efficiency gains at once, without per-sample branches
+    
+    Args:
+        gain_arr: Efficiency gains (%)
+    
+    Returns:
+        Array of "GREEN" / "YELLOW" / "RED"
+    """
+    return ZONE_LUT[np.digitize(np.abs(gain_arr), ZONE_BOUNDS)]
+
+
 def predict_efficiency_map_batch(
     model: lgb.LGBMRegressor,
-    X_batch: pd.DataFrame
+    X_batch: pd.DataFrame,
+    columns: bool = False
 ) -> Dict[str, Any]:
     """
     Batch prediction for efficiency map
@@ -141,31 +273,50 @@ def predict_efficiency_map_batch(
     Args:
         model: Trained model
         X_batch: Batch of features
+        columns: True returns "throttles", "rpms", "efficiency_gains" and "zone_colors"
+                 arrays in place of the per-sample "predictions" dicts (rpms /
+                 efficiency_gains are None when the batch lacks motor_rpm / throttle_pct)
     
     Returns:
         Batch results with heatmap data
     """
-    import lightgbm as lgb
-    import pandas as pd
-    import numpy as np
-    
-    predictions = model.predict(X_batch)
-    
-    results = []
-    for i, pred in enumerate(predictions):
-        result = {
-            "throttle": float(pred),
-            "rpm": float(X_batch["motor_rpm"].iloc[i]) if "motor_rpm" in X_batch.columns else 0,
-            "efficiency_gain": float((pred - X_batch["throttle_pct"].iloc[i]) * 0.8) if "throttle_pct" in X_batch.columns else 0
-        }
-        results.append(result)
+    predictions = compiled_predict(model, X_batch)
+    if predictions is None:
+        predictions = _model_predict(model, X_batch)
     
-    return {
-        "predictions": results,
+    # rpm is kept in the result, so copy it rather than hold a view into the caller's frame
+    rpm = X_batch["motor_rpm"].to_numpy(dtype=np.float64, copy=True) if "motor_rpm" in X_batch.columns else None
+    efficiency_gain = (predictions - X_batch["throttle_pct"].to_numpy(copy=False)) * 0.8 if "throttle_pct" in X_batch.columns else None
+    zone_color = classify_zones_batch(efficiency_gain if efficiency_gain is not None else np.zeros(len(predictions)))
+    
+    summary = {
         "mean_optimal_throttle": float(np.mean(predictions)),
         "throttle_std": float(np.std(predictions)),
         "heatmap_ready": True
     }
+    
+    if columns:
+        return {
+            "throttles": predictions,
+            "rpms": rpm,
+            "efficiency_gains": efficiency_gain,
+            "zone_colors": zone_color,
+            **summary
+        }
+    
+    # Whole columns to Python floats/strs at once, then one dict per sample
+    n_rows = len(predictions)
+    results = [
+        {"throttle": throttle, "rpm": rpm_i, "efficiency_gain": gain, "zone_color": zone}
+        for throttle, rpm_i, gain, zone in zip(
+            predictions.tolist(),
+            rpm.tolist() if rpm is not None else [0] * n_rows,
+            efficiency_gain.tolist() if efficiency_gain is not None else [0] * n_rows,
+            zone_color.tolist()
+        )
+    ]
+    
+    return {"predictions": results, **summary}
 
 
 def generate_efficiency_map_visualization(
@@ -173,7 +324,8 @@ def generate_efficiency_map_visualization(
     rpm_range: np.ndarray,
     throttle_range: np.ndarray,
     current_rpm: float = None,
-    current_throttle: float = None
+    current_throttle: float = None,
+    return_format: str = "list"
 ) -> Dict[str, Any]:
     """
     Generate 2D heatmap data (RPM vs Throttle)
@@ -184,52 +336,64 @@ def generate_efficiency_map_visualization(
         throttle_range: Array of throttle values
         current_rpm: Current operating RPM (optional, for marker)
         current_throttle: Current operating throttle (optional, for marker)
+        return_format: Form of efficiency_grid:
+                       - "list": nested lists (JSON-ready, slow for large grids)
+                       - "numpy": the float64 ndarray itself
+                       - "b64": {"data", "shape", "dtype"} with base64 float32 bytes
+                         (decode with Float32Array on the frontend)
     
     Returns:
         Dictionary with heatmap data
     """
-    import lightgbm as lgb
-    import numpy as np
-    import pandas as pd
-    
-    # Create2D grid
-    rpm_grid, throttle_grid = np.meshgrid(rpm_range, throttle_range)
-    
-    # Flatten for prediction
-    n_points = len(rpm_range) * len(throttle_range)
-    
-    # Create dummy features for other columns (assume defaults)
-    points = np.column_stack([
-        rpm_grid.flatten(),
-        throttle_grid.flatten(),
-        np.full(n_points, 100),  # battery_current (dummy)
-        np.full(n_points, 50),   # motor_temp (dummy)
-        np.full(n_points, 50),   # vehicle_speed (dummy)
-        np.full(n_points, 48),   # battery_voltage (dummy)
-        np.full(n_points, 0)     # road_grade (dummy)
-    ])
-    
-    # Assuming column order from training
-    feature_names = ["motor_rpm", "throttle_pct", "battery_current", "motor_temp", "vehicle_speed", "battery_voltage", "road_grade"]
-    X_grid = pd.DataFrame(points, columns=feature_names)
-    
-    # Predict efficiency
-    efficiency = model.predict(X_grid)
-    efficiency_grid = efficiency.reshape(rpm_grid.shape)
-    
-    # Find optimal zone (green)
-    optimal_idx = np.unravel_index(efficiency.argmax(), efficiency_grid.shape)
-    optimal_throttle = throttle_range[optimal_idx[0]]
-    optimal_rpm = rpm_range[optimal_idx[1]]
+    if return_format not in ("list", "numpy", "b64"):
+        raise ValueError(f"Unknown return_format: {return_format}")
+    
+    # Build the (n_points, 7) grid in place, throttle-major like
+    # np.meshgrid(rpm_range, throttle_range): rpm varies fastest
+    n_rpm = len(rpm_range)
+    n_throttle = len(throttle_range)
+    X_grid = np.empty((n_rpm * n_throttle, len(FEATURE_NAMES)), dtype=np.float64)
+    X_grid[:, 0] = np.tile(rpm_range, n_throttle)
+    X_grid[:, 1] = np.repeat(throttle_range, n_rpm)
+    
+    # Dummy values for the other columns (assume defaults)
+    X_grid[:, 2] = 100  # battery_current
+    X_grid[:, 3] = 50   # motor_temp
+    X_grid[:, 4] = 50   # vehicle_speed
+    X_grid[:, 5] = 48   # battery_voltage
+    X_grid[:, 6] = 0    # road_grade
+    
+    # Predict efficiency (columns are already in training order)
+    efficiency = compiled_predict(model, X_grid)
+    if efficiency is None:
+        efficiency = _booster(model).predict(X_grid)
+    efficiency_grid = efficiency.reshape(n_throttle, n_rpm)
+    
+    # Find optimal zone (green): flat argmax -> (throttle row, rpm column)
+    optimal_flat = int(efficiency.argmax())
+    optimal_row, optimal_col = divmod(optimal_flat, n_rpm)
+    optimal_throttle = throttle_range[optimal_row]
+    optimal_rpm = rpm_range[optimal_col]
+    
+    if return_format == "numpy":
+        grid_data = efficiency_grid
+    elif return_format == "b64":
+        grid_data = {
+            "data": base64.b64encode(efficiency_grid.astype(np.float32).tobytes()).decode("ascii"),
+            "shape": list(efficiency_grid.shape),
+            "dtype": "float32"
+        }
+    else:
+        grid_data = efficiency_grid.tolist()
     
     return {
         "rpm_range": rpm_range.tolist(),
         "throttle_range": throttle_range.tolist(),
-        "efficiency_grid": efficiency_grid.tolist(),
+        "efficiency_grid": grid_data,
         "optimal_point": {
             "rpm": float(optimal_rpm),
             "throttle": float(optimal_throttle),
-            "efficiency": float(efficiency_grid[optimal_idx])
+            "efficiency": float(efficiency[optimal_flat])
         },
         "current_point": {
             "rpm": float(current_rpm) if current_rpm else None,
@@ -246,8 +410,6 @@ def _classify_efficiency_zones(efficiency_grid: np.ndarray) -> Dict[str, Any]:
     Returns:
         Zone statistics
     """
-    import numpy as np
-    
     max_eff = efficiency_grid.max()
     
     # Define zones as percentages of max efficiency
@@ -255,9 +417,9 @@ def _classify_efficiency_zones(efficiency_grid: np.ndarray) -> Dict[str, Any]:
     yellow_threshold = max_eff * 0.85  # 85-95% = yellow (okay)
     # <85% = red (inefficient)
     
-    green_points = (efficiency_grid >= green_threshold).sum()
-    yellow_points = ((efficiency_grid < green_threshold) & (efficiency_grid >= yellow_threshold)).sum()
-    red_points = (efficiency_grid < yellow_threshold).sum()
+    green_points, yellow_points, red_points = _zone_counts(
+        efficiency_grid.ravel(), green_threshold, yellow_threshold
+    )
     
     total = efficiency_grid.size
     
@@ -265,10 +427,56 @@ def _classify_efficiency_zones(efficiency_grid: np.ndarray) -> Dict[str, Any]:
         "green_pct": float(green_points / total * 100),
         "yellow_pct": float(yellow_points / total * 100),
         "red_pct": float(red_points / total * 100),
-        "optimal_zone_size": green_points
+        "optimal_zone_size": int(green_points)
     }
 
 
+@njit(cache=True, parallel=True)
+def _zone_counts_kernel(
+    grid_flat: np.ndarray,
+    green_threshold: float,
+    yellow_threshold: float
+) -> Tuple[int, int, int]:
+    """
+    Count green/yellow/red points in one pass (NaN falls in no zone)
+    
+    Args:
+        grid_flat: Flattened efficiency grid
+        green_threshold: Lower bound of the green zone
+        yellow_threshold: Lower bound of the yellow zone
+    
+    Returns:
+        (green, yellow, red) point counts
+    """
+    green = 0
+    yellow = 0
+    red = 0
+    for i in prange(grid_flat.shape[0]):
+        value = grid_flat[i]
+        if value >= green_threshold:
+            green += 1
+        elif value >= yellow_threshold:
+            yellow += 1
+        elif value < yellow_threshold:
+            red += 1
+    return green, yellow, red
+
+
+def _zone_counts_numpy(
+    grid_flat: np.ndarray,
+    green_threshold: float,
+    yellow_threshold: float
+) -> Tuple[int, int, int]:
+    """NumPy version of _zone_counts_kernel, used when Numba is not installed"""
+    green = (grid_flat >= green_threshold).sum()
+    yellow = ((grid_flat < green_threshold) & (grid_flat >= yellow_threshold)).sum()
+    red = (grid_flat < yellow_threshold).sum()
+    return green, yellow, red
+
+
+_zone_counts = _zone_counts_kernel if NUMBA_AVAILABLE else _zone_counts_numpy
+
+
 def get_throttle_recommendation_from_conditions(
     model: lgb.LGBMRegressor,
     motor_rpm: float,
@@ -295,38 +503,52 @@ def get_throttle_recommendation_from_conditions(
     Returns:
         Recommendation dictionary
     """
-    import lightgbm as lgb
-    import pandas as pd
-    import numpy as np
-    
-    # Create feature array
-    X = pd.DataFrame([{
-        "motor_rpm": motor_rpm,
-        "throttle_pct": current_throttle,
-        "battery_current": battery_current,
-        "motor_temp": motor_temp,
-        "vehicle_speed": vehicle_speed,
-        "battery_voltage": battery_voltage,
-        "road_grade": road_grade
-    }])
+    # Create feature array (FEATURE_NAMES order)
+    X = np.array([[
+        motor_rpm,
+        current_throttle,
+        battery_current,
+        motor_temp,
+        vehicle_speed,
+        battery_voltage,
+        road_grade
+    ]], dtype=np.float64)
     
     return predict_efficiency_map(model, X)
 
 
-def load_efficiency_map(model_path: str) -> lgb.LGBMRegressor:
+def load_efficiency_map(
+    model_path: str,
+    mmap_mode: str = None,
+    compiled_lib: str = None,
+    onnx_path: str = None
+) -> Union[lgb.LGBMRegressor, lgb.Booster]:
     """
     Load pre-trained Efficiency Map model from disk
     
     Args:
-        model_path: Path to saved model
+        model_path: Path to saved model; a ".txt" file is loaded as a native LightGBM
+                    Booster (no sklearn wrapper to unpickle), which every function in
+                    this module accepts in place of the LGBMRegressor
+        mmap_mode: Passed to joblib.load; "r" memory-maps array data read-only
+        compiled_lib: Optional library from utils.compiled_trees.export_compiled;
+                      predictions use it when it loads, else the LightGBM model
+        onnx_path: Optional graph from utils.compiled_trees.export_onnx, used the same
+                   way when compiled_lib is not given
     
     Returns:
         Loaded model
     """
-    import joblib
-    
-    model = joblib.load(model_path)
+    if model_path.endswith(NATIVE_MODEL_EXTENSION):
+        model = lgb.Booster(model_file=model_path)
+    else:
+        model = joblib.load(model_path, mmap_mode=mmap_mode)
     print(f"[+] Efficiency Map Recommender loaded from {model_path}")
+    _importance_confidence(model)
+    if compiled_lib:
+        attach_compiled(model, compiled_lib)
+    elif onnx_path:
+        attach_onnx(model, onnx_path)
     return model
 
 
@@ -342,20 +564,21 @@ def calculate_efficiency_metrics(
         y_pred: Predicted throttle (%)
     
     Returns:
-        Metrics dictionary
+        Metrics dictionary (Direction_Accuracy is nan with fewer than 2 samples:
+        there is no step to compare)
     """
-    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-    import numpy as np
-    
     mae = mean_absolute_error(y_true, y_pred)
     rmse = np.sqrt(mean_squared_error(y_true, y_pred))
     r2 = r2_score(y_true, y_pred)
     
     # Direction accuracy (correct increase/decrease recommendation)
-    direction_true = np.sign(np.diff(y_true))
-    direction_pred = np.sign(np.diff(y_pred))
-    direction_correct = (direction_true == direction_pred).sum()
-    direction_accuracy = direction_correct / len(direction_true) if len(direction_true) > 0 else 1.0
+    # Signs are taken in place on the fresh diff buffers
+    direction_true = np.diff(y_true)
+    direction_pred = np.diff(y_pred)
+    np.sign(direction_true, out=direction_true)
+    np.sign(direction_pred, out=direction_pred)
+    direction_correct = np.count_nonzero(direction_true == direction_pred)
+    direction_accuracy = direction_correct / direction_true.size if direction_true.size > 0 else np.nan
     
     return {
         "MAE": float(mae),
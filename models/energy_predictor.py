@@ -8,8 +8,27 @@ Target Metrics: MAE <2% SOC, RMSE <3% SOC, R² >0.85, DNF Prevention Recall >95%
 import xgboost as xgb
 import numpy as np
 import pandas as pd
+import weakref
 from typing import Tuple, Dict, Any
 import joblib
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from kerangka_ml.utils.compiled_trees import attach_compiled, attach_onnx, compiled_predict
+
+
+# model_path extensions that select XGBoost's native format over joblib
+NATIVE_MODEL_EXTENSIONS = (".json", ".ubj")
+
+# Inputs with at most this many rows predict on one thread: OpenMP fork/join
+# costs more than the tree walk for a handful of rows
+THREAD_HINT_ROW_CUTOFF = 64
+
+# Model object -> (booster it was copied from, copy with nthread=1)
+_SINGLE_THREAD_BOOSTERS = weakref.WeakKeyDictionary()
+
+# Model object -> top-3 normalized feature importance used by _calculate_confidence.
+# feature_importances_ re-aggregates the booster on every access, so compute it once.
+_IMPORTANCE_CONFIDENCE = weakref.WeakKeyDictionary()
 
 
 def train_energy_predictor(
@@ -25,7 +44,8 @@ def train_energy_predictor(
                 - soc_current, speed_avg, efficiency_rolling_3lap
                 - lap_progress, motor_temp, battery_current, wind_headwind
         y_train: Target - predicted_final_soc (0-100)
-        model_path: Optional path to save trained model
+        model_path: Optional path to save trained model (".json"/".ubj" use XGBoost's
+                    native format, anything else uses joblib)
     
     Returns:
         Trained XGBoost model
@@ -39,8 +59,6 @@ def train_energy_predictor(
         - reg_alpha: 0.1 (L1)
         - reg_lambda: 1.0 (L2)
     """
-    import xgboost as xgb
-    
     model = xgb.XGBRegressor(
         n_estimators=50,
         max_depth=4,
@@ -56,9 +74,13 @@ def train_energy_predictor(
     
     print("[+] Training Energy Predictor...")
     model.fit(X_train, y_train, verbose=False)
+    _importance_confidence(model)
     
     if model_path:
-        joblib.dump(model, model_path)
+        if model_path.endswith(NATIVE_MODEL_EXTENSIONS):
+            model.save_model(model_path)
+        else:
+            joblib.dump(model, model_path)
         print(f"[+] Model saved to {model_path}")
     
     return model
@@ -83,15 +105,15 @@ def predict_energy(
         - margin: Safety margin (%)
         - raw_prediction: Raw model output
     """
-    import xgboost as xgb
-    import pandas as pd
-    
     # Handle single row vs batch
     if isinstance(X_test, pd.Series):
         X_test = X_test.to_frame().T
     
-    # Make prediction
-    raw_prediction = model.predict(X_test)[0] if len(X_test) == 1 else model.predict(X_test)
+    # Make prediction (compiled library when attached, else the XGBoost wrapper)
+    predictions = compiled_predict(model, X_test)
+    if predictions is None:
+        predictions = _model_predict(model, X_test)
+    raw_prediction = predictions[0] if len(X_test) == 1 else predictions
     
     # Calculate confidence (inverse of prediction uncertainty)
     # Using booster's get_score for feature importance weighting
@@ -126,27 +148,64 @@ def predict_energy_batch(
     Returns:
         Dictionary with batch results
     """
-    import xgboost as xgb
-    
-    predictions = model.predict(X_batch)
-    confidences = []
+    predictions = compiled_predict(model, X_batch)
+    if predictions is None:
+        predictions = _model_predict(model, X_batch)
     
-    for pred in predictions:
-        conf = _calculate_confidence(model, X_batch, pred)
-        confidences.append(conf)
+    # Same formula as _calculate_confidence, over the whole batch at once
+    soc_confidence = 1.0 - np.abs(predictions - 50.0) / 100.0
+    confidences = (0.6 * _importance_confidence(model)) + (0.4 * np.minimum(soc_confidence, 1.0))
+    confidences = np.clip(confidences, 0.0, 1.0)
     
     will_finish = predictions > 5.0
     margins = predictions - 5.0
     
     return {
         "predicted_final_soc": predictions.tolist(),
-        "confidence": confidences,
+        "confidence": confidences.tolist(),
         "will_finish": will_finish.tolist(),
         "margin": margins.tolist(),
-        "mean_confidence": float(np.mean(confidences))
+        "mean_confidence": float(np.mean(confidences.astype(np.float64)))
     }
 
 
+def _model_predict(model: xgb.XGBRegressor, X: pd.DataFrame) -> np.ndarray:
+    """
+    model.predict through booster.inplace_predict, tuned by input size
+    
+    Small inputs use a cached copy of the booster with nthread=1 (the XGBoost wrapper
+    always predicts with n_jobs threads); the copy is rebuilt if the model is refit.
+    Larger DataFrames with exactly the training columns go in as one contiguous
+    float32 array, the dtype XGBoost predicts in, instead of being converted per column.
+    
+    Args:
+        model: Trained XGBoost model
+        X: Input features
+    
+    Returns:
+        Predictions
+    """
+    booster = model.get_booster()
+    
+    if len(X) <= THREAD_HINT_ROW_CUTOFF:
+        cached = _SINGLE_THREAD_BOOSTERS.get(model)
+        if cached is None or cached[0] is not booster:
+            single_thread = booster.copy()
+            single_thread.set_param({"nthread": 1})
+            cached = (booster, single_thread)
+            _SINGLE_THREAD_BOOSTERS[model] = cached
+        booster = cached[1]
+    elif isinstance(X, pd.DataFrame) and list(X.columns) == booster.feature_names:
+        X = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+    
+    try:
+        iteration_range = (0, model.best_iteration + 1)
+    except AttributeError:
+        iteration_range = (0, 0)  # No early stopping: all trees
+    
+    return booster.inplace_predict(X, iteration_range=iteration_range, missing=model.missing)
+
+
 def _calculate_confidence(
     model: xgb.XGBRegressor,
     X: pd.DataFrame,
@@ -164,18 +223,12 @@ def _calculate_confidence(
     Returns:
         Confidence score (0-1)
     """
-    import numpy as np
-    
     # Base confidence from prediction magnitude
     # Higher SOC margin = higher confidence
     soc_confidence = 1.0 - abs(prediction - 50.0) / 100.0  # Peak at 50%
     
-    # Feature importance weight
-    feature_importance = model.feature_importances_
-    feature_importance = feature_importance / feature_importance.sum()
-    
-    # Higher importance sum = more decisive features = higher confidence
-    importance_confidence = float(np.sum(feature_importance[:3]))  # Top 3 features
+    # Feature importance weight (cached per model)
+    importance_confidence = _importance_confidence(model)
     
     # Combine: 60% from feature importance, 40% from prediction
     confidence = (0.6 * importance_confidence) + (0.4 * min(soc_confidence, 1.0))
@@ -183,6 +236,27 @@ def _calculate_confidence(
     return float(np.clip(confidence, 0.0, 1.0))
 
 
+def _importance_confidence(model: xgb.XGBRegressor) -> float:
+    """
+    Share of normalized feature importance held by the first 3 features, cached per model
+    
+    Args:
+        model: Trained model
+    
+    Returns:
+        Importance confidence (0-1)
+    """
+    importance_confidence = _IMPORTANCE_CONFIDENCE.get(model)
+    if importance_confidence is None:
+        feature_importance = model.feature_importances_
+        feature_importance = feature_importance / feature_importance.sum()
+        
+        # Higher importance sum = more decisive features = higher confidence
+        importance_confidence = float(np.sum(feature_importance[:3]))  # Top 3 features
+        _IMPORTANCE_CONFIDENCE[model] = importance_confidence
+    return importance_confidence
+
+
 def energy_fallback_prediction(
     soc_current: float,
     laps_remaining: float,
@@ -206,8 +280,6 @@ def energy_fallback_prediction(
     Returns:
         Fallback prediction result
     """
-    import numpy as np
-    
     energy_available = (soc_current / 100.0) * battery_capacity
     energy_needed = laps_remaining * avg_energy_per_lap
     
@@ -228,20 +300,38 @@ def energy_fallback_prediction(
     }
 
 
-def load_energy_predictor(model_path: str) -> xgb.XGBRegressor:
+def load_energy_predictor(
+    model_path: str,
+    mmap_mode: str = None,
+    compiled_lib: str = None,
+    onnx_path: str = None
+) -> xgb.XGBRegressor:
     """
     Load pre-trained Energy Predictor model from disk
     
     Args:
-        model_path: Path to saved model
+        model_path: Path to saved model; ".json"/".ubj" files are read with XGBoost's
+                    native loader into a fresh XGBRegressor instead of unpickling
+        mmap_mode: Passed to joblib.load; "r" memory-maps array data read-only
+        compiled_lib: Optional library from utils.compiled_trees.export_compiled;
+                      predict_energy uses it when it loads, else the XGBoost model
+        onnx_path: Optional graph from utils.compiled_trees.export_onnx, used the same
+                   way when compiled_lib is not given
     
     Returns:
         Loaded model
     """
-    import joblib
-    
-    model = joblib.load(model_path)
+    if model_path.endswith(NATIVE_MODEL_EXTENSIONS):
+        model = xgb.XGBRegressor()
+        model.load_model(model_path)
+    else:
+        model = joblib.load(model_path, mmap_mode=mmap_mode)
     print(f"[+] Energy Predictor loaded from {model_path}")
+    _importance_confidence(model)
+    if compiled_lib:
+        attach_compiled(model, compiled_lib)
+    elif onnx_path:
+        attach_onnx(model, onnx_path)
     return model
 
 
@@ -257,8 +347,6 @@ def calculate_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float
     Returns:
         Dictionary with MAE, RMSE, R² metrics
     """
-    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-    
     mae = mean_absolute_error(y_true, y_pred)
     rmse = np.sqrt(mean_squared_error(y_true, y_pred))
     r2 = r2_score(y_true, y_pred)
@@ -9,8 +9,59 @@ Safety Rules: SpO2 <90% = HYPOXIA RISK, HR >180 = MEDICAL CONCERN
 from sklearn.ensemble import RandomForestClassifier
 import numpy as np
 import pandas as pd
+from dataclasses import asdict, dataclass
 from typing import Dict, Any, Tuple
+import weakref
 import joblib
+from sklearn.metrics import confusion_matrix
+
+from kerangka_ml.utils.compiled_trees import attach_compiled, attach_onnx, compiled_predict
+from kerangka_ml.utils.jit import njit, prange, NUMBA_AVAILABLE
+
+
+# Inputs with fewer rows than this walk the trees on the calling thread: the thread
+# pool's dispatch costs more than the traversal until the batch is a few hundred rows
+THREAD_HINT_ROW_CUTOFF = 512
+
+# Inputs with at least this many rows use the Numba forest traverser (parallel over
+# rows) when Numba is installed; sklearn parallelizes over trees only
+FOREST_KERNEL_ROW_CUTOFF = 10000
+
+# Model object -> (estimators_ the entry was built from, per-tree (tree_, leaf table));
+# a leaf table holds the class probabilities of every node, indexed by node id
+_LEAF_TABLES = weakref.WeakKeyDictionary()
+
+# Model object -> (estimators_ the entry was built from, padded forest arrays for
+# _forest_proba_kernel)
+_FOREST_ARRAYS = weakref.WeakKeyDictionary()
+
+# Per-level tables, indexed by fatigue level (0=None .. 3=High)
+# Each class covers ~25% range; its percentage is the middle of that range
+_CLASS_TO_PCT = np.array([12.5, 37.5, 62.5, 87.5], dtype=np.float32)
+_LEVEL_NAMES = ("None", "Low", "Medium", "High")
+_ACTIONS = (
+    "✓ Normal operation - monitor routine",
+    "⚠ Low fatigue - monitor closely, suggest rest after lap",
+    "⚠ Medium fatigue - warning alert, recommend pit stop for evaluation",
+    "🚨 High fatigue - recommend race abort or driver change"
+)
+
+_HYPOXIA_ACTION = "IMMEDIATE_ALERT: Check oxygen, open ventilation"
+_HIGH_HR_ACTION = "MEDICAL_CONCERN: Elevated heart rate, monitor closely"
+
+
+@dataclass(slots=True)
+class MedicalAlert:
+    """
+    Medical safety alert raised by predict_fatigue
+    
+    Used inside this module only; predict_fatigue returns each alert as a plain
+    dict (dataclasses.asdict) so results stay JSON-serializable.
+    """
+    severity: str
+    alert: str
+    value: float
+    action: str
 
 
 def train_fatigue_detector(
@@ -37,22 +88,29 @@ def train_fatigue_detector(
         2 = Medium (51-75%)
         3 = High (76-100%)
     """
-    from sklearn.ensemble import RandomForestClassifier
-    
     model = RandomForestClassifier(
         n_estimators=50,
         max_depth=8,
         min_samples_leaf=5,
-        n_jobs=2,
+        n_jobs=-1,
         random_state=42,
         verbose=0
     )
     
+    # sklearn trees split on float32 features; cast once here instead of inside fit
+    # (a DataFrame keeps its column names for feature_names_in_)
+    if isinstance(X_train, pd.DataFrame):
+        X_train = X_train.astype(np.float32)
+    else:
+        X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+    
     print("[+] Training Driver Fatigue Detector...")
     model.fit(X_train, y_train)
+    _leaf_tables(model)
     
     if model_path:
-        joblib.dump(model, model_path)
+        # Uncompressed, protocol 5: array data is stored raw and can be memory-mapped on load
+        joblib.dump(model, model_path, compress=0, protocol=5)
         print(f"[+] Model saved to {model_path}")
     
     return model
@@ -69,7 +127,7 @@ def predict_fatigue(
     
     Args:
         model: Trained Random Forest model
-        X_test: Test features
+        X_test: Test features (DataFrame, Series, or 1-D/2-D ndarray in training order)
         heart_rate: Optional heart rate for safety check
         spo2_pct: Optional blood oxygen for safety check
     
@@ -81,73 +139,57 @@ def predict_fatigue(
         - confidence: Model confidence (0-1)
         - medical_alert: Safety alerts if any
     """
-    from sklearn.ensemble import RandomForestClassifier
-    import pandas as pd
-    import numpy as np
-    
     # Critical safety checks first
     medical_alerts = []
     
     if spo2_pct is not None and spo2_pct < 90:
-        medical_alerts.append({
-            "severity": "CRITICAL",
-            "alert": "HYPOXIA_RISK",
-            "value": spo2_pct,
-            "action": "IMMEDIATE_ALERT: Check oxygen, open ventilation"
-        })
+        medical_alerts.append(MedicalAlert("CRITICAL", "HYPOXIA_RISK", spo2_pct, _HYPOXIA_ACTION))
     
     if heart_rate is not None and heart_rate > 180:
-        medical_alerts.append({
-            "severity": "HIGH",
-            "alert": "HIGH_HR",
-            "value": heart_rate,
-            "action": "MEDICAL_CONCERN: Elevated heart rate, monitor closely"
-        })
-    
-    # Handle single row vs batch
+        medical_alerts.append(MedicalAlert("HIGH", "HIGH_HR", heart_rate, _HIGH_HR_ACTION))
+    
+    # Handle single row vs batch (a bare feature vector becomes one float32 row,
+    # the dtype the trees compare in)
     if isinstance(X_test, pd.Series):
         X_test = X_test.to_frame().T
+    elif isinstance(X_test, np.ndarray) and X_test.ndim == 1:
+        X_test = X_test.astype(np.float32).reshape(1, -1)
     
-    # Get ML prediction
-    prediction = model.predict(X_test)[0] if len(X_test) == 1 else model.predict(X_test)[0]
-    prediction_proba = model.predict_proba(X_test)[0] if len(X_test) == 1 else model.predict_proba(X_test)[0]
+    # Get ML prediction: one forest pass (compiled library when attached), class =
+    # argmax of the probabilities (exactly what model.predict computes)
+    prediction_proba = compiled_predict(model, X_test)
+    if prediction_proba is None:
+        prediction_proba = _forest_predict_proba(model, X_test)
+    prediction_proba = prediction_proba[0]
+    prediction = model.classes_[prediction_proba.argmax()]
     
     confidence = float(prediction_proba.max())
     
     # Convert to percentage (0-100)
-    # Each class covers ~25% range
-    class_to_pct = {0: 12.5, 1: 37.5, 2: 62.5, 3: 87.5}
-    fatigue_pct = float(class_to_pct[prediction])
+    fatigue_pct = float(_CLASS_TO_PCT[prediction])
     
     # Add uncertainty to percentage
     uncertainty = (1.0 - confidence) * 25
     fatigue_pct = fatigue_pct + uncertainty
     
-    # Determine action based on level
-    actions = {
-        0: "✓ Normal operation - monitor routine",
-        1: "⚠ Low fatigue - monitor closely, suggest rest after lap",
-        2: "⚠ Medium fatigue - warning alert, recommend pit stop for evaluation",
-        3: "🚨 High fatigue - recommend race abort or driver change"
-    }
-    
     # Override with critical medical alerts
     if medical_alerts:
-        action = "🚨 MEDICAL ALERT - " + medical_alerts[0]["action"]
+        action = "🚨 MEDICAL ALERT - " + medical_alerts[0].action
         # Auto-escalate fatigue level for medical reasons
         if spo2_pct is not None and spo2_pct < 90:
             prediction = 3
             fatigue_pct = 100
     else:
-        action = actions[prediction]
+        # Determine action based on level
+        action = _ACTIONS[prediction]
     
     return {
         "fatigue_level": int(prediction),
         "fatigue_pct": float(np.clip(fatigue_pct, 0, 100)),
         "action": action,
         "confidence": float(confidence),
-        "medical_alerts": medical_alerts,
-        "level_names": ["None", "Low", "Medium", "High"][prediction]
+        "medical_alerts": [asdict(alert) for alert in medical_alerts],
+        "level_names": _LEVEL_NAMES[prediction]
     }
 
 
@@ -169,44 +211,254 @@ def predict_fatigue_batch(
     Returns:
         Batch results
     """
-    from sklearn.ensemble import RandomForestClassifier
-    import pandas as pd
-    
-    predictions = model.predict(X_batch)
-    prediction_probas = model.predict_proba(X_batch)
-    
-    fatigue_pcts = []
-    confidences = []
-    medical_alerts_list = []
-    
-    for i, (pred, proba) in enumerate(zip(predictions, prediction_probas)):
-        conf = float(proba.max())
-        class_to_pct = {0: 12.5, 1: 37.5, 2: 62.5, 3: 87.5}
-        fatigue_pct = class_to_pct[pred] + (1.0 - conf) * 25
-        
-        confidences.append(conf)
-        fatigue_pcts.append(np.clip(fatigue_pct, 0, 100))
-        
-        # Check medical alerts
-        alerts = []
-        if spo2_col and X_batch[spo2_col].iloc[i] < 90:
-            alerts.append("HYPOXIA_RISK")
-        if heart_rate_col and X_batch[heart_rate_col].iloc[i] > 180:
-            alerts.append("HIGH_HR")
-        
-        medical_alerts_list.append(alerts)
+    # One forest pass: classes follow from the probabilities exactly as in model.predict
+    prediction_probas = compiled_predict(model, X_batch)
+    if prediction_probas is None:
+        prediction_probas = _forest_predict_proba(model, X_batch)
+    predictions = model.classes_[prediction_probas.argmax(axis=1)]
+    
+    # Confidence and percentage for every row at once
+    confidences = prediction_probas.max(axis=1)
+    fatigue_pcts = np.clip(_CLASS_TO_PCT[predictions] + (1.0 - confidences) * 25, 0, 100)
+    
+    # Check medical alerts (column masks, lists only for flagged rows)
+    n_rows = len(predictions)
+    hypoxia = X_batch[spo2_col].to_numpy() < 90 if spo2_col else np.zeros(n_rows, dtype=bool)
+    high_hr = X_batch[heart_rate_col].to_numpy() > 180 if heart_rate_col else np.zeros(n_rows, dtype=bool)
+    
+    medical_alerts_list = [[] for _ in range(n_rows)]
+    for i in np.flatnonzero(hypoxia):
+        medical_alerts_list[i].append("HYPOXIA_RISK")
+    for i in np.flatnonzero(high_hr):
+        medical_alerts_list[i].append("HIGH_HR")
     
     return {
         "fatigue_levels": predictions.tolist(),
-        "fatigue_pcts": fatigue_pcts,
-        "confidences": confidences,
+        "fatigue_pcts": fatigue_pcts.tolist(),
+        "confidences": confidences.tolist(),
         "mean_fatigue": float(np.mean(fatigue_pcts)),
         "max_fatigue": float(np.max(fatigue_pcts)),
         "medical_alerts": medical_alerts_list,
-        "critical_count": sum(1 for alerts in medical_alerts_list if len(alerts) > 0)
+        "critical_count": int(np.count_nonzero(hypoxia | high_hr))
     }
 
 
+class FatigueStreamPredictor:
+    """
+    predict_fatigue for one telemetry tick at a time, without a DataFrame per tick
+    
+    The 7 features are written into one preallocated float32 row (training order)
+    that is reused for every call.
+    """
+    
+    __slots__ = ("_model", "_buf")
+    
+    def __init__(self, model: RandomForestClassifier):
+        """
+        Args:
+            model: Trained Random Forest model (fitted on the 7 features in order)
+        """
+        self._model = model
+        self._buf = np.empty((1, 7), dtype=np.float32)
+    
+    def predict(
+        self,
+        heart_rate_bpm: float,
+        spo2_pct: float,
+        throttle_variance: float,
+        steering_oscillation: float,
+        elapsed_time: float,
+        lap_time_variance: float,
+        cabin_temp: float
+    ) -> Dict[str, Any]:
+        """
+        Predict fatigue for one tick
+        
+        Returns:
+            predict_fatigue result, with heart rate and SpO2 also used for the
+            medical safety checks
+        """
+        row = self._buf[0]
+        row[0] = heart_rate_bpm
+        row[1] = spo2_pct
+        row[2] = throttle_variance
+        row[3] = steering_oscillation
+        row[4] = elapsed_time
+        row[5] = lap_time_variance
+        row[6] = cabin_temp
+        return predict_fatigue(self._model, self._buf, heart_rate=heart_rate_bpm, spo2_pct=spo2_pct)
+
+
+def _forest_predict_proba(model: RandomForestClassifier, X: pd.DataFrame) -> np.ndarray:
+    """
+    model.predict_proba, through the leaf tables for small inputs
+    
+    The forest walks its trees in a joblib thread pool of model.n_jobs workers
+    (tree traversal releases the GIL), after validating the input per call. Below
+    THREAD_HINT_ROW_CUTOFF rows that overhead dominates, so arrays (or DataFrames
+    with exactly the training columns) of finite values go straight to each tree's
+    apply() on the calling thread and the leaf probabilities are summed in estimator
+    order, as model.predict_proba does with n_jobs=1. From FOREST_KERNEL_ROW_CUTOFF
+    rows, such input goes to the Numba traverser instead (same sums, parallel over
+    rows). Anything else, including input sklearn would reject, goes to
+    model.predict_proba.
+    
+    Args:
+        model: Trained Random Forest model
+        X: Input features
+    
+    Returns:
+        Class probabilities, one row per sample
+    """
+    use_kernel = NUMBA_AVAILABLE and len(X) >= FOREST_KERNEL_ROW_CUTOFF
+    if len(X) >= THREAD_HINT_ROW_CUTOFF and not use_kernel:
+        return model.predict_proba(X)
+    
+    if isinstance(X, pd.DataFrame):
+        feature_names = getattr(model, "feature_names_in_", None)
+        if feature_names is None or list(X.columns) != list(feature_names):
+            return model.predict_proba(X)  # sklearn validates the columns
+        X = X.to_numpy(dtype=np.float32)
+    
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    if X.ndim != 2 or X.shape[1] != model.n_features_in_ or not np.isfinite(X).all():
+        return model.predict_proba(X)
+    
+    if use_kernel:
+        return _forest_proba_kernel(X, *_forest_arrays(model))
+    
+    leaf_tables = _leaf_tables(model)
+    proba = np.zeros((X.shape[0], len(model.classes_)))
+    for tree, table in leaf_tables:
+        proba += table[tree.apply(X)]
+    proba /= len(leaf_tables)
+    return proba
+
+
+def _leaf_tables(model: RandomForestClassifier) -> list:
+    """
+    Per-tree (tree_, node class probabilities) pairs, cached per model
+    
+    The table is exactly what each tree's predict_proba returns for a sample ending
+    in that node; the cache is rebuilt if the model is refit.
+    
+    Args:
+        model: Trained Random Forest model
+    
+    Returns:
+        List of (sklearn Tree, (n_nodes, n_classes) float64 array)
+    """
+    cached = _LEAF_TABLES.get(model)
+    if cached is None or cached[0] is not model.estimators_:
+        n_classes = len(model.classes_)
+        tables = []
+        for estimator in model.estimators_:
+            # Normalized like DecisionTreeClassifier.predict_proba: node values are
+            # weighted class counts before scikit-learn 1.4, fractions after
+            table = np.array(estimator.tree_.value[:, 0, :n_classes], dtype=np.float64)
+            normalizer = table.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            table /= normalizer
+            tables.append((estimator.tree_, table))
+        cached = (model.estimators_, tables)
+        _LEAF_TABLES[model] = cached
+    return cached[1]
+
+
+def _forest_arrays(model: RandomForestClassifier) -> Tuple[Any, ...]:
+    """
+    All trees stacked into padded (n_trees, max_nodes) arrays, cached per model
+    
+    Leaves point both children at themselves (feature 0, threshold +inf), so a walk
+    of max_depth steps ends on the leaf for any finite row with no branch on leaf
+    tests. Thresholds stay float64 and values are the leaf tables, so the traversal
+    makes exactly sklearn's comparisons and sums; the cache is rebuilt if the model
+    is refit.
+    
+    Args:
+        model: Trained Random Forest model
+    
+    Returns:
+        (feature, threshold, children_left, children_right, value, max_depth)
+    """
+    cached = _FOREST_ARRAYS.get(model)
+    if cached is None or cached[0] is not model.estimators_:
+        leaf_tables = _leaf_tables(model)
+        n_trees = len(leaf_tables)
+        max_nodes = max(tree.node_count for tree, _ in leaf_tables)
+        
+        nodes = np.arange(max_nodes)
+        feature = np.zeros((n_trees, max_nodes), dtype=np.intp)
+        threshold = np.full((n_trees, max_nodes), np.inf)
+        children_left = np.tile(nodes, (n_trees, 1))
+        children_right = np.tile(nodes, (n_trees, 1))
+        value = np.zeros((n_trees, max_nodes, len(model.classes_)), dtype=np.float64)
+        for t, (tree, table) in enumerate(leaf_tables):
+            split = np.flatnonzero(tree.children_left != -1)
+            feature[t, split] = tree.feature[split]
+            threshold[t, split] = tree.threshold[split]
+            children_left[t, split] = tree.children_left[split]
+            children_right[t, split] = tree.children_right[split]
+            value[t, :tree.node_count] = table
+        max_depth = max(tree.max_depth for tree, _ in leaf_tables)
+        
+        cached = (model.estimators_, (feature, threshold, children_left, children_right, value, max_depth))
+        _FOREST_ARRAYS[model] = cached
+    return cached[1]
+
+
+@njit(cache=True, parallel=True)
+def _forest_proba_kernel(
+    X: np.ndarray,
+    feature: np.ndarray,
+    threshold: np.ndarray,
+    children_left: np.ndarray,
+    children_right: np.ndarray,
+    value: np.ndarray,
+    max_depth: int
+) -> np.ndarray:
+    """
+    Random forest predict_proba, blocks of rows walked in parallel
+    
+    Args:
+        X: float32 features (n_rows, n_features), finite
+        feature, threshold, children_left, children_right, value, max_depth: From _forest_arrays
+    
+    Returns:
+        Class probabilities (n_rows, n_classes)
+    """
+    n_rows = X.shape[0]
+    n_trees = feature.shape[0]
+    n_classes = value.shape[2]
+    proba = np.zeros((n_rows, n_classes))
+    
+    # Within a block, tree by tree so each tree's arrays stay in cache (per row the
+    # sum still runs in estimator order)
+    block = 256
+    for b in prange((n_rows + block - 1) // block):
+        start = b * block
+        stop = min(start + block, n_rows)
+        for t in range(n_trees):
+            tree_feature = feature[t]
+            tree_threshold = threshold[t]
+            tree_left = children_left[t]
+            tree_right = children_right[t]
+            for i in range(start, stop):
+                node = 0
+                for _ in range(max_depth):
+                    if X[i, tree_feature[node]] <= tree_threshold[node]:
+                        node = tree_left[node]
+                    else:
+                        node = tree_right[node]
+                for c in range(n_classes):
+                    proba[i, c] += value[t, node, c]
+        for i in range(start, stop):
+            for c in range(n_classes):
+                proba[i, c] /= n_trees
+    
+    return proba
+
+
 def _calculate_throttle_smoothness(throttle_history: np.ndarray) -> float:
     """
     Calculate throttle variance (control smoothness)
@@ -217,16 +469,11 @@ def _calculate_throttle_smoothness(throttle_history: np.ndarray) -> float:
     Returns:
         Variance score (higher = less smooth)
     """
-    import numpy as np
-    
     if len(throttle_history) < 2:
         return 0.0
     
-    # Calculate rate of change
-    throttle_diff = np.abs(np.diff(throttle_history))
-    variance = float(np.std(throttle_diff))
-    
-    return variance
+    # Std of the absolute rate of change
+    return float(_abs_diff_std(np.asarray(throttle_history, dtype=np.float64)))
 
 
 def _calculate_steering_oscillation(steering_history: np.ndarray) -> float:
@@ -239,16 +486,46 @@ def _calculate_steering_oscillation(steering_history: np.ndarray) -> float:
     Returns:
         Oscillation score (higher = more oscillation)
     """
-    import numpy as np
-    
     if len(steering_history) < 2:
         return 0.0
     
-    # Calculate steering angle changes
-    steering_diff = np.abs(np.diff(steering_history))
-    oscillation = float(np.std(steering_diff))
+    # Std of the absolute steering angle changes
+    return float(_abs_diff_std(np.asarray(steering_history, dtype=np.float64)))
+
+
+@njit(cache=True)
+def _abs_diff_std_kernel(x: np.ndarray) -> float:
+    """
+    np.std(np.abs(np.diff(x))) without the two temporary arrays
+    
+    Two passes over x (mean, then squared deviations) like np.std, rather than a
+    sum/sum-of-squares pass that cancels badly for near-constant changes.
+    
+    Args:
+        x: History of at least 2 values
     
-    return oscillation
+    Returns:
+        Population std of the absolute successive differences
+    """
+    n = x.shape[0] - 1
+    total = 0.0
+    for i in range(1, x.shape[0]):
+        total += abs(x[i] - x[i - 1])
+    mean = total / n
+    
+    squares = 0.0
+    for i in range(1, x.shape[0]):
+        deviation = abs(x[i] - x[i - 1]) - mean
+        squares += deviation * deviation
+    return np.sqrt(squares / n)
+
+
+def _abs_diff_std_numpy(x: np.ndarray) -> float:
+    """NumPy version of _abs_diff_std_kernel, used when Numba is not installed"""
+    return np.std(np.abs(np.diff(x)))
+
+
+_abs_diff_std = _abs_diff_std_kernel if NUMBA_AVAILABLE else _abs_diff_std_numpy
 
 
 def estimate_fatigue_level_from_sensors(
@@ -275,12 +552,44 @@ def estimate_fatigue_level_from_sensors(
     Returns:
         Estimated fatigue components
     """
-    import numpy as np
+    (fatigue_pct, level, hr_normalized, spo2_normalized, control_score,
+     time_fatigue, consistency_score, heat_score) = _fatigue_score_kernel(
+        float(heart_rate), float(spo2_pct), float(throttle_variance), float(steering_oscillation),
+        float(elapsed_time_minutes), float(lap_time_variance), float(cabin_temp)
+    )
     
+    return {
+        "estimated_fatigue_pct": fatigue_pct,
+        "estimated_level": level,
+        "hr_contribution": hr_normalized,
+        "spo2_contribution": spo2_normalized,
+        "control_contribution": control_score,
+        "time_contribution": time_fatigue,
+        "consistency_contribution": consistency_score,
+        "heat_contribution": heat_score
+    }
+
+
+@njit(cache=True)
+def _fatigue_score_kernel(
+    heart_rate: float,
+    spo2_pct: float,
+    throttle_variance: float,
+    steering_oscillation: float,
+    elapsed_time_minutes: float,
+    lap_time_variance: float,
+    cabin_temp: float
+) -> Tuple[float, int, float, float, float, float, float, float]:
+    """
+    Scalar heuristic behind estimate_fatigue_level_from_sensors (all float inputs)
+    
+    Returns:
+        (fatigue_pct, level, hr, spo2, control, time, consistency, heat contributions)
+    """
     fatigue_score = 0.0
     
     # HR contribution (max at 150 bpm, danger >180)
-    hr_normalized = np.clip(heart_rate / 150.0, 0.0, 2.0) * 25
+    hr_normalized = min(max(heart_rate / 150.0, 0.0), 2.0) * 25
     fatigue_score += hr_normalized
     
     # SpO2 contribution (should be >95%, drops with fatigue)
@@ -289,21 +598,21 @@ def estimate_fatigue_level_from_sensors(
     
     # Control smoothness (fatigue causes jitter)
     control_score = (throttle_variance + steering_oscillation) * 2
-    fatigue_score += np.clip(control_score, 0, 25)
+    fatigue_score += min(max(control_score, 0.0), 25.0)
     
     # Time factor (fatigue accumulates)
     time_fatigue = (elapsed_time_minutes / 120.0) * 15  # Over 2 hours accumulates
     fatigue_score += time_fatigue
     
     # Performance consistency (fatigue causes variance)
-    consistency_score = np.clip(lap_time_variance / 2.0, 0, 15)
+    consistency_score = min(max(lap_time_variance / 2.0, 0.0), 15.0)
     fatigue_score += consistency_score
     
     # Heat stress (high cabin temp)
-    heat_score = max(0, (cabin_temp - 25) * 0.5)
+    heat_score = max(0.0, (cabin_temp - 25) * 0.5)
     fatigue_score += heat_score
     
-    fatigue_pct = float(np.clip(fatigue_score, 0, 100))
+    fatigue_pct = min(max(fatigue_score, 0.0), 100.0)
     
     # Convert to level
     if fatigue_pct < 25:
@@ -315,32 +624,56 @@ def estimate_fatigue_level_from_sensors(
     else:
         level = 3
     
-    return {
-        "estimated_fatigue_pct": fatigue_pct,
-        "estimated_level": level,
-        "hr_contribution": float(hr_normalized),
-        "spo2_contribution": float(spo2_normalized),
-        "control_contribution": float(control_score),
-        "time_contribution": float(time_fatigue),
-        "consistency_contribution": float(consistency_score),
-        "heat_contribution": float(heat_score)
-    }
+    return (fatigue_pct, level, hr_normalized, spo2_normalized, control_score,
+            time_fatigue, consistency_score, heat_score)
 
 
-def load_fatigue_detector(model_path: str) -> RandomForestClassifier:
+def warm_fatigue_kernels():
+    """Trigger Numba compilation (or the on-disk cache load) of the fatigue kernels"""
+    if not NUMBA_AVAILABLE:
+        return
+    
+    _fatigue_score_kernel(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    _abs_diff_std_kernel(np.zeros(2, dtype=np.float64))
+    _forest_proba_kernel(
+        np.zeros((1, 1), dtype=np.float32),
+        np.zeros((1, 1), dtype=np.intp),
+        np.full((1, 1), np.inf),
+        np.zeros((1, 1), dtype=np.intp),
+        np.zeros((1, 1), dtype=np.intp),
+        np.ones((1, 1, 1), dtype=np.float64),
+        0
+    )
+
+
+def load_fatigue_detector(
+    model_path: str,
+    mmap_mode: str = None,
+    compiled_lib: str = None,
+    onnx_path: str = None
+) -> RandomForestClassifier:
     """
     Load pre-trained Fatigue Detector model from disk
     
     Args:
         model_path: Path to saved model
+        mmap_mode: Passed to joblib.load; "r" memory-maps array data read-only
+        compiled_lib: Optional library from utils.compiled_trees.export_compiled;
+                      predict_fatigue/predict_fatigue_batch take class probabilities
+                      from it when it loads, else from the sklearn forest
+        onnx_path: Optional graph from utils.compiled_trees.export_onnx, used the same
+                   way when compiled_lib is not given
     
     Returns:
         Loaded model
     """
-    import joblib
-    
-    model = joblib.load(model_path)
+    model = joblib.load(model_path, mmap_mode=mmap_mode)
     print(f"[+] Fatigue Detector loaded from {model_path}")
+    _leaf_tables(model)
+    if compiled_lib:
+        attach_compiled(model, compiled_lib)
+    elif onnx_path:
+        attach_onnx(model, onnx_path)
     return model
 
 
@@ -359,23 +692,31 @@ def calculate_fatigue_metrics(
     Returns:
         Metrics dictionary
     """
-    from sklearn.metrics import accuracy_score, recall_score, precision_score, f1_score
-    import numpy as np
+    # One pass over the labels; every metric comes from the confusion matrix.
+    # Macro averages run over the labels present in either array, like sklearn's.
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    labels = np.union1d(y_true, y_pred)
+    cm = confusion_matrix(y_true, y_pred, labels=labels)
     
-    accuracy = accuracy_score(y_true, y_pred)
+    tp = np.diag(cm)
+    true_sum = cm.sum(axis=1)
+    pred_sum = cm.sum(axis=0)
     
-    # Recall for high fatigue (level 3)
-    high_fatigue_true = (y_true == 3).astype(int)
-    high_fatigue_pred = (y_pred == 3).astype(int)
+    accuracy = tp.sum() / cm.sum()
+    precision = np.divide(tp, pred_sum, out=np.zeros(len(labels)), where=pred_sum > 0)
+    f1 = np.divide(2 * tp, true_sum + pred_sum, out=np.zeros(len(labels)), where=(true_sum + pred_sum) > 0)
     
-    if high_fatigue_true.sum() > 0:
-        high_fatigue_recall = high_fatigue_pred[high_fatigue_true == 1].sum() / high_fatigue_true.sum()
+    # Recall for high fatigue (level 3)
+    high = np.flatnonzero(labels == 3)
+    if len(high) and true_sum[high[0]] > 0:
+        high_fatigue_recall = tp[high[0]] / true_sum[high[0]]
     else:
         high_fatigue_recall = 1.0
     
     return {
         "Accuracy": float(accuracy),
         "High_Fatigue_Recall": float(high_fatigue_recall),
-        "Precision_Macro": float(precision_score(y_true, y_pred, average="macro", zero_division=0)),
-        "F1_Macro": float(f1_score(y_true, y_pred, average="macro", zero_division=0))
+        "Precision_Macro": float(np.mean(precision)),
+        "F1_Macro": float(np.mean(f1))
     }
@@ -6,12 +6,24 @@ Target Metrics: Efficiency +5-8% improvement
 Safety Rules: LEL >25% = EMERGENCY PURGE
 """
 
+import math
 import xgboost as xgb
 import numpy as np
 import pandas as pd
 from typing import Dict, Any
 import joblib
 
+from kerangka_ml.utils.jit import njit
+
+
+# Specialized physics models from make_h2_physics_model, keyed by
+# (tank_volume, purge_efficiency)
+_PHYSICS_MODELS = {}
+
+# Severity by number of LEL thresholds (15%, 20%, 25%) exceeded
+_SEVERITY_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+_SEVERITY_LEVELS_ARRAY = np.array(_SEVERITY_LEVELS)
+
 
 def train_h2_purge_scheduler(
     X_train: pd.DataFrame,
@@ -36,8 +48,6 @@ def train_h2_purge_scheduler(
         1 = PURGE_RECOMMENDED (20% <= LEL < 25%)
         2 = OPTIMAL_TIMING (model recommends right now)
     """
-    import xgboost as xgb
-    
     model = xgb.XGBClassifier(
         n_estimators=50,
         max_depth=4,
@@ -55,7 +65,8 @@ def train_h2_purge_scheduler(
     model.fit(X_train, y_train, verbose=False)
     
     if model_path:
-        joblib.dump(model, model_path)
+        # Uncompressed, protocol 5: array data is stored raw and can be memory-mapped on load
+        joblib.dump(model, model_path, compress=0, protocol=5)
         print(f"[+] Model saved to {model_path}")
     
     return model
@@ -82,9 +93,6 @@ def predict_h2_purge(
         - confidence: Model confidence (0-1)
         - reason: Explanation
     """
-    import xgboost as xgb
-    import pandas as pd
-    
     # Safety rules override (hard limits)
     if LEL_sensor_pct > 25:
         return {
@@ -100,9 +108,10 @@ def predict_h2_purge(
     if isinstance(X_test, pd.Series):
         X_test = X_test.to_frame().T
     
-    # Get ML prediction
-    prediction = model.predict(X_test)[0] if len(X_test) == 1 else model.predict(X_test)[0]
-    prediction_proba = model.predict_proba(X_test)[0] if len(X_test) == 1 else model.predict_proba(X_test)[0]
+    # Get ML prediction: one booster pass, class = argmax of the probabilities
+    # (what model.predict computes)
+    prediction_proba = model.predict_proba(X_test)[0]
+    prediction = int(prediction_proba.argmax())
     
     confidence = float(prediction_proba.max())
     
@@ -143,6 +152,117 @@ def predict_h2_purge(
     }
 
 
+def predict_h2_purge_batch(
+    model: xgb.XGBClassifier,
+    X_batch: pd.DataFrame,
+    LEL_arr: np.ndarray
+) -> Dict[str, Any]:
+    """
+    Batch H₂ purge prediction, same rules as predict_h2_purge for every row
+    
+    Args:
+        model: Trained XGBoost classifier
+        X_batch: Batch of test features (DataFrame or 2-D ndarray in training order)
+        LEL_arr: LEL sensor reading per row (0-100%)
+    
+    Returns:
+        Batch results (one list entry per row)
+    """
+    LEL_arr = np.asarray(LEL_arr, dtype=np.float64)
+    emergency = LEL_arr > 25
+    alert = LEL_arr > 20
+    
+    # The safety override decides emergency rows, so only the rest go through the
+    # booster (one pass; a DataFrame with exactly the training columns goes in as
+    # one contiguous float32 array). Emergency rows keep class 0 / confidence 1.0.
+    predictions = np.zeros(len(LEL_arr), dtype=np.intp)
+    confidences = np.ones(len(LEL_arr))
+    safe_idx = np.flatnonzero(~emergency)
+    if safe_idx.size:
+        if isinstance(X_batch, pd.DataFrame) and list(X_batch.columns) == model.get_booster().feature_names:
+            X_batch = X_batch.to_numpy(dtype=np.float32)
+        if isinstance(X_batch, pd.DataFrame):
+            X_safe = X_batch.iloc[safe_idx] if safe_idx.size < len(X_batch) else X_batch
+        else:
+            X_safe = np.ascontiguousarray(np.asarray(X_batch)[safe_idx], dtype=np.float32)
+        prediction_probas = model.predict_proba(X_safe)
+        predictions[safe_idx] = prediction_probas.argmax(axis=1)
+        confidences[safe_idx] = prediction_probas.max(axis=1)
+    
+    # Safety override and action mapping as masks (first matching condition wins)
+    conditions = [
+        emergency,
+        alert & (predictions == 2),
+        alert,
+        predictions == 1
+    ]
+    actions = np.select(
+        conditions,
+        ["EMERGENCY_PURGE", "PURGE_NOW", "PURGE_CONSIDER", "PURGE_RECOMMENDED"],
+        default="WAIT"
+    )
+    durations = np.select(conditions, [45, 30, 25, 20], default=0)
+    
+    predicted_post_efficiency = np.where(durations > 0, 1.0 + 0.05 + (0.03 * (LEL_arr / 25.0)), 1.0)
+    predicted_post_efficiency[emergency] = 0.0
+    
+    severities = _SEVERITY_LEVELS_ARRAY[(LEL_arr > 15).astype(np.intp) + alert + emergency]
+    
+    return {
+        "purge_recommend": actions.tolist(),
+        "optimal_duration": durations.tolist(),
+        "predicted_efficiency_post": predicted_post_efficiency.tolist(),
+        "confidence": confidences.tolist(),
+        "severity": severities.tolist(),
+        "emergency_count": int(np.count_nonzero(emergency))
+    }
+
+
+class H2PurgeStreamPredictor:
+    """
+    predict_h2_purge for one telemetry tick at a time, without a DataFrame per tick
+    
+    The 7 features are written into one preallocated float32 row (training order)
+    that is reused for every call.
+    """
+    
+    __slots__ = ("_model", "_buf")
+    
+    def __init__(self, model: xgb.XGBClassifier):
+        """
+        Args:
+            model: Trained XGBoost classifier (fitted on the 7 features in order)
+        """
+        self._model = model
+        self._buf = np.empty((1, 7), dtype=np.float32)
+    
+    def predict(
+        self,
+        LEL_sensor_pct: float,
+        h2_tank_pressure: float,
+        fuel_cell_temp: float,
+        h2_flow_rate: float,
+        time_since_last_purge: float,
+        ambient_humidity: float,
+        lap_progress: float
+    ) -> Dict[str, Any]:
+        """
+        Predict the purge action for one tick
+        
+        Returns:
+            predict_h2_purge result, with LEL_sensor_pct also used for the safety override
+        """
+        row = self._buf[0]
+        row[0] = LEL_sensor_pct
+        row[1] = h2_tank_pressure
+        row[2] = fuel_cell_temp
+        row[3] = h2_flow_rate
+        row[4] = time_since_last_purge
+        row[5] = ambient_humidity
+        row[6] = lap_progress
+        return predict_h2_purge(self._model, self._buf, LEL_sensor_pct)
+
+
 def _assess_h2_severity(LEL_pct: float) -> str:
     """
     Assess severity level based on LEL percentage
@@ -153,14 +273,8 @@ def _assess_h2_severity(LEL_pct: float) -> str:
     Returns:
         Severity level
     """
-    if LEL_pct > 25:
-        return "CRITICAL"
-    elif LEL_pct > 20:
-        return "HIGH"
-    elif LEL_pct > 15:
-        return "MEDIUM"
-    else:
-        return "LOW"
+    # int() so NumPy scalar comparisons add up instead of OR-ing as np.bool_
+    return _SEVERITY_LEVELS[int(LEL_pct > 15) + int(LEL_pct > 20) + int(LEL_pct > 25)]
 
 
 def h2_purge_physics_model(
@@ -188,8 +302,6 @@ def h2_purge_physics_model(
     Returns:
         Physics-based recommendation
     """
-    import numpy as np
-    
     # Constants (typical fuel cell system)
     TANK_VOLUME = 5.0  # liters
     PURGE_EFFICIENCY = 0.85  # 85% purge efficiency
@@ -220,6 +332,112 @@ def h2_purge_physics_model(
     }
 
 
+def h2_purge_physics_model_batch(
+    LEL_arr: np.ndarray,
+    P_arr: np.ndarray,
+    T_arr: np.ndarray,
+    flow_arr: np.ndarray,
+    dt_arr: np.ndarray
+) -> Dict[str, Any]:
+    """
+    h2_purge_physics_model over arrays of timesteps, without per-row branches
+    
+    Args:
+        LEL_arr: LEL readings (%)
+        P_arr: Tank pressures (bar)
+        T_arr: FC temperatures (°C)
+        flow_arr: Flow rates (L/min)
+        dt_arr: Seconds since last purge
+    
+    Returns:
+        Same keys as h2_purge_physics_model, one list entry per timestep
+    """
+    TANK_VOLUME = 5.0  # liters
+    PURGE_EFFICIENCY = 0.85  # 85% purge efficiency
+    
+    LEL_arr = np.asarray(LEL_arr, dtype=np.float64)
+    
+    h2_accumulation = np.asarray(flow_arr, dtype=np.float64) * (1 - PURGE_EFFICIENCY) * np.asarray(dt_arr, dtype=np.float64) / 60.0
+    lel_rise = (h2_accumulation / TANK_VOLUME) * 100.0
+    
+    temp_factor = 1.0 + (np.asarray(T_arr, dtype=np.float64) - 25.0) / 100.0
+    pressure_factor = np.asarray(P_arr, dtype=np.float64) / 30.0
+    adjusted_lel = (LEL_arr + (lel_rise * temp_factor)) * pressure_factor
+    rate = lel_rise * temp_factor * pressure_factor
+    
+    # fmax, like the scalar max(0, ...), turns a NaN time into 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_to_critical = np.where(rate > 0, np.fmax(0.0, (25.0 - adjusted_lel) / rate), 999.0)
+    
+    return {
+        "adjusted_LEL": adjusted_lel.tolist(),
+        "accumulation_rate": rate.tolist(),
+        "time_to_critical_minutes": time_to_critical.tolist(),
+        "physics_recommendation": np.where(adjusted_lel > 20, "URGENT", "MONITOR").tolist()
+    }
+
+
+def make_h2_physics_model(tank_volume: float = 5.0, purge_efficiency: float = 0.85):
+    """
+    h2_purge_physics_model specialized for one vehicle's tank and purge efficiency
+    
+    The constants are folded into a single LEL-rise coefficient and captured by a
+    Numba kernel, which compiles them in as literals (first call only). Results
+    match h2_purge_physics_model up to floating-point rounding.
+    
+    Args:
+        tank_volume: Tank volume (liters)
+        purge_efficiency: Fraction of H₂ removed per purge (0-1)
+    
+    Returns:
+        Function with the h2_purge_physics_model signature and result, cached per
+        (tank_volume, purge_efficiency)
+    """
+    key = (float(tank_volume), float(purge_efficiency))
+    physics_model = _PHYSICS_MODELS.get(key)
+    if physics_model is not None:
+        return physics_model
+    
+    # LEL % per (L/min * s) of flow: (1 - eff) / 60 s/min / tank_volume * 100 %
+    lel_rise_coef = (1.0 - key[1]) / 60.0 / key[0] * 100.0
+    
+    @njit
+    def kernel(LEL_sensor, h2_tank_pressure, fuel_cell_temp, h2_flow_rate, time_since_purge):
+        lel_rise = h2_flow_rate * time_since_purge * lel_rise_coef
+        temp_factor = 1.0 + (fuel_cell_temp - 25.0) / 100.0
+        pressure_factor = h2_tank_pressure / 30.0
+        adjusted_lel = (LEL_sensor + (lel_rise * temp_factor)) * pressure_factor
+        rate = lel_rise * temp_factor * pressure_factor
+        if rate > 0:
+            time_to_critical = (25.0 - adjusted_lel) / rate
+            if not time_to_critical > 0:
+                time_to_critical = 0.0  # Like max(0, ...), NaN included
+        else:
+            time_to_critical = 999.0
+        return adjusted_lel, rate, time_to_critical
+    
+    def physics_model(
+        LEL_sensor: float,
+        h2_tank_pressure: float,
+        fuel_cell_temp: float,
+        h2_flow_rate: float,
+        time_since_purge: float
+    ) -> Dict[str, Any]:
+        adjusted_lel, rate, time_to_critical = kernel(
+            float(LEL_sensor), float(h2_tank_pressure), float(fuel_cell_temp),
+            float(h2_flow_rate), float(time_since_purge)
+        )
+        return {
+            "adjusted_LEL": adjusted_lel,
+            "accumulation_rate": rate,
+            "time_to_critical_minutes": time_to_critical,
+            "physics_recommendation": "URGENT" if adjusted_lel > 20 else "MONITOR"
+        }
+    
+    _PHYSICS_MODELS[key] = physics_model
+    return physics_model
+
+
 def estimate_optimal_purge_duration(
     LEL_sensor: float,
     h2_flow_rate: float,
@@ -236,8 +454,6 @@ def estimate_optimal_purge_duration(
     Returns:
         Recommended purge duration in seconds
     """
-    import numpy as np
-    
     if LEL_sensor <= target_LEL:
         return 0
     
@@ -249,24 +465,23 @@ def estimate_optimal_purge_duration(
     delta_LEL = LEL_sensor - target_LEL
     minutes_needed = delta_LEL / (PURGE_EFFICIENCY_PER_MIN * flow_adjustment)
     
-    seconds = max(10, int(np.ceil(minutes_needed * 60)))
+    seconds = max(10, math.ceil(minutes_needed * 60))
     
     return min(seconds, 60)  # Cap at 60 seconds
 
 
-def load_h2_purge_scheduler(model_path: str) -> xgb.XGBClassifier:
+def load_h2_purge_scheduler(model_path: str, mmap_mode: str = None) -> xgb.XGBClassifier:
     """
     Load pre-trained H₂ Purge Scheduler model from disk
     
     Args:
         model_path: Path to saved model
+        mmap_mode: Passed to joblib.load; "r" memory-maps array data read-only
     
     Returns:
         Loaded model
     """
-    import joblib
-    
-    model = joblib.load(model_path)
+    model = joblib.load(model_path, mmap_mode=mmap_mode)
     print(f"[+] H₂ Purge Scheduler loaded from {model_path}")
     return model
 
@@ -287,8 +502,6 @@ def hybrid_h2_purge_decision(
     Returns:
         Final hybrid recommendation
     """
-    import pandas as pd
-    
     # Get ML prediction
     ml_result = predict_h2_purge(model, X_test, physics_override["adjusted_LEL"])
     
@@ -6,11 +6,40 @@ Target Metrics: DTW distance <5m, Lap time improvement +2%
 Key: No training needed - just store best lap trajectory
 """
 
+import math
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Any
+from typing import Any, Callable, Dict, List, Tuple
 import joblib
-from scipy.spatial.distance import euclidean
+from scipy.spatial import cKDTree
+
+from kerangka_ml.utils.jit import njit, prange, NUMBA_AVAILABLE
+
+
+# Single-position queries on trajectories shorter than this scan every waypoint:
+# one vectorized float32 pass beats cKDTree.query's per-call overhead below ~16k points
+KDTREE_MIN_POINTS = 16384
+
+# Best laps spanning more latitude than this (~11 km) are matched with haversine
+# distances: the flat projection's single longitude scale drifts over long routes
+GEODESIC_MIN_SPAN_DEG = 0.1
+
+# Sphere radius matching the 111 km per degree used by the flat projection
+_EARTH_RADIUS_M = 111000.0 * 180.0 / math.pi
+
+# Recommendation texts, shared by every prediction
+_PERFECT_LINE = "✓ Perfect line - maintain current racing line"
+_OFF_LINE_FAST = "⚠ Too far off line and too fast - reduce speed and correct path"
+_OFF_LINE = "⚠ Too far off line - adjust position to optimal line"
+_TOO_FAST = "⚠ Running faster than optimal - reduce throttle for efficiency"
+_TOO_SLOW = "↑ Running slower than optimal - increase speed slightly"
+_GOOD_ALIGNMENT = "✓ Good alignment with optimal line"
+
+# Models whose specialized predictor stays cached (oldest evicted first)
+PREDICTOR_CACHE_SIZE = 8
+
+# id(model) -> (model, predictor) for predict_racing_line
+_PREDICTORS: Dict[int, Tuple[Dict[str, Any], Callable[[Dict[str, float]], Dict[str, Any]]]] = {}
 
 
 def train_racing_line(
@@ -37,11 +66,8 @@ def train_racing_line(
         - best_lap_id: ID of best lap
         - best_lap_efficiency: Efficiency of best lap
         - best_trajectory: GPS trajectory of best lap
-        - model: Callable model object
+        - trajectory_hot: float32 x_m/y_m/speed arrays read by predictions
     """
-    import pandas as pd
-    import numpy as np
-    
     print("[+] Training Racing Line Optimizer...")
     
     # Group by lap and calculate lap efficiency
@@ -49,21 +75,17 @@ def train_racing_line(
         # Assume lap_id can be inferred from timestamp or sequence
         practice_laps["lap_id"] = 0
     
-    lap_stats = practice_laps.groupby("lap_id").agg({
-        efficiency_column: ["mean", "max", "std"],
-        "gps_lat": "count"
-    }).round(4)
-    
     # Select best lap by mean efficiency
-    best_lap_id = lap_stats[efficiency_column]["mean"].idxmax()
+    best_lap_id = practice_laps.groupby("lap_id")[efficiency_column].mean().idxmax()
     best_lap_data = practice_laps[practice_laps["lap_id"] == best_lap_id].copy()
     
     best_efficiency = best_lap_data[efficiency_column].mean()
     
-    # Extract trajectory
+    # Extract trajectory (full-precision record; predictions read trajectory_hot).
+    # GPS stays float64: float32 steps are ~1 m at typical longitudes.
     trajectory = {
-        "gps_lat": best_lap_data["gps_lat"].values,
-        "gps_lon": best_lap_data["gps_lon"].values,
+        "gps_lat": np.ascontiguousarray(best_lap_data["gps_lat"].to_numpy(), dtype=np.float64),
+        "gps_lon": np.ascontiguousarray(best_lap_data["gps_lon"].to_numpy(), dtype=np.float64),
         "speed": best_lap_data["speed"].values,
         "heading": best_lap_data["heading"].values,
         "timestamp": best_lap_data["timestamp"].values if "timestamp" in best_lap_data.columns else None,
@@ -76,11 +98,15 @@ def train_racing_line(
         "best_trajectory": trajectory,
         "num_points": len(trajectory["gps_lat"])
     }
+    _build_waypoint_index(model)
     
     if model_path:
-        joblib.dump(model, model_path)
+        # Uncompressed, protocol 5: array data is stored raw and can be memory-mapped on load
+        joblib.dump(model, model_path, compress=0, protocol=5)
         print(f"[+] Racing Line Model saved to {model_path}")
     
+    _cache_predictor(model)
+    
     print(f"[+] Best lap selected: {best_lap_id} (Efficiency: {best_efficiency:.2f} km/kWh)")
     
     return model
@@ -108,57 +134,182 @@ def predict_racing_line(
         - recommendation: Text recommendation
         - confidence: Confidence score (0-1)
     """
-    import numpy as np
-    from scipy.spatial.distance import euclidean
+    entry = _PREDICTORS.get(id(model))
+    if entry is None or entry[0] is not model:
+        entry = _cache_predictor(model)  # Model built by hand or evicted from the cache
+    return entry[1](current_position)
+
+
+def _cache_predictor(model: Dict[str, Any]) -> Tuple[Dict[str, Any], Callable[[Dict[str, float]], Dict[str, Any]]]:
+    """
+    Build the specialized predictor for a model and cache it by id(model)
     
-    best_trajectory = model["best_trajectory"]
+    The entry keeps a reference to the model, so an id reused by another dict is
+    detected by the identity check in predict_racing_line. The cache is kept out
+    of the model dict (a local function cannot be pickled).
     
-    # Find nearest point in best trajectory using Euclidean distance
-    lat_best = best_trajectory["gps_lat"]
-    lon_best = best_trajectory["gps_lon"]
+    Args:
+        model: Racing line model
     
-    current_lat = current_position["gps_lat"]
-    current_lon = current_position["gps_lon"]
+    Returns:
+        (model, predictor) cache entry
+    """
+    entry = (model, make_racing_line_predictor(model))
+    _PREDICTORS.pop(id(model), None)
+    while len(_PREDICTORS) >= PREDICTOR_CACHE_SIZE:
+        del _PREDICTORS[next(iter(_PREDICTORS))]  # Evict the oldest model
+    _PREDICTORS[id(model)] = entry
+    return entry
+
+
+def make_racing_line_predictor(model: Dict[str, Any]) -> Callable[[Dict[str, float]], Dict[str, Any]]:
+    """
+    Specialize predict_racing_line for one model
     
-    # Convert GPS to approximate meters (rough conversion)
-    # 1 degree ≈ 111 km
-    distances = []
-    for i in range(len(lat_best)):
-        lat_diff = (lat_best[i] - current_lat) * 111000
-        lon_diff = (lon_best[i] - current_lon) * 111000 * np.cos(np.radians(current_lat))
-        dist = np.sqrt(lat_diff**2 + lon_diff**2)
-        distances.append(dist)
+    The trajectory arrays, projection constants and kd-tree-or-scan choice are bound
+    once as closure variables, so a prediction does no model dict lookups.
     
-    distances = np.array(distances)
-    nearest_idx = np.argmin(distances)
-    deviation_meters = float(distances[nearest_idx])
+    Args:
+        model: Racing line model (its waypoint index is built if missing)
     
-    # Speed deviation
-    best_speed_at_pos = best_trajectory["speed"][nearest_idx]
-    current_speed = current_position["speed"]
-    speed_deviation = float(current_speed - best_speed_at_pos)
+    Returns:
+        Function mapping current_position to the predict_racing_line result
+    """
+    if "geodesic" not in model:
+        _build_waypoint_index(model)  # Model saved by an older version
+    
+    trajectory_hot = model["trajectory_hot"]
+    x_best = trajectory_hot["x_m"]
+    y_best = trajectory_hot["y_m"]
+    speed_best = trajectory_hot["speed"]
+    lat0, lon0 = model["origin"]
+    lon_scale_m = model["lon_scale_m"]
+    num_points = model["num_points"]
+    tree = model["kdtree"] if model["kdtree"].n >= KDTREE_MIN_POINTS else None
+    geodesic = model["geodesic"]
+    if geodesic:
+        lat_rad = trajectory_hot["lat_rad"]
+        lon_rad = trajectory_hot["lon_rad"]
+        cos_lat = trajectory_hot["cos_lat"]
+    
+    def predict(current_position: Dict[str, float]) -> Dict[str, Any]:
+        # Position in local metres (same projection as _project_xy)
+        x_m = (current_position["gps_lon"] - lon0) * lon_scale_m
+        y_m = (current_position["gps_lat"] - lat0) * 111000.0
+        
+        if geodesic:
+            nearest_idx, hav = _haversine_argmin(
+                math.radians(current_position["gps_lat"]),
+                math.radians(current_position["gps_lon"]),
+                lat_rad,
+                lon_rad,
+                cos_lat
+            )
+            nearest_idx = int(nearest_idx)
+            deviation_meters = _haversine_to_meters(hav)
+        elif tree is not None:
+            deviation_meters, nearest_idx = tree.query((x_m, y_m))
+            deviation_meters = float(deviation_meters)
+            nearest_idx = int(nearest_idx)
+        else:
+            # Short trajectories: scan every waypoint. Squared distances rank the same
+            # as distances, so only the nearest one gets a sqrt.
+            dx = x_best - np.float32(x_m)
+            dy = y_best - np.float32(y_m)
+            dist_sq = dx * dx + dy * dy
+            nearest_idx = int(dist_sq.argmin())
+            deviation_meters = math.sqrt(dist_sq[nearest_idx])
+        
+        # Speed deviation
+        speed_deviation = float(current_position["speed"]) - float(speed_best[nearest_idx])
+        
+        # Confidence based on deviation
+        # Less than 5m = high confidence
+        deviation_confidence = 1.0 - min(deviation_meters / 10.0, 1.0)
+        
+        # Generate recommendation
+        recommendation = _generate_racing_line_recommendation(
+            deviation_meters,
+            speed_deviation,
+            nearest_idx,
+            num_points
+        )
+        
+        return {
+            "deviation_meters": deviation_meters,
+            "speed_deviation": speed_deviation,
+            "sector_time_diff": abs(speed_deviation) * 0.1,  # Approximation
+            "recommendation": recommendation,
+            "confidence": float(deviation_confidence),
+            "nearest_waypoint_idx": nearest_idx,
+            "progress_pct": float(nearest_idx / num_points * 100)
+        }
     
-    # Confidence based on deviation
-    # Less than 5m = high confidence
-    deviation_confidence = 1.0 - min(deviation_meters / 10.0, 1.0)
+    return predict
+
+
+def _build_waypoint_index(model: Dict[str, Any]) -> None:
+    """
+    Add the local-metre projection, hot arrays and kd-tree of the best trajectory to a model
     
-    # Generate recommendation
-    recommendation = _generate_racing_line_recommendation(
-        deviation_meters,
-        speed_deviation,
-        nearest_idx,
-        len(lat_best)
-    )
+    The projection is equirectangular around the lap's mean position, scaling
+    longitude at its mean latitude, so predictions do no trig per call. Laps spanning
+    GEODESIC_MIN_SPAN_DEG or more of latitude are also marked geodesic and get
+    radian coordinates and their cosines for the haversine kernels.
     
-    return {
-        "deviation_meters": deviation_meters,
-        "speed_deviation": speed_deviation,
-        "sector_time_diff": abs(speed_deviation) * 0.1,  # Approximation
-        "recommendation": recommendation,
-        "confidence": float(deviation_confidence),
-        "nearest_waypoint_idx": nearest_idx,
-        "progress_pct": float(nearest_idx / len(lat_best) * 100)
+    Args:
+        model: Model dict with best_trajectory; gains lon_scale_m, origin,
+               trajectory_hot (contiguous float32 x_m/y_m metres and speed), kdtree
+               and geodesic
+    """
+    trajectory = model["best_trajectory"]
+    lat = np.asarray(trajectory["gps_lat"], dtype=np.float64)
+    lon = np.asarray(trajectory["gps_lon"], dtype=np.float64)
+    
+    model["lon_scale_m"] = float(111000.0 * np.cos(np.radians(lat.mean())))
+    model["origin"] = (float(lat.mean()), float(lon.mean()))
+    
+    x_m, y_m = _project_xy(lat, lon, model)
+    # Only what the nearest-waypoint and speed math touch; heading, timestamps and
+    # raw GPS stay in best_trajectory
+    trajectory_hot = {
+        "x_m": np.ascontiguousarray(x_m, dtype=np.float32),
+        "y_m": np.ascontiguousarray(y_m, dtype=np.float32),
+        "speed": np.ascontiguousarray(trajectory["speed"], dtype=np.float32)
     }
+    model["trajectory_hot"] = trajectory_hot
+    
+    # kd-tree in local metres for O(log N) nearest-waypoint queries
+    model["kdtree"] = cKDTree(np.column_stack([trajectory_hot["x_m"], trajectory_hot["y_m"]]))
+    
+    geodesic = bool(len(lat) > 0 and np.ptp(lat) >= GEODESIC_MIN_SPAN_DEG)
+    if geodesic:
+        trajectory_hot["lat_rad"] = np.radians(lat)
+        trajectory_hot["lon_rad"] = np.radians(lon)
+        trajectory_hot["cos_lat"] = np.cos(trajectory_hot["lat_rad"])
+    model["geodesic"] = geodesic
+
+
+def _project_xy(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    model: Dict[str, Any]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Project GPS coordinates to local metres around the model's origin (equirectangular)
+    
+    Args:
+        lat: Latitude(s) in degrees
+        lon: Longitude(s) in degrees
+        model: Model dict with origin and lon_scale_m
+    
+    Returns:
+        (x, y) in metres east and north of the origin
+    """
+    lat0, lon0 = model["origin"]
+    x_m = (lon - lon0) * model["lon_scale_m"]
+    y_m = (lat - lat0) * 111000.0
+    return x_m, y_m
 
 
 def _generate_racing_line_recommendation(
@@ -180,22 +331,24 @@ def _generate_racing_line_recommendation(
         Text recommendation
     """
     
+    # A short branch chain beats a computed table index here: each comparison
+    # short-circuits, while a bucket index evaluates all five every call
     if deviation < 2.0 and abs(speed_dev) < 2.0:
-        return "✓ Perfect line - maintain current racing line"
+        return _PERFECT_LINE
     
     if deviation > 10.0:
         if speed_dev > 0:
-            return "⚠ Too far off line and too fast - reduce speed and correct path"
+            return _OFF_LINE_FAST
         else:
-            return "⚠ Too far off line - adjust position to optimal line"
+            return _OFF_LINE
     
     if speed_dev > 5.0:
-        return "⚠ Running faster than optimal - reduce throttle for efficiency"
+        return _TOO_FAST
     
     if speed_dev < -5.0:
-        return "↑ Running slower than optimal - increase speed slightly"
+        return _TOO_SLOW
     
-    return "✓ Good alignment with optimal line"
+    return _GOOD_ALIGNMENT
 
 
 def racing_line_batch_analysis(
@@ -213,49 +366,184 @@ def racing_line_batch_analysis(
     Returns:
         Analysis summary
     """
-    import pandas as pd
-    import numpy as np
+    lat_q = position_history["gps_lat"].to_numpy(dtype=np.float64)
+    lon_q = position_history["gps_lon"].to_numpy(dtype=np.float64)
+    speed_q = position_history["speed"].to_numpy(dtype=np.float64)
     
-    results = []
-    for idx, row in position_history.iterrows():
-        current_pos = {
-            "gps_lat": row["gps_lat"],
-            "gps_lon": row["gps_lon"],
-            "speed": row["speed"],
-            "heading": row["heading"]
-        }
-        result = predict_racing_line(model, current_pos)
-        results.append(result)
-    
-    deviation_array = np.array([r["deviation_meters"] for r in results])
-    speed_dev_array = np.array([r["speed_deviation"] for r in results])
+    nearest_idx, deviation_array = _nearest_waypoints(model, lat_q, lon_q)
+    speed_dev_array = speed_q - model["trajectory_hot"]["speed"][nearest_idx]
     
     return {
         "mean_deviation": float(deviation_array.mean()),
         "max_deviation": float(deviation_array.max()),
         "mean_speed_deviation": float(speed_dev_array.mean()),
         "points_near_optimal": int((deviation_array < 5).sum()),
-        "lap_efficiency_estimate": f"{(len(results) - deviation_array.sum()) / len(results) * 100:.1f}%"
+        "lap_efficiency_estimate": f"{(len(deviation_array) - deviation_array.sum()) / len(deviation_array) * 100:.1f}%"
     }
 
 
-def load_racing_line(model_path: str) -> Dict[str, Any]:
+def _nearest_waypoints(
+    model: Dict[str, Any],
+    lat_q: np.ndarray,
+    lon_q: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nearest best-lap waypoint for every position at once, through the model's kd-tree
+    (haversine kernels for geodesic models)
+    
+    Args:
+        model: Racing line model
+        lat_q: Position latitudes (degrees)
+        lon_q: Position longitudes (degrees)
+    
+    Returns:
+        (waypoint indices, distances in metres)
+    """
+    if "geodesic" not in model:
+        _build_waypoint_index(model)  # Model saved by an older version
+    
+    if model["geodesic"]:
+        trajectory_hot = model["trajectory_hot"]
+        nearest_idx, hav = _haversine_nearest_batch(
+            np.radians(lat_q),
+            np.radians(lon_q),
+            trajectory_hot["lat_rad"],
+            trajectory_hot["lon_rad"],
+            trajectory_hot["cos_lat"]
+        )
+        return nearest_idx, 2.0 * _EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(hav, 1.0)))
+    
+    x_m, y_m = _project_xy(lat_q, lon_q, model)
+    deviations, nearest_idx = model["kdtree"].query(np.column_stack([x_m, y_m]), workers=-1)
+    return nearest_idx, deviations
+
+
+def load_racing_line(model_path: str, mmap_mode: str = None) -> Dict[str, Any]:
     """
     Load pre-trained Racing Line model from disk
     
     Args:
         model_path: Path to saved model
+        mmap_mode: Passed to joblib.load; "r" memory-maps array data read-only
     
     Returns:
         Loaded model
     """
-    import joblib
-    
-    model = joblib.load(model_path)
+    model = joblib.load(model_path, mmap_mode=mmap_mode)
+    _cache_predictor(model)
     print(f"[+] Racing Line Model loaded from {model_path}")
     return model
 
 
+def _haversine_to_meters(hav: float) -> float:
+    """
+    Great-circle distance from the haversine term a = sin²(Δφ/2) + cosφ1·cosφ2·sin²(Δλ/2)
+    
+    Args:
+        hav: Haversine term (0-1)
+    
+    Returns:
+        Distance (m)
+    """
+    return 2.0 * _EARTH_RADIUS_M * math.asin(math.sqrt(min(hav, 1.0)))
+
+
+@njit(cache=True, fastmath=True)
+def _haversine_argmin_kernel(
+    q_lat: float,
+    q_lon: float,
+    lat_rad: np.ndarray,
+    lon_rad: np.ndarray,
+    cos_lat: np.ndarray
+) -> Tuple[int, float]:
+    """
+    Nearest waypoint by great-circle distance
+    
+    The haversine term is monotonic in distance, so waypoints are compared on it
+    directly; asin/sqrt are left to the caller for the winner only.
+    
+    Args:
+        q_lat, q_lon: Position (radians)
+        lat_rad, lon_rad: Waypoints (radians)
+        cos_lat: Cosine of each waypoint latitude
+    
+    Returns:
+        (waypoint index, haversine term)
+    """
+    cos_q = np.cos(q_lat)
+    best = np.inf
+    best_idx = 0
+    for i in range(lat_rad.shape[0]):
+        sin_dlat = np.sin((lat_rad[i] - q_lat) * 0.5)
+        sin_dlon = np.sin((lon_rad[i] - q_lon) * 0.5)
+        hav = sin_dlat * sin_dlat + cos_q * cos_lat[i] * sin_dlon * sin_dlon
+        if hav < best:
+            best = hav
+            best_idx = i
+    return best_idx, best
+
+
+def _haversine_argmin_numpy(
+    q_lat: float,
+    q_lon: float,
+    lat_rad: np.ndarray,
+    lon_rad: np.ndarray,
+    cos_lat: np.ndarray
+) -> Tuple[int, float]:
+    """NumPy version of _haversine_argmin_kernel, used when Numba is not installed"""
+    sin_dlat = np.sin((lat_rad - q_lat) * 0.5)
+    sin_dlon = np.sin((lon_rad - q_lon) * 0.5)
+    hav = sin_dlat * sin_dlat + math.cos(q_lat) * cos_lat * sin_dlon * sin_dlon
+    best_idx = int(hav.argmin())
+    return best_idx, float(hav[best_idx])
+
+
+@njit(cache=True, parallel=True, fastmath=True)
+def _haversine_nearest_batch_kernel(
+    q_lat: np.ndarray,
+    q_lon: np.ndarray,
+    lat_rad: np.ndarray,
+    lon_rad: np.ndarray,
+    cos_lat: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    _haversine_argmin_kernel for many positions, in parallel across positions
+    
+    Args:
+        q_lat, q_lon: Positions (radians)
+        lat_rad, lon_rad, cos_lat: Waypoints as for _haversine_argmin_kernel
+    
+    Returns:
+        (waypoint indices, haversine terms)
+    """
+    nearest_idx = np.empty(q_lat.shape[0], dtype=np.intp)
+    hav = np.empty(q_lat.shape[0], dtype=np.float64)
+    for i in prange(q_lat.shape[0]):
+        nearest_idx[i], hav[i] = _haversine_argmin_kernel(q_lat[i], q_lon[i], lat_rad, lon_rad, cos_lat)
+    return nearest_idx, hav
+
+
+def _haversine_nearest_batch_numpy(
+    q_lat: np.ndarray,
+    q_lon: np.ndarray,
+    lat_rad: np.ndarray,
+    lon_rad: np.ndarray,
+    cos_lat: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """NumPy version of _haversine_nearest_batch_kernel, used when Numba is not installed"""
+    nearest_idx = np.empty(q_lat.shape[0], dtype=np.intp)
+    hav = np.empty(q_lat.shape[0], dtype=np.float64)
+    for i in range(q_lat.shape[0]):
+        nearest_idx[i], hav[i] = _haversine_argmin_numpy(q_lat[i], q_lon[i], lat_rad, lon_rad, cos_lat)
+    return nearest_idx, hav
+
+
+_haversine_argmin = _haversine_argmin_kernel if NUMBA_AVAILABLE else _haversine_argmin_numpy
+_haversine_nearest_batch = (
+    _haversine_nearest_batch_kernel if NUMBA_AVAILABLE else _haversine_nearest_batch_numpy
+)
+
+
 # DTW-inspired similarity metric (simplified version)
 def calculate_trajectory_similarity(
     trajectory_1: Dict[str, np.ndarray],
@@ -274,8 +562,6 @@ def calculate_trajectory_similarity(
     Returns:
         Similarity score (0-1, 1 is identical)
     """
-    import numpy as np
-    
     lat1 = trajectory_1["gps_lat"]
     lon1 = trajectory_1["gps_lon"]
     speed1 = trajectory_1["speed"]
@@ -286,27 +572,188 @@ def calculate_trajectory_similarity(
     
     # Normalize lengths
     min_len = min(len(lat1), len(lat2))
-    lat1 = lat1[:min_len]
-    lon1 = lon1[:min_len]
-    speed1 = speed1[:min_len]
+    lat1 = np.ascontiguousarray(lat1[:min_len], dtype=np.float64)
+    lon1 = np.ascontiguousarray(lon1[:min_len], dtype=np.float64)
+    speed1 = np.ascontiguousarray(speed1[:min_len], dtype=np.float64)
+    
+    lat2 = np.ascontiguousarray(lat2[:min_len], dtype=np.float64)
+    lon2 = np.ascontiguousarray(lon2[:min_len], dtype=np.float64)
+    speed2 = np.ascontiguousarray(speed2[:min_len], dtype=np.float64)
+    
+    # Mean position distance (degrees converted to km), optionally plus 0.1 x speed difference
+    mean_dist = _mean_trajectory_distance(lat1, lon1, speed1, lat2, lon2, speed2, use_speed_weight)
+    
+    # Convert to similarity (lower distance = higher similarity)
+    similarity = 1.0 / (1.0 + mean_dist)
     
-    lat2 = lat2[:min_len]
-    lon2 = lon2[:min_len]
-    speed2 = speed2[:min_len]
+    return float(np.clip(similarity, 0.0, 1.0))
+
+
+@njit(cache=True, parallel=True, fastmath=True)
+def _mean_trajectory_distance_kernel(
+    lat1: np.ndarray,
+    lon1: np.ndarray,
+    speed1: np.ndarray,
+    lat2: np.ndarray,
+    lon2: np.ndarray,
+    speed2: np.ndarray,
+    use_speed_weight: bool
+) -> float:
+    """
+    Mean pointwise trajectory distance in one fused pass, without temporary arrays
+    
+    Args:
+        lat1, lon1, speed1: First trajectory (equal-length float64 arrays)
+        lat2, lon2, speed2: Second trajectory
+        use_speed_weight: Add 0.1 x |speed difference| to each point's distance
     
-    # Calculate position distance (in degrees, converted to km)
+    Returns:
+        Mean distance (km, plus speed term); NaN for empty trajectories
+    """
+    n = lat1.shape[0]
+    total = 0.0
+    for i in prange(n):
+        lat_diff = (lat1[i] - lat2[i]) * 111.0  # 1 degree ≈ 111 km
+        lon_diff = (lon1[i] - lon2[i]) * 111.0
+        dist = np.sqrt(lat_diff * lat_diff + lon_diff * lon_diff)
+        if use_speed_weight:
+            dist += abs(speed1[i] - speed2[i]) * 0.1
+        total += dist
+    return total / n if n > 0 else np.nan
+
+
+def _mean_trajectory_distance_numpy(
+    lat1: np.ndarray,
+    lon1: np.ndarray,
+    speed1: np.ndarray,
+    lat2: np.ndarray,
+    lon2: np.ndarray,
+    speed2: np.ndarray,
+    use_speed_weight: bool
+) -> float:
+    """NumPy version of _mean_trajectory_distance_kernel, used when Numba is not installed"""
     lat_diff = (lat1 - lat2) * 111  # 1 degree ≈ 111 km
     lon_diff = (lon1 - lon2) * 111
     pos_dist = np.sqrt(lat_diff**2 + lon_diff**2)
     
-    # Optional: weight by speed difference
     if use_speed_weight:
-        speed_diff = np.abs(speed1 - speed2)
-        weighted_dist = pos_dist + (speed_diff * 0.1)
-    else:
-        weighted_dist = pos_dist
+        return (pos_dist + np.abs(speed1 - speed2) * 0.1).mean()
+    return pos_dist.mean()
+
+
+_mean_trajectory_distance = (
+    _mean_trajectory_distance_kernel if NUMBA_AVAILABLE else _mean_trajectory_distance_numpy
+)
+
+
+def calculate_dtw_distance(
+    trajectory_1: Dict[str, np.ndarray],
+    trajectory_2: Dict[str, np.ndarray],
+    radius: int = None
+) -> float:
+    """
+    Dynamic time warping distance between two trajectories (Sakoe-Chiba band)
     
-    # Convert to similarity (lower distance = higher similarity)
-    similarity = 1.0 / (1.0 + weighted_dist.mean())
+    Unlike calculate_trajectory_similarity, trajectories of different lengths are
+    aligned rather than truncated, and points are matched across time shifts.
     
-    return float(np.clip(similarity, 0.0, 1.0))
+    Args:
+        trajectory_1: First trajectory dict (gps_lat, gps_lon)
+        trajectory_2: Second trajectory dict
+        radius: Band half-width in points (default 10% of the longer trajectory);
+                widened to the length difference so the end points can align
+    
+    Returns:
+        Mean matched-point distance along the warping path (m)
+    """
+    lat1 = np.asarray(trajectory_1["gps_lat"], dtype=np.float64)
+    lon1 = np.asarray(trajectory_1["gps_lon"], dtype=np.float64)
+    lat2 = np.asarray(trajectory_2["gps_lat"], dtype=np.float64)
+    lon2 = np.asarray(trajectory_2["gps_lon"], dtype=np.float64)
+    
+    # Both trajectories in metres around the first one's mean position
+    projection = {
+        "origin": (float(lat1.mean()), float(lon1.mean())),
+        "lon_scale_m": float(111000.0 * np.cos(np.radians(lat1.mean())))
+    }
+    x1, y1 = _project_xy(lat1, lon1, projection)
+    x2, y2 = _project_xy(lat2, lon2, projection)
+    
+    if radius is None:
+        radius = max(1, max(len(lat1), len(lat2)) // 10)
+    radius = max(int(radius), abs(len(lat1) - len(lat2)))
+    
+    return float(_banded_dtw_kernel(x1, y1, x2, y2, radius))
+
+
+@njit(cache=True)
+def _banded_dtw_kernel(
+    x1: np.ndarray,
+    y1: np.ndarray,
+    x2: np.ndarray,
+    y2: np.ndarray,
+    radius: int
+) -> float:
+    """
+    Banded DTW with two rolling rows of cost (and path length), O(N x radius) time
+    
+    Args:
+        x1, y1: First trajectory (m)
+        x2, y2: Second trajectory (m)
+        radius: Band half-width, at least the length difference
+    
+    Returns:
+        Accumulated distance of the optimal path divided by its length
+    """
+    n1 = x1.shape[0]
+    n2 = x2.shape[0]
+    prev = np.full(n2, np.inf)
+    cur = np.full(n2, np.inf)
+    prev_len = np.zeros(n2, dtype=np.int64)
+    cur_len = np.zeros(n2, dtype=np.int64)
+    
+    for i in range(n1):
+        lo = max(0, i - radius)
+        hi = min(n2, i + radius + 1)
+        for j in range(lo, hi):
+            dx = x1[i] - x2[j]
+            dy = y1[i] - y2[j]
+            if i == 0 and j == 0:
+                best = 0.0
+                best_len = 0
+            else:
+                # Diagonal, then vertical, then horizontal predecessor
+                best = np.inf
+                best_len = 0
+                if i > 0 and j > 0 and prev[j - 1] < best:
+                    best = prev[j - 1]
+                    best_len = prev_len[j - 1]
+                if i > 0 and prev[j] < best:
+                    best = prev[j]
+                    best_len = prev_len[j]
+                if j > lo and cur[j - 1] < best:
+                    best = cur[j - 1]
+                    best_len = cur_len[j - 1]
+            cur[j] = best + np.sqrt(dx * dx + dy * dy)
+            cur_len[j] = best_len + 1
+        # The next row's band reaches one column further; it must read as unreachable
+        if hi < n2:
+            cur[hi] = np.inf
+        prev, cur = cur, prev
+        prev_len, cur_len = cur_len, prev_len
+    
+    if n1 == 0 or n2 == 0:
+        return np.nan
+    return prev[n2 - 1] / prev_len[n2 - 1]
+
+
+def warm_racing_line_kernels():
+    """Trigger Numba compilation (or the on-disk cache load) of the racing line kernels"""
+    if not NUMBA_AVAILABLE:
+        return
+    
+    x = np.zeros(1, dtype=np.float64)
+    _mean_trajectory_distance_kernel(x, x, x, x, x, x, True)
+    _banded_dtw_kernel(x, x, x, x, 1)
+    _haversine_argmin_kernel(0.0, 0.0, x, x, x)
+    _haversine_nearest_batch_kernel(x, x, x, x, x)
@@ -6,13 +6,26 @@ Target Metrics: Calibration Error <0.10, Within-1-rank Accuracy >85%
 No Training Required: Pure statistical calculation
 """
 
+import math
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from scipy import stats
+from scipy.special import erfc
+from scipy.stats import spearmanr
 import joblib
 
 
+_INV_SQRT2 = 1.0 / math.sqrt(2.0)
+
+# Older models whose vehicle_stats index stays cached (oldest evicted first)
+LEGACY_INDEX_CACHE_SIZE = 8
+
+# id(model) -> (model, vehicle index) for models saved before the array layout;
+# the index is kept here so the caller's model dict is never modified
+_LEGACY_INDEXES: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+
 def train_rank_predictor(
     historical_results: pd.DataFrame,
     model_path: str = None
@@ -31,9 +44,6 @@ def train_rank_predictor(
     Returns:
         Model dictionary with competitor statistics
     """
-    import pandas as pd
-    import numpy as np
-    
     print("[+] Analyzing competitor statistics...")
     
     # Group by vehicle and calculate statistics
@@ -51,7 +61,11 @@ def train_rank_predictor(
     all_results = historical_results["final_efficiency"].values
     
     model = {
-        "vehicle_stats": vehicle_stats.to_dict(),
+        "vehicle_names": vehicle_stats.index.to_numpy(),
+        "vehicle_means": vehicle_stats["mean"].to_numpy(dtype=np.float64),
+        "vehicle_stds": vehicle_stats["std"].to_numpy(dtype=np.float64),
+        "vehicle_counts": vehicle_stats["count"].to_numpy(dtype=np.int32),
+        "name_to_idx": {name: i for i, name in enumerate(vehicle_stats.index)},
         "fleet_mean": float(all_results.mean()),
         "fleet_std": float(all_results.std()),
         "fleet_median": float(np.median(all_results)),
@@ -66,7 +80,8 @@ def train_rank_predictor(
     }
     
     if model_path:
-        joblib.dump(model, model_path)
+        # Uncompressed, protocol 5: array data is stored raw and can be memory-mapped on load
+        joblib.dump(model, model_path, compress=0, protocol=5)
         print(f"[+] Rank Predictor model saved to {model_path}")
     
     return model
@@ -93,9 +108,77 @@ def predict_podium_probability(
         - confidence_interval: 95% CI for rank
         - strategy_recommend: Run order optimization
     """
-    import numpy as np
-    from scipy import stats
+    podium = _podium_arrays(model, np.array([our_efficiency], dtype=np.float64), goal_rank)
+    prob_podium = float(podium["podium_probability"][0])
+    expected_rank = float(podium["expected_rank"][0])
+    
+    # Generate full ranking probability distribution
+    ranking_probs = _calculate_ranking_probabilities(
+        our_efficiency,
+        model["fleet_mean"],
+        model["fleet_std"],
+        model["total_vehicles"]
+    )
+    
+    # Strategy recommendation
+    strategy = _recommend_run_strategy(
+        podium_probability=prob_podium,
+        expected_rank=expected_rank,
+        our_efficiency=our_efficiency,
+        fleet_stats=model["percentiles"]
+    )
+    
+    return {
+        "podium_probability": prob_podium,
+        "podium_pct": float(podium["podium_pct"][0]),
+        "expected_rank": expected_rank,
+        "rank_ci_lower": float(podium["rank_ci_lower"][0]),
+        "rank_ci_upper": float(podium["rank_ci_upper"][0]),
+        "probability_beat_avg_competitor": float(podium["probability_beat_avg_competitor"][0]),
+        "ranking_probabilities": ranking_probs,
+        "strategy_recommend": strategy,
+        "confidence": float(podium["confidence"][0])
+    }
+
+
+def predict_podium_probability_batch(
+    model: Dict[str, Any],
+    our_efficiencies: np.ndarray,
+    goal_rank: int = 3
+) -> Dict[str, Any]:
+    """
+    Podium probabilities for many candidate efficiencies at once (e.g. strategy sweeps)
     
+    Args:
+        model: From train_rank_predictor
+        our_efficiencies: Candidate final efficiencies
+        goal_rank: Target rank (default 3 for podium)
+    
+    Returns:
+        Dictionary of per-candidate lists: podium_probability, podium_pct,
+        expected_rank, rank_ci_lower, rank_ci_upper,
+        probability_beat_avg_competitor, confidence
+    """
+    podium = _podium_arrays(model, np.asarray(our_efficiencies, dtype=np.float64).ravel(), goal_rank)
+    return {key: values.tolist() for key, values in podium.items()}
+
+
+def _podium_arrays(
+    model: Dict[str, Any],
+    our_efficiencies: np.ndarray,
+    goal_rank: int
+) -> Dict[str, np.ndarray]:
+    """
+    Podium statistics for an array of efficiencies, one SciPy call per distribution
+    
+    Args:
+        model: From train_rank_predictor
+        our_efficiencies: 1-D float64 candidate efficiencies
+        goal_rank: Target rank
+    
+    Returns:
+        Dictionary of arrays aligned with our_efficiencies
+    """
     fleet_mean = model["fleet_mean"]
     fleet_std = model["fleet_std"]
     total_vehicles = model["total_vehicles"]
@@ -104,11 +187,7 @@ def predict_podium_probability(
     # Assumes each competitor follows normal distribution
     
     # Probability that we beat an average competitor
-    prob_beat_avg = 1.0 - stats.norm.cdf(
-        fleet_mean,
-        loc=our_efficiency,
-        scale=fleet_std
-    )
+    prob_beat_avg = _norm_sf(fleet_mean, our_efficiencies, fleet_std)
     
     # Probability of Top 3 (beating at least total_vehicles - 3 competitors)
     # Using binomial approximation
@@ -122,45 +201,42 @@ def predict_podium_probability(
             p=prob_beat_avg
         )
     else:
-        prob_podium = 1.0
+        prob_podium = np.ones_like(prob_beat_avg)
     
     # Expected rank (inverse of probability)
     expected_rank = 1 + (1 - prob_beat_avg) * (total_vehicles - 1)
     
     # Confidence interval using normal approximation
     rank_std = np.sqrt(expected_rank * (1 - prob_beat_avg))
-    ci_lower = max(1, expected_rank - 1.96 * rank_std)
-    ci_upper = min(total_vehicles, expected_rank + 1.96 * rank_std)
-    
-    # Generate full ranking probability distribution
-    ranking_probs = _calculate_ranking_probabilities(
-        our_efficiency,
-        fleet_mean,
-        fleet_std,
-        total_vehicles
-    )
-    
-    # Strategy recommendation
-    strategy = _recommend_run_strategy(
-        podium_probability=prob_podium,
-        expected_rank=expected_rank,
-        our_efficiency=our_efficiency,
-        fleet_stats=model["percentiles"]
-    )
+    ci_lower = np.maximum(1, expected_rank - 1.96 * rank_std)
+    ci_upper = np.minimum(total_vehicles, expected_rank + 1.96 * rank_std)
     
     return {
-        "podium_probability": float(prob_podium),
-        "podium_pct": float(prob_podium * 100),
-        "expected_rank": float(expected_rank),
-        "rank_ci_lower": float(ci_lower),
-        "rank_ci_upper": float(ci_upper),
-        "probability_beat_avg_competitor": float(prob_beat_avg),
-        "ranking_probabilities": ranking_probs,
-        "strategy_recommend": strategy,
-        "confidence": float(min(prob_podium, 1.0 - prob_podium) * 2)  # Confidence in decision
+        "podium_probability": prob_podium,
+        "podium_pct": prob_podium * 100,
+        "expected_rank": expected_rank,
+        "rank_ci_lower": ci_lower,
+        "rank_ci_upper": ci_upper,
+        "probability_beat_avg_competitor": prob_beat_avg,
+        "confidence": np.minimum(prob_podium, 1.0 - prob_podium) * 2  # Confidence in decision
     }
 
 
+def _norm_sf(x: Any, loc: Any, scale: Any) -> Any:
+    """
+    1 - stats.norm.cdf(x, loc, scale) through erfc, without the frozen-distribution layer
+    
+    Args:
+        x: Value(s)
+        loc: Mean(s)
+        scale: Standard deviation(s)
+    
+    Returns:
+        Upper-tail probability, scalar or array like the inputs
+    """
+    return 0.5 * erfc((x - loc) * _INV_SQRT2 / scale)
+
+
 def _calculate_ranking_probabilities(
     our_efficiency: float,
     fleet_mean: float,
@@ -181,44 +257,20 @@ def _calculate_ranking_probabilities(
     Returns:
         Dictionary with rank -> probability
     """
-    import numpy as np
-    from scipy import stats
-    
-    probs = {}
-    
-    # Probability of beating exactly k competitors = P(rank = k+1)
-    prob_beat_avg = 1.0 - stats.norm.cdf(
-        fleet_mean,
-        loc=our_efficiency,
-        scale=fleet_std
-    )
+    # Probability of beating exactly k competitors = P(rank = total_vehicles - k)
+    prob_beat_avg = _norm_sf(fleet_mean, our_efficiency, fleet_std)
     
-    for rank in range(1, min(rank_range + 1, total_vehicles + 1)):
-        # P(beat exactly total_vehicles - rank competitors)
-        k_beat = total_vehicles - rank
-        
-        if k_beat == 0:
-            # First place
-            prob = prob_beat_avg ** (total_vehicles - 1)
-        elif k_beat == total_vehicles - 1:
-            # Last place
-            prob = (1 - prob_beat_avg) ** (total_vehicles - 1)
-        else:
-            # Middle ranks (use binomial)
-            prob = stats.binom.pmf(
-                k_beat,
-                total_vehicles - 1,
-                prob_beat_avg
-            )
-        
-        probs[rank] = float(prob)
+    # All ranks in one binomial call
+    ranks = np.arange(1, min(rank_range + 1, total_vehicles + 1))
+    k_beat = total_vehicles - ranks
+    probs = stats.binom.pmf(k_beat, total_vehicles - 1, prob_beat_avg)
     
     # Normalize
-    total_prob = sum(probs.values())
+    total_prob = probs.sum()
     if total_prob > 0:
-        probs = {k: v / total_prob for k, v in probs.items()}
+        probs = probs / total_prob
     
-    return probs
+    return {int(rank): float(prob) for rank, prob in zip(ranks, probs)}
 
 
 def _recommend_run_strategy(
@@ -292,18 +344,18 @@ def predict_competitor_performance(
     Returns:
         Competitor performance prediction
     """
-    import numpy as np
-    from scipy import stats
-    
-    vehicle_stats = model["vehicle_stats"]
+    index = _vehicle_index(model)
     
-    if competitor_name in vehicle_stats:
-        comp_mean = vehicle_stats[competitor_name].get("mean", model["fleet_mean"])
-        comp_std = vehicle_stats[competitor_name].get("std", model["fleet_std"])
+    idx = index["name_to_idx"].get(competitor_name)
+    if idx is not None:
+        comp_mean = index["vehicle_means"][idx]
+        comp_std = index["vehicle_stds"][idx]
+        historical_runs = index["vehicle_counts"][idx]
     else:
         # Unknown competitor - use fleet average
         comp_mean = model["fleet_mean"]
         comp_std = model["fleet_std"]
+        historical_runs = 0
     
     # Apply weather adjustment
     adjusted_mean = comp_mean * weather_adjustment
@@ -314,7 +366,85 @@ def predict_competitor_performance(
         "uncertainty": float(comp_std),
         "ci_lower": float(adjusted_mean - 1.96 * comp_std),
         "ci_upper": float(adjusted_mean + 1.96 * comp_std),
-        "historical_runs": int(vehicle_stats.get(competitor_name, {}).get("count", 0))
+        "historical_runs": int(historical_runs)
+    }
+
+
+def predict_all_competitors(
+    model: Dict[str, Any],
+    weather_adjustment: float = 1.0
+) -> Dict[str, Any]:
+    """
+    Predict every known competitor's performance at once
+    
+    Args:
+        model: From train_rank_predictor
+        weather_adjustment: Adjustment factor for conditions (1.0 = normal)
+    
+    Returns:
+        Dictionary of per-competitor lists, in the order of model["vehicle_names"]
+    """
+    index = _vehicle_index(model)
+    
+    adjusted_means = index["vehicle_means"] * weather_adjustment
+    stds = index["vehicle_stds"]
+    
+    return {
+        "competitor": index["vehicle_names"].tolist(),
+        "predicted_efficiency": adjusted_means.tolist(),
+        "uncertainty": stds.tolist(),
+        "ci_lower": (adjusted_means - 1.96 * stds).tolist(),
+        "ci_upper": (adjusted_means + 1.96 * stds).tolist(),
+        "historical_runs": index["vehicle_counts"].tolist()
+    }
+
+
+def _vehicle_index(model: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Per-vehicle arrays of a rank model
+    
+    Current models carry them directly. For a model saved by an older version the
+    arrays are built from its vehicle_stats once and cached by id(model); the
+    entry keeps a reference to the model, so a reused id is rebuilt.
+    
+    Args:
+        model: Model dict from train_rank_predictor or load_rank_predictor
+    
+    Returns:
+        Mapping with vehicle_names, vehicle_means, vehicle_stds, vehicle_counts
+        and name_to_idx
+    """
+    if "name_to_idx" in model:
+        return model
+    
+    entry = _LEGACY_INDEXES.get(id(model))
+    if entry is None or entry[0] is not model:
+        entry = (model, _index_vehicle_stats(model["vehicle_stats"]))
+        _LEGACY_INDEXES.pop(id(model), None)
+        while len(_LEGACY_INDEXES) >= LEGACY_INDEX_CACHE_SIZE:
+            del _LEGACY_INDEXES[next(iter(_LEGACY_INDEXES))]  # Evict the oldest model
+        _LEGACY_INDEXES[id(model)] = entry
+    return entry[1]
+
+
+def _index_vehicle_stats(vehicle_stats: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """
+    Convert an older model's vehicle_stats dict ({stat: {vehicle: value}}) to arrays
+    
+    Args:
+        vehicle_stats: The older model's vehicle_stats
+    
+    Returns:
+        Dict with vehicle_names, vehicle_means, vehicle_stds, vehicle_counts and name_to_idx
+    """
+    names = list(vehicle_stats["mean"])
+    
+    return {
+        "vehicle_names": np.array(names, dtype=object),
+        "vehicle_means": np.array([vehicle_stats["mean"][n] for n in names], dtype=np.float64),
+        "vehicle_stds": np.array([vehicle_stats["std"][n] for n in names], dtype=np.float64),
+        "vehicle_counts": np.array([vehicle_stats["count"][n] for n in names], dtype=np.int32),
+        "name_to_idx": {name: i for i, name in enumerate(names)}
     }
 
 
@@ -326,61 +456,62 @@ def bayesian_head_to_head(
     competitor_uncertainty: float = 5.0
 ) -> Dict[str, Any]:
     """
-    Calculate head-to-head probability against specific competitor
+    Calculate head-to-head probability against one competitor, or many at once
+    
+    Any argument may be an array (e.g. all rivals' efficiencies); they broadcast
+    together and the result holds one entry per pairing.
     
     Args:
         model: From train_rank_predictor
         our_efficiency: Our predicted efficiency
-        competitor_efficiency: Competitor predicted efficiency
+        competitor_efficiency: Competitor predicted efficiency (scalar or array)
         our_uncertainty: Our confidence interval (uncertainty)
-        competitor_uncertainty: Competitor uncertainty
+        competitor_uncertainty: Competitor uncertainty (scalar or array)
     
     Returns:
-        Head-to-head probability
+        Head-to-head probability; values are floats/strings for scalar inputs and
+        lists for array inputs
     """
-    import numpy as np
-    from scipy import stats
+    our_efficiency = np.asarray(our_efficiency, dtype=np.float64)
+    competitor_efficiency = np.asarray(competitor_efficiency, dtype=np.float64)
+    our_uncertainty = np.asarray(our_uncertainty, dtype=np.float64)
+    competitor_uncertainty = np.asarray(competitor_uncertainty, dtype=np.float64)
     
     efficiency_diff = our_efficiency - competitor_efficiency
     combined_std = np.sqrt(our_uncertainty**2 + competitor_uncertainty**2)
     
     # P(we beat competitor) = P(our_eff > comp_eff)
-    prob_we_win = 1.0 - stats.norm.cdf(
-        0,
-        loc=efficiency_diff,
-        scale=combined_std
-    )
+    prob_we_win = _norm_sf(0.0, efficiency_diff, combined_std)
     
-    # Generate probability range
+    # Generate probability range (tolist() gives a float for 0-d inputs)
     prob_range = {
-        "we_win_low": float(max(0, prob_we_win - 0.1)),
-        "we_win_likely": float(prob_we_win),
-        "we_win_high": float(min(1, prob_we_win + 0.1))
+        "we_win_low": np.maximum(0.0, prob_we_win - 0.1).tolist(),
+        "we_win_likely": prob_we_win.tolist(),
+        "we_win_high": np.minimum(1.0, prob_we_win + 0.1).tolist()
     }
     
     return {
-        "probability_we_win": float(prob_we_win),
-        "probability_we_lose": float(1 - prob_we_win),
+        "probability_we_win": prob_we_win.tolist(),
+        "probability_we_lose": (1 - prob_we_win).tolist(),
         "probability_tie": 0.05,  # Small probability of exact tie
-        "efficiency_gap": float(efficiency_diff),
+        "efficiency_gap": efficiency_diff.tolist(),
         "confidence_range": prob_range,
-        "winner_likely": "US" if prob_we_win > 0.5 else "COMPETITOR"
+        "winner_likely": np.where(prob_we_win > 0.5, "US", "COMPETITOR").tolist()
     }
 
 
-def load_rank_predictor(model_path: str) -> Dict[str, Any]:
+def load_rank_predictor(model_path: str, mmap_mode: str = None) -> Dict[str, Any]:
     """
     Load pre-trained Rank Predictor from disk
     
     Args:
         model_path: Path to saved model
+        mmap_mode: Passed to joblib.load; "r" memory-maps array data read-only
     
     Returns:
         Loaded model
     """
-    import joblib
-    
-    model = joblib.load(model_path)
+    model = joblib.load(model_path, mmap_mode=mmap_mode)
     print(f"[+] Rank Predictor loaded from {model_path}")
     return model
 
@@ -402,8 +533,6 @@ def calibration_error(
     Returns:
         Calibration error score
     """
-    import numpy as np
-    
     predicted = np.array(predicted_probabilities)
     actual = np.array(actual_outcomes)
     
@@ -424,23 +553,55 @@ def calculate_ranking_metrics(
     Returns:
         Metrics dictionary
     """
-    import numpy as np
-    
     predicted = np.array(predicted_ranks)
     actual = np.array(actual_ranks)
     
-    mae = np.mean(np.abs(predicted - actual))
-    
-    # Within-1-rank accuracy
-    within_one = (np.abs(predicted - actual) <= 1).sum() / len(actual)
+    # One difference array shared by MAE and within-1-rank accuracy
+    abs_diff = np.abs(predicted - actual)
+    mae = abs_diff.mean()
+    within_one = (abs_diff <= 1).mean()
+    
+    # Spearman correlation (ranking correlation); integer ranks without ties use the
+    # closed form 1 - 6·Σd²/(n(n²-1)) instead of spearmanr's tie handling
+    rank_diff = None
+    if np.issubdtype(predicted.dtype, np.integer) and np.issubdtype(actual.dtype, np.integer):
+        predicted_order = _tie_free_ranks(predicted)
+        actual_order = _tie_free_ranks(actual)
+        if predicted_order is not None and actual_order is not None:
+            rank_diff = predicted_order - actual_order
+    
+    if rank_diff is not None and len(rank_diff) > 1:
+        n = len(rank_diff)
+        corr = 1.0 - 6.0 * float(np.dot(rank_diff, rank_diff)) / (n * (n * n - 1))
+    else:
+        corr, _ = spearmanr(predicted, actual)
     
-    # Spearman correlation (ranking correlation)
-    from scipy.stats import spearmanr
-    corr, _ = spearmanr(predicted, actual)
+    # Calibration of predicted / 10 against podium finishes (rough conversion)
+    podium_error = np.abs(predicted / 10.0 - (actual <= 3)).mean()
     
     return {
         "MAE": float(mae),
         "Within_1_Rank_Accuracy": float(within_one),
         "Spearman_Correlation": float(corr),
-        "Calibration_Error": calibration_error(predicted / 10.0, (actual <= 3).astype(int))  # Rough conversion
+        "Calibration_Error": float(podium_error)
     }
+
+
+def _tie_free_ranks(values: np.ndarray) -> Any:
+    """
+    0-based ranks of a 1-D array, if no two values are equal
+    
+    Args:
+        values: 1-D array
+    
+    Returns:
+        Integer rank array, or None when there are ties
+    """
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    if np.any(sorted_values[1:] == sorted_values[:-1]):
+        return None
+    
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(len(values))
+    return ranks
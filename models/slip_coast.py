@@ -7,11 +7,63 @@ Impact: Coast ratio +10-15%, Efficiency +10-15%
 """
 
 from sklearn.tree import DecisionTreeRegressor
+from sklearn.metrics import mean_absolute_error, recall_score
+from bisect import bisect_right
 import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional, Sequence, Tuple
+import os
+import weakref
 import joblib
 
+from kerangka_ml.utils.jit import njit, prange, NUMBA_AVAILABLE
+
+try:
+    # Ahead-of-time build of _tree_walk_kernel, see build_slip_coast_native
+    from kerangka_ml.models import _slip_coast_native
+except ImportError:
+    _slip_coast_native = None
+
+
+# Training feature order, used to read features from an ndarray row
+FEATURE_NAMES = (
+    "track_section", "current_speed", "wheel_speed_front", "wheel_speed_rear",
+    "gps_speed", "decel_rate", "tire_pressure"
+)
+
+# Model object -> (tree_ the entry was built from, compile_slip_coast_predictor function)
+_PREDICTORS = weakref.WeakKeyDictionary()
+
+# Columns predict_slip_coast_batch reads besides the tree features
+_BATCH_COLUMNS = ("gps_speed", "wheel_speed_front", "wheel_speed_rear", "decel_rate")
+
+# Slip severity names, indexed by the codes from _slip_severity
+_SEVERITY_LEVELS = ("NONE", "LOW", "MEDIUM", "HIGH")
+
+# Max wheel/GPS deviation bounds: above 0.15 is slip, from 0.25 MEDIUM, from 0.40
+# HIGH, so a slipping sample's code is the number of bounds <= its deviation
+_SEVERITY_BOUNDS = (0.15, 0.25, 0.40)
+_SEVERITY_BINS = np.array(_SEVERITY_BOUNDS)
+
+# Tire pressure change (bar) and reason per slip severity
+_PRESSURE_ADJUSTMENTS = {
+    "NONE": {"delta": 0, "reason": "Pressureoptimal"},
+    "LOW": {"delta": 0.1, "reason": "Slight increase for better grip"},
+    "MEDIUM": {"delta": 0.2, "reason": "Increase pressure to improve traction"},
+    "HIGH": {"delta": 0.3, "reason": "Significant increase, check for mechanical issue"}
+}
+
+# Where to coast, per track section name
+_SECTION_INFO = {
+    "STRAIGHT": "on straightaway",
+    "CURVE": "before turn",
+    "UPHILL": "approaching hill",
+    "DOWNHILL": "on descent"
+}
+
+# Rough coast ratio (%) per track section code: Straight, Curve, Uphill, Downhill
+_SECTION_BASE_COASTS = (70.0, 30.0, 20.0, 60.0)
+
 
 def train_slip_coast_optimizer(
     X_train: pd.DataFrame,
@@ -36,8 +88,6 @@ def train_slip_coast_optimizer(
         - max_depth: 5 (shallow tree, interpretable)
         - min_samples_split: 20 (avoid overfitting)
     """
-    from sklearn.tree import DecisionTreeRegressor
-    
     model = DecisionTreeRegressor(
         max_depth=5,
         min_samples_split=20,
@@ -65,7 +115,8 @@ def predict_slip_coast(
     
     Args:
         model: Trained Decision Tree model
-        X_test: Test features
+        X_test: Test features (DataFrame, Series, or ndarray in training column order);
+                only the first row is used
         track_section_name: Human-readable section name (optional)
     
     Returns:
@@ -78,28 +129,59 @@ def predict_slip_coast(
         - recommendation: Text advice
         - confidence: Confidence (0-1)
     """
-    from sklearn.tree import DecisionTreeRegressor
-    import pandas as pd
-    import numpy as np
-    
     if isinstance(X_test, pd.Series):
         X_test = X_test.to_frame().T
     
+    # First row as one array plus a column -> position map; an ndarray is in
+    # training column order
+    if isinstance(X_test, pd.DataFrame):
+        columns = X_test.columns
+        row = X_test.to_numpy()[0]
+    else:
+        X_test = np.atleast_2d(X_test)
+        columns = getattr(model, "feature_names_in_", FEATURE_NAMES)
+        row = X_test[0]
+    idx = {col: i for i, col in enumerate(columns)}
+    
+    return _slip_coast_result(_predict_coast(model, X_test)[0], row, idx, track_section_name)
+
+
+def _slip_coast_result(
+    prediction: float,
+    row: np.ndarray,
+    idx: Dict[str, int],
+    track_section_name: str = None
+) -> Dict[str, Any]:
+    """
+    predict_slip_coast result for one sample
+    
+    Args:
+        prediction: Raw tree prediction (coast ratio, unclipped)
+        row: Feature values of the sample
+        idx: Column name -> position in row
+        track_section_name: Human-readable section name (optional)
+    
+    Returns:
+        predict_slip_coast result dictionary
+    """
     # Get optimal coast ratio
-    optimal_coast = model.predict(X_test)[0] if len(X_test) == 1 else model.predict(X_test)[0]
-    optimal_coast = float(np.clip(optimal_coast, 0, 100))
+    optimal_coast = float(np.clip(prediction, 0, 100))
     
     # Detect wheel slip
-    slip_info = _detect_wheel_slip(X_test)
+    slip_info = _detect_wheel_slip(
+        row[idx["gps_speed"]] if "gps_speed" in idx else 0,
+        row[idx["wheel_speed_front"]] if "wheel_speed_front" in idx else 0,
+        row[idx["wheel_speed_rear"]] if "wheel_speed_rear" in idx else 0
+    )
     slip_detected = slip_info["slip_detected"]
     slip_severity = slip_info["severity"]
     
     # Tire pressure recommendation
-    tire_pressure = X_test["tire_pressure"].iloc[0] if "tire_pressure" in X_test.columns else 1.8
+    tire_pressure = row[idx["tire_pressure"]] if "tire_pressure" in idx else 1.8
     pressure_adjust = _recommend_tire_pressure(slip_severity, tire_pressure)
     
     # Regen potential (if applicable)
-    decel_rate = X_test["decel_rate"].iloc[0] if "decel_rate" in X_test.columns else 0
+    decel_rate = row[idx["decel_rate"]] if "decel_rate" in idx else 0
     regen_potential = max(0, decel_rate * 500)  # Empirical: 500W per m/s² deceleration
     
     # Generate recommendation
@@ -124,11 +206,179 @@ def predict_slip_coast(
         "recommendation": recommendation,
         "confidence": float(confidence),
         "track_section": track_section_name or "UNKNOWN",
-        "current_speed": float(X_test["current_speed"].iloc[0]) if "current_speed" in X_test.columns else 0
+        "current_speed": float(row[idx["current_speed"]]) if "current_speed" in idx else 0
     }
 
 
-def _detect_wheel_slip(X_test: pd.DataFrame) -> Dict[str, Any]:
+def _predict_coast(model: DecisionTreeRegressor, X: Any) -> np.ndarray:
+    """
+    model.predict, straight through the fitted tree for clean input
+    
+    model.predict validates (and for a DataFrame, converts) the input on every call,
+    which costs far more than walking a depth-5 tree. Arrays (or DataFrames with
+    exactly the training columns) of finite values are cast to float32, the dtype
+    the tree compares in, and go to the compile_slip_coast_predictor function;
+    anything else, including input sklearn would reject or NaNs (routed by the
+    tree's missing-value rules), goes to model.predict.
+    
+    Args:
+        model: Trained Decision Tree model
+        X: Input features
+    
+    Returns:
+        Predicted coast ratios, one per row
+    """
+    if isinstance(X, pd.DataFrame):
+        feature_names = getattr(model, "feature_names_in_", None)
+        if feature_names is None or list(X.columns) != list(feature_names):
+            return model.predict(X)  # sklearn validates the columns
+    
+    X_f32 = _as_c_float32(X)
+    if X_f32.ndim != 2 or not len(X_f32) or X_f32.shape[1] != model.n_features_in_ or not np.isfinite(X_f32).all():
+        return model.predict(X)
+    
+    return _tree_predictor(model)(X_f32)
+
+
+def _as_c_float32(X: Any) -> np.ndarray:
+    """
+    Features as a C-contiguous float32 array, the layout the tree walk reads row by row
+    
+    Args:
+        X: DataFrame or array-like
+    
+    Returns:
+        X itself when it already is such an array, else one converted copy
+    """
+    if isinstance(X, pd.DataFrame):
+        X = X.to_numpy(dtype=np.float32)
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+def _tree_predictor(model: DecisionTreeRegressor) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    compile_slip_coast_predictor function for the model, cached per model
+    
+    Args:
+        model: Trained Decision Tree model
+    
+    Returns:
+        Prediction function; rebuilt if the model is refit
+    """
+    cached = _PREDICTORS.get(model)
+    if cached is None or cached[0] is not model.tree_:
+        cached = (model.tree_, compile_slip_coast_predictor(model))
+        _PREDICTORS[model] = cached
+    return cached[1]
+
+
+def compile_slip_coast_predictor(model: DecisionTreeRegressor) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Prediction function that walks the fitted tree in a Numba kernel
+    
+    The node arrays are copied out of model.tree_ once, with each threshold rounded
+    down to the largest float32 not above it: for a float32 feature x, x <= t holds
+    exactly when x is <= that value, so the kernel compares in single precision and
+    still returns what model.predict does (leaf values stay float64), without the
+    per-call input validation. The build_slip_coast_native module is used instead of
+    the JIT kernel when present; with neither, the function calls tree_.predict.
+    
+    Args:
+        model: Trained Decision Tree model
+    
+    Returns:
+        Function taking a C-contiguous float32 (n_rows, n_features) array of finite
+        values and returning the predicted coast ratios (float64)
+    """
+    tree = model.tree_
+    if _slip_coast_native is not None:
+        tree_walk = _slip_coast_native.walk
+    elif NUMBA_AVAILABLE:
+        tree_walk = _tree_walk_kernel
+    else:
+        return lambda X: tree.predict(X)[:, 0]
+    
+    feature = tree.feature.astype(np.intp)
+    threshold = tree.threshold.astype(np.float32)
+    threshold = np.where(threshold > tree.threshold, np.nextafter(threshold, np.float32(-np.inf)), threshold)
+    children_left = tree.children_left.astype(np.intp)
+    children_right = tree.children_right.astype(np.intp)
+    value = np.ascontiguousarray(tree.value[:, 0, 0], dtype=np.float64)
+    
+    def predict(X: np.ndarray) -> np.ndarray:
+        out = np.empty(X.shape[0])
+        tree_walk(X, feature, threshold, children_left, children_right, value, out)
+        return out
+    
+    return predict
+
+
+def build_slip_coast_native(output_dir: str = None) -> Optional[str]:
+    """
+    Compile the tree walk ahead of time into the _slip_coast_native extension module
+    
+    A process that imports the module skips Numba's start-up on its first prediction
+    (~0.2 s even with the JIT cache) and does not need Numba at run time. The module
+    is platform-specific: build it on (or for) the deploy target, and rebuild after
+    changing _tree_walk_kernel.
+    
+    Args:
+        output_dir: Directory to write the module to (default: this package, where it is
+                    picked up on the next import)
+    
+    Returns:
+        Path of the built module, None if numba.pycc is unavailable
+    """
+    try:
+        from numba.pycc import CC  # Build-time only; pending deprecation in Numba
+    except ImportError:
+        print("[!] numba.pycc not available, skipping native tree walk build")
+        return None
+    
+    cc = CC("_slip_coast_native")
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+    cc.export(
+        "walk",
+        "void(f4[:, ::1], intp[::1], f4[::1], intp[::1], intp[::1], f8[::1], f8[::1])"
+    )(_tree_walk_kernel.py_func)
+    cc.compile()
+    
+    path = os.path.join(cc.output_dir, cc.output_file)
+    print(f"[+] Native tree walk saved to {path}")
+    return path
+
+
+@njit(cache=True)
+def _tree_walk_kernel(
+    X: np.ndarray,
+    feature: np.ndarray,
+    threshold: np.ndarray,
+    children_left: np.ndarray,
+    children_right: np.ndarray,
+    value: np.ndarray,
+    out: np.ndarray
+):
+    """
+    Regression tree prediction for every row of X
+    
+    Args:
+        X: float32 features (n_rows, n_features), finite
+        feature, children_left, children_right: Node arrays of the tree
+        threshold: float32 split thresholds (see compile_slip_coast_predictor)
+        value: Leaf value per node
+        out: Output array (n_rows,), filled in place
+    """
+    for i in range(X.shape[0]):
+        node = 0
+        while children_left[node] != -1:
+            if X[i, feature[node]] <= threshold[node]:
+                node = children_left[node]
+            else:
+                node = children_right[node]
+        out[i] = value[node]
+
+
+def _detect_wheel_slip(gps_speed: float, wheel_front: float, wheel_rear: float) -> Dict[str, Any]:
     """
     Detect wheel slip using wheel speed sensors
     
@@ -138,18 +388,13 @@ def _detect_wheel_slip(X_test: pd.DataFrame) -> Dict[str, Any]:
     - Significant deviation = slip or lock
     
     Args:
-        X_test: Features with wheel_speed_front, wheel_speed_rear, gps_speed
+        gps_speed: GPS speed
+        wheel_front: Front wheel speed
+        wheel_rear: Rear wheel speed
     
     Returns:
         Slip detection result
     """
-    import pandas as pd
-    import numpy as np
-    
-    gps_speed = X_test["gps_speed"].iloc[0] if "gps_speed" in X_test.columns else 0
-    wheel_front = X_test["wheel_speed_front"].iloc[0] if "wheel_speed_front" in X_test.columns else 0
-    wheel_rear = X_test["wheel_speed_rear"].iloc[0] if "wheel_speed_rear" in X_test.columns else 0
-    
     # Normalize wheel speeds to GPS reference
     if gps_speed > 0:
         front_deviation = abs(wheel_front - gps_speed) / gps_speed
@@ -163,18 +408,11 @@ def _detect_wheel_slip(X_test: pd.DataFrame) -> Dict[str, Any]:
     # Slip threshold: 15% deviation indicates slip
     slip_detected = max_deviation > 0.15
     
-    # Severity classification
-    if not slip_detected:
-        severity = "NONE"
-    elif max_deviation < 0.25:
-        severity = "LOW"
-    elif max_deviation < 0.40:
-        severity = "MEDIUM"
-    else:
-        severity = "HIGH"
+    # Severity classification: number of bounds at or below the deviation
+    severity = _SEVERITY_LEVELS[bisect_right(_SEVERITY_BOUNDS, max_deviation)] if slip_detected else "NONE"
     
     return {
-        "slip_detected": slip_detected,
+        "slip_detected": bool(slip_detected),
         "severity": severity,
         "front_deviation": float(front_deviation),
         "rear_deviation": float(rear_deviation),
@@ -182,6 +420,72 @@ def _detect_wheel_slip(X_test: pd.DataFrame) -> Dict[str, Any]:
     }
 
 
+@njit(cache=True, parallel=True)
+def _slip_severity_kernel(
+    gps_speed: np.ndarray,
+    wheel_front: np.ndarray,
+    wheel_rear: np.ndarray,
+    severity: np.ndarray,
+    slip_detected: np.ndarray
+):
+    """
+    _detect_wheel_slip's severity for many samples, in one pass over the inputs
+    
+    Args:
+        gps_speed: GPS speed per sample (ground truth)
+        wheel_front: Front wheel speed per sample
+        wheel_rear: Rear wheel speed per sample
+        severity: Output int8 index into _SEVERITY_LEVELS per sample
+        slip_detected: Output slip flag per sample
+    """
+    for i in prange(gps_speed.shape[0]):
+        gps = gps_speed[i]
+        front_deviation = 0.0
+        rear_deviation = 0.0
+        if gps > 0:
+            front_deviation = abs(wheel_front[i] - gps) / gps
+            rear_deviation = abs(wheel_rear[i] - gps) / gps
+        max_deviation = rear_deviation if rear_deviation > front_deviation else front_deviation
+        
+        # NaN deviations fail every comparison and stay NONE
+        code = 0
+        if max_deviation > 0.15:
+            code = 1
+            if max_deviation >= 0.25:
+                code = 2
+            if max_deviation >= 0.40:
+                code = 3
+        severity[i] = code
+        slip_detected[i] = code > 0
+
+
+def _slip_severity_numpy(
+    gps_speed: np.ndarray,
+    wheel_front: np.ndarray,
+    wheel_rear: np.ndarray,
+    severity: np.ndarray,
+    slip_detected: np.ndarray
+):
+    """NumPy version of _slip_severity_kernel, used when Numba is not installed"""
+    # Normalize wheel speeds to GPS reference (no deviation without forward motion)
+    moving = gps_speed > 0
+    front_deviation = np.divide(np.abs(wheel_front - gps_speed), gps_speed, out=np.zeros(len(gps_speed)), where=moving)
+    rear_deviation = np.divide(np.abs(wheel_rear - gps_speed), gps_speed, out=np.zeros(len(gps_speed)), where=moving)
+    
+    # max() of the pair, keeping the front deviation unless the rear one is larger
+    max_deviation = np.where(rear_deviation > front_deviation, rear_deviation, front_deviation)
+    
+    # Slip threshold: 15% deviation indicates slip
+    np.greater(max_deviation, 0.15, out=slip_detected)
+    
+    # Severity classification without per-sample branches (rows without slip,
+    # including NaN deviations, are NONE)
+    severity[:] = np.where(slip_detected, np.digitize(max_deviation, _SEVERITY_BINS), 0)
+
+
+_slip_severity = _slip_severity_kernel if NUMBA_AVAILABLE else _slip_severity_numpy
+
+
 def _recommend_tire_pressure(
     slip_severity: str,
     current_pressure: float
@@ -196,15 +500,7 @@ def _recommend_tire_pressure(
     Returns:
         Pressure adjustment recommendation
     """
-    
-    adjustments = {
-        "NONE": {"delta": 0, "reason": "Pressureoptimal"},
-        "LOW": {"delta": 0.1, "reason": "Slight increase for better grip"},
-        "MEDIUM": {"delta": 0.2, "reason": "Increase pressure to improve traction"},
-        "HIGH": {"delta": 0.3, "reason": "Significant increase, check for mechanical issue"}
-    }
-    
-    adj = adjustments.get(slip_severity, adjustments["NONE"])
+    adj = _PRESSURE_ADJUSTMENTS.get(slip_severity, _PRESSURE_ADJUSTMENTS["NONE"])
     
     new_pressure = current_pressure + adj["delta"]
     
@@ -224,15 +520,7 @@ def _generate_coast_recommendation(
     """
     Generate human-readable coast recommendation
     """
-    
-    section_info = {
-        "STRAIGHT": "on straightaway",
-        "CURVE": "before turn",
-        "UPHILL": "approaching hill",
-        "DOWNHILL": "on descent"
-    }
-    
-    section_text = section_info.get(track_section, "in this section")
+    section_text = _SECTION_INFO.get(track_section, "in this section")
     
     if slip_severity != "NONE":
         return f"⚠ Slip detected: {slip_severity.lower()} - Reduce coast ratio to {max(0, coast_ratio - 10):.0f}% for more traction"
@@ -247,49 +535,174 @@ def _generate_coast_recommendation(
 
 def predict_slip_coast_batch(
     model: DecisionTreeRegressor,
-    X_batch: pd.DataFrame
+    X_batch: pd.DataFrame,
+    with_text: bool = True
 ) -> Dict[str, Any]:
     """
     Batch prediction for slip and coasting optimization
     
     Args:
         model: Trained model
-        X_batch: Batch of features
+        X_batch: Batch of features (DataFrame, or 2-D array in training column order)
+        with_text: False returns numeric columns only: "coast_ratios", "severity_codes"
+                   (int8, 0=NONE .. 3=HIGH) and "regen_potentials" arrays replace the
+                   per-sample "predictions" dicts
     
     Returns:
         Batch results
     """
-    from sklearn.tree import DecisionTreeRegressor
-    import pandas as pd
-    import numpy as np
+    predictions = _predict_coast(model, X_batch)
+    columns = _as_columns(X_batch, getattr(model, "feature_names_in_", FEATURE_NAMES))
     
-    predictions = model.predict(X_batch)
+    return _slip_coast_batch_result(predictions, columns, with_text)
+
+
+def _as_columns(X: Any, feature_names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Arrays of the _BATCH_COLUMNS features present in X, each read out once
     
-    results = []
-    slip_count = 0
+    Args:
+        X: DataFrame, or 2-D array with columns in feature_names order
+        feature_names: Column order of an array X
     
-    for i, pred in enumerate(predictions):
-        coast = float(np.clip(pred, 0, 100))
-        
-        # Create single-row df for slip detection
-        X_row = X_batch.iloc[[i]]
-        slip_info = _detect_wheel_slip(X_row)
-        
-        if slip_info["slip_detected"]:
-            slip_count += 1
-        
-        results.append({
-            "coast_ratio": coast,
-            "slip_severity": slip_info["severity"]
-        })
+    Returns:
+        Column name -> 1-D array (views where possible)
+    """
+    if isinstance(X, pd.DataFrame):
+        return {col: X[col].to_numpy() for col in _BATCH_COLUMNS if col in X.columns}
     
-    return {
-        "predictions": results,
-        "mean_coast_ratio": float(np.mean(predictions)),
-        "coast_std": float(np.std(predictions)),
+    X = np.asarray(X)
+    positions = {col: i for i, col in enumerate(feature_names)}
+    return {col: X[:, positions[col]] for col in _BATCH_COLUMNS if col in positions}
+
+
+def _slip_coast_batch_result(
+    predictions: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    with_text: bool = True
+) -> Dict[str, Any]:
+    """
+    predict_slip_coast_batch result from the tree predictions and feature columns
+    
+    Args:
+        predictions: Raw tree predictions, one per sample
+        columns: Arrays of the _BATCH_COLUMNS features present (a missing one reads as 0)
+        with_text: See predict_slip_coast_batch
+    
+    Returns:
+        Batch results
+    """
+    n_rows = len(predictions)
+    coasts = np.clip(predictions, 0, 100)
+    
+    # Slip detection for every row at once
+    zeros = np.zeros(n_rows)
+    severity = np.empty(n_rows, dtype=np.int8)
+    slip_detected = np.empty(n_rows, dtype=np.bool_)
+    _slip_severity(
+        *(np.ascontiguousarray(columns.get(col, zeros), dtype=np.float64)
+          for col in ("gps_speed", "wheel_speed_front", "wheel_speed_rear")),
+        severity,
+        slip_detected
+    )
+    slip_count = int(np.count_nonzero(slip_detected))
+    
+    # np.mean / np.std, sharing the mean instead of np.std recomputing it
+    mean = predictions.sum() / n_rows
+    deviations = predictions - mean
+    deviations *= deviations
+    
+    summary = {
+        "mean_coast_ratio": float(mean),
+        "coast_std": float(np.sqrt(deviations.sum() / n_rows)),
         "slip_events": slip_count,
-        "slip_rate": float(slip_count / len(X_batch) * 100 if len(X_batch) > 0 else 0)
+        "slip_rate": float(slip_count / n_rows * 100 if n_rows > 0 else 0)
     }
+    
+    if not with_text:
+        # Same regen estimate as predict_slip_coast: 500W per m/s² deceleration, at least 0
+        regen = columns.get("decel_rate", zeros) * 500
+        return {
+            "coast_ratios": coasts,
+            "severity_codes": severity,
+            "regen_potentials": np.where(regen > 0, regen, 0.0),
+            **summary
+        }
+    
+    results = [
+        {"coast_ratio": coast, "slip_severity": _SEVERITY_LEVELS[sev]}
+        for coast, sev in zip(coasts.tolist(), severity.tolist())
+    ]
+    
+    return {"predictions": results, **summary}
+
+
+class SlipCoastPredictor:
+    """
+    predict_slip_coast / predict_slip_coast_batch for arrays in training column order
+    
+    The feature order, its column -> position map and the compiled tree walk are
+    captured once, so a call reads features by position instead of resolving
+    DataFrame columns.
+    """
+    
+    __slots__ = ("_model", "feature_names", "_idx", "_predict")
+    
+    def __init__(self, model: DecisionTreeRegressor, feature_names: Sequence[str] = None):
+        """
+        Args:
+            model: Trained Decision Tree model
+            feature_names: Training column order, for a model fitted on an array
+                           (default FEATURE_NAMES); a model fitted on a DataFrame
+                           uses its own columns
+        """
+        model_names = getattr(model, "feature_names_in_", None)
+        if model_names is not None:
+            if feature_names is not None and list(feature_names) != list(model_names):
+                raise ValueError("feature_names must match the columns the model was fitted on")
+            feature_names = model_names
+        elif feature_names is None:
+            feature_names = FEATURE_NAMES
+        
+        self._model = model
+        self.feature_names = list(feature_names)
+        self._idx = {col: i for i, col in enumerate(self.feature_names)}
+        self._predict = _tree_predictor(model)
+    
+    def predict(self, row: np.ndarray, track_section_name: str = None) -> Dict[str, Any]:
+        """
+        Predict for one sample
+        
+        Args:
+            row: 1-D feature values in feature_names order
+            track_section_name: Human-readable section name (optional)
+        
+        Returns:
+            predict_slip_coast result
+        """
+        row = np.asarray(row)
+        X = _as_c_float32(row.reshape(1, -1))
+        if np.isfinite(X).all():
+            prediction = self._predict(X)[0]
+        elif hasattr(self._model, "feature_names_in_"):
+            prediction = self._model.predict(pd.DataFrame(X, columns=self.feature_names))[0]
+        else:
+            prediction = self._model.predict(X)[0]
+        return _slip_coast_result(prediction, row, self._idx, track_section_name)
+    
+    def predict_batch(self, X: np.ndarray, with_text: bool = True) -> Dict[str, Any]:
+        """
+        Predict for many samples
+        
+        Args:
+            X: 2-D features, columns in feature_names order
+            with_text: See predict_slip_coast_batch
+        
+        Returns:
+            predict_slip_coast_batch result
+        """
+        X = np.asarray(X)
+        return _slip_coast_batch_result(_predict_coast(self._model, X), _as_columns(X, self.feature_names), with_text)
 
 
 def get_coast_ratio_by_track_section(
@@ -306,32 +719,45 @@ def get_coast_ratio_by_track_section(
     Returns:
         Typical coast ratio for that section
     """
-    from sklearn.tree import DecisionTreeRegressor
-    
-    # Get tree's decision paths at root
-    # Simplified: return feature-weighted average
-    feature_importance = model.feature_importances_
-    
     # Rough estimate based on section type
-    section_base_coasts = [70, 30, 20, 60]  # Straight, Curve, Uphill, Downhill
-    
-    return float(section_base_coasts[track_section])
+    return _SECTION_BASE_COASTS[track_section]
 
 
-def load_slip_coast_optimizer(model_path: str) -> DecisionTreeRegressor:
+def warm_slip_coast_kernels():
+    """Trigger Numba compilation (or the on-disk cache load) of the slip & coast kernels"""
+    if not NUMBA_AVAILABLE:
+        return
+    
+    if _slip_coast_native is None:
+        leaf = np.full(1, -1, dtype=np.intp)
+        _tree_walk_kernel(
+            np.zeros((1, 1), dtype=np.float32),
+            np.zeros(1, dtype=np.intp),
+            np.zeros(1, dtype=np.float32),
+            leaf,
+            leaf,
+            np.zeros(1, dtype=np.float64),
+            np.empty(1, dtype=np.float64)
+        )
+    
+    speed = np.zeros(1, dtype=np.float64)
+    _slip_severity_kernel(speed, speed, speed, np.empty(1, dtype=np.int8), np.empty(1, dtype=np.bool_))
+
+
+def load_slip_coast_optimizer(model_path: str, mmap_mode: str = None) -> DecisionTreeRegressor:
     """
     Load pre-trained Slip & Coasting Optimizer from disk
     
     Args:
         model_path: Path to saved model
+        mmap_mode: Passed to joblib.load; "r" memory-maps array data read-only
     
     Returns:
-        Loaded model
+        Loaded model (its tree prediction arrays are built here, not on the first predict)
     """
-    import joblib
-    
-    model = joblib.load(model_path)
+    model = joblib.load(model_path, mmap_mode=mmap_mode)
     print(f"[+] Slip & Coasting Optimizer loaded from {model_path}")
+    _tree_predictor(model)
     return model
 
 
@@ -353,9 +779,6 @@ def calculate_slip_coast_metrics(
     Returns:
         Metrics dictionary
     """
-    from sklearn.metrics import mean_absolute_error, recall_score
-    import numpy as np
-    
     mae_coast = mean_absolute_error(y_true_coast, y_pred_coast)
     
     metrics = {
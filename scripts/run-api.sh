@@ -0,0 +1,31 @@
+#!/usr/bin/env sh
+# Start the kerangka_ml FastAPI bridge with one uvicorn worker process per core.
+#
+# Tuning knobs (environment):
+#   API_HOST           bind address                   (default 0.0.0.0)
+#   API_PORT           bind port                      (default 8000)
+#   API_WORKERS        uvicorn worker processes       (default: nproc)
+#   API_INFER_THREADS  inference threads per worker   (default: cores / workers, min 1)
+#   API_LOOP           uvicorn event loop             (default uvloop)
+#   API_HTTP           uvicorn HTTP parser            (default httptools)
+set -eu
+
+cd "$(dirname "$0")/.."
+
+CORES="$(nproc 2>/dev/null || echo 1)"
+WORKERS="${API_WORKERS:-$CORES}"
+
+# sklearn predict holds the GIL, so scale with processes and keep per-worker
+# thread pools small enough not to oversubscribe the cores
+if [ -z "${API_INFER_THREADS:-}" ]; then
+  API_INFER_THREADS=$(( CORES / WORKERS ))
+  [ "$API_INFER_THREADS" -lt 1 ] && API_INFER_THREADS=1
+fi
+export API_INFER_THREADS
+
+exec uvicorn api_server:app \
+  --host "${API_HOST:-0.0.0.0}" \
+  --port "${API_PORT:-8000}" \
+  --workers "$WORKERS" \
+  --loop "${API_LOOP:-uvloop}" \
+  --http "${API_HTTP:-httptools}"
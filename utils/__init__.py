@@ -5,6 +5,7 @@ from kerangka_ml.utils.data_validators import (
     normalize_features,
     fill_missing_features,
     aggregate_telemetry,
+    aggregate_telemetry_array,
     create_feature_dict
 )
 
@@ -13,5 +14,6 @@ __all__ = [
     "normalize_features",
     "fill_missing_features",
     "aggregate_telemetry",
+    "aggregate_telemetry_array",
     "create_feature_dict"
 ]
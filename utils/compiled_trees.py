@@ -0,0 +1,274 @@
+"""
+Compiled Tree Helpers - Optional Treelite/TL2cgen and ONNX Runtime acceleration
+Neither backend is a hard dependency: when one is missing, its export/attach report
+failure and models keep predicting through their own XGBoost/LightGBM/sklearn wrappers.
+"""
+
+import os
+import weakref
+from typing import Any, Optional
+
+import numpy as np
+
+try:
+    import treelite
+    import tl2cgen
+    TREELITE_AVAILABLE = True
+except ImportError:
+    treelite = None
+    tl2cgen = None
+    TREELITE_AVAILABLE = False
+
+try:
+    import onnxmltools
+    import onnxruntime as ort
+    from onnxmltools.convert.common.data_types import FloatTensorType
+    ONNX_AVAILABLE = True
+except ImportError:
+    onnxmltools = None
+    ort = None
+    FloatTensorType = None
+    ONNX_AVAILABLE = False
+
+try:
+    # Converter for sklearn models, used by export_onnx only
+    import skl2onnx
+    from skl2onnx.common.data_types import FloatTensorType as SklFloatTensorType
+except ImportError:
+    skl2onnx = None
+    SklFloatTensorType = None
+
+
+# Model object -> predict function (2-D features -> 1-D predictions, or 2-D class
+# probabilities for classifiers); entries vanish with the model
+_COMPILED = weakref.WeakKeyDictionary()
+
+
+def export_compiled(
+    model: Any,
+    libpath: str,
+    quantize: bool = False,
+    X_val: Any = None,
+    y_val: Any = None,
+    max_mae_delta: float = 0.1,
+    max_label_mismatch: float = 0.01
+) -> Optional[str]:
+    """
+    Compile a trained XGBoost, LightGBM or scikit-learn forest model to a shared library
+
+    Args:
+        model: Trained XGBRegressor, LGBMRegressor or sklearn forest (e.g.
+               RandomForestClassifier, whose library outputs predict_proba)
+        libpath: Output path of the shared library (e.g. "energy.so")
+        quantize: Compare features against integer-indexed split thresholds instead of
+                  floats (smaller node footprint)
+        X_val: Optional validation features for a quantized library
+        y_val: Validation targets matching X_val (regressors only)
+        max_mae_delta: Largest MAE increase over the model (target units, e.g. % SOC)
+                       a quantized regressor library may have; otherwise it is deleted
+        max_label_mismatch: Largest fraction of X_val rows on which a quantized classifier
+                            library picks a different class than the model's predict_proba;
+                            otherwise it is deleted
+
+    Returns:
+        libpath on success, None if Treelite is unavailable, the model type is unsupported
+        or the quantized library failed validation
+    """
+    if not TREELITE_AVAILABLE:
+        print("[!] Treelite/tl2cgen not installed, skipping compiled export")
+        return None
+
+    if hasattr(model, "get_booster"):
+        tl_model = treelite.frontend.from_xgboost(model.get_booster())
+    elif hasattr(model, "booster_") or hasattr(model, "feature_importance"):
+        # LightGBM wrapper, or a natively loaded lightgbm.Booster
+        tl_model = treelite.frontend.from_lightgbm(getattr(model, "booster_", model))
+    elif hasattr(model, "estimators_"):
+        tl_model = treelite.sklearn.import_model(model)
+    else:
+        print(f"[!] Cannot compile model of type {type(model).__name__}")
+        return None
+
+    params = {"parallel_comp": 4}
+    if quantize:
+        params["quantize"] = 1
+    tl2cgen.export_lib(tl_model, toolchain="gcc", libpath=libpath, params=params)
+
+    if quantize and X_val is not None:
+        X_array = np.asarray(X_val, dtype=np.float64)
+        compiled = _per_row(tl2cgen.Predictor(libpath, nthread=1).predict(tl2cgen.DMatrix(X_array)), len(X_array))
+        if hasattr(model, "classes_"):
+            # Classifier libraries output class probabilities: an MAE against labels
+            # means nothing, so check that the same class wins on each row
+            expected = model.predict_proba(X_val).argmax(axis=1)
+            chosen = compiled.argmax(axis=1) if compiled.ndim == 2 else (compiled > 0.5).astype(np.intp)
+            mismatch = float(np.mean(chosen != expected))
+            if mismatch > max_label_mismatch:
+                print(f"[!] Quantized library picks a different class on {mismatch:.2%} of rows, discarding {libpath}")
+                os.remove(libpath)
+                return None
+            print(f"[+] Quantized library label mismatch: {mismatch:.2%}")
+        else:
+            y_array = np.asarray(y_val, dtype=np.float64)
+            mae_delta = np.mean(np.abs(y_array - compiled)) - np.mean(np.abs(y_array - model.predict(X_val)))
+            if mae_delta > max_mae_delta:
+                print(f"[!] Quantized library MAE is {mae_delta:.4f} above the model, discarding {libpath}")
+                os.remove(libpath)
+                return None
+            print(f"[+] Quantized library MAE delta: {mae_delta:+.4f}")
+
+    print(f"[+] Compiled model library saved to {libpath}")
+    return libpath
+
+
+def attach_compiled(model: Any, libpath: str) -> bool:
+    """
+    Load a library from export_compiled and use it for this model's predictions
+
+    Args:
+        model: The model object the library was compiled from
+        libpath: Path to the shared library
+
+    Returns:
+        True if attached, False if Treelite is unavailable or loading failed
+    """
+    if not TREELITE_AVAILABLE:
+        return False
+
+    try:
+        # Single-row latency path: no thread pool inside the predictor
+        predictor = tl2cgen.Predictor(libpath, nthread=1)
+    except Exception as e:
+        print(f"[!] Failed to load compiled model {libpath}: {e}")
+        return False
+
+    _COMPILED[model] = lambda X: _per_row(predictor.predict(tl2cgen.DMatrix(X)), X.shape[0])
+    print(f"[+] Compiled predictor attached from {libpath}")
+    return True
+
+
+def export_onnx(model: Any, out_path: str) -> Optional[str]:
+    """
+    Convert a trained XGBoost, LightGBM or scikit-learn forest model to an ONNX graph
+
+    Args:
+        model: Trained XGBRegressor, LGBMRegressor or sklearn forest
+        out_path: Output path of the .onnx file
+
+    Returns:
+        out_path on success, None if onnxmltools is unavailable or the model type is unsupported
+    """
+    if not ONNX_AVAILABLE:
+        print("[!] onnxmltools/onnxruntime not installed, skipping ONNX export")
+        return None
+
+    n_features = model.num_feature() if hasattr(model, "num_feature") else model.n_features_in_
+    initial_types = [("input", FloatTensorType([None, n_features]))]
+    if hasattr(model, "get_booster"):
+        # The XGBoost converter only understands f0..fN feature names
+        booster = model.get_booster().copy()
+        booster.feature_names = None
+        onnx_model = onnxmltools.convert_xgboost(booster, initial_types=initial_types)
+    elif hasattr(model, "booster_") or hasattr(model, "feature_importance"):
+        onnx_model = onnxmltools.convert_lightgbm(model, initial_types=initial_types)
+    elif hasattr(model, "estimators_"):
+        if skl2onnx is None:
+            print("[!] skl2onnx not installed, skipping ONNX export")
+            return None
+        # Classifiers output a plain probability tensor instead of a list of dicts
+        options = {id(model): {"zipmap": False}} if hasattr(model, "classes_") else None
+        onnx_model = skl2onnx.convert_sklearn(
+            model,
+            initial_types=[("input", SklFloatTensorType([None, n_features]))],
+            options=options
+        )
+    else:
+        print(f"[!] Cannot convert model of type {type(model).__name__} to ONNX")
+        return None
+
+    onnxmltools.utils.save_model(onnx_model, out_path)
+    print(f"[+] ONNX model saved to {out_path}")
+    return out_path
+
+
+def attach_onnx(model: Any, onnx_path: str, intra_op_num_threads: int = 1) -> bool:
+    """
+    Load an ONNX graph from export_onnx and use it for this model's predictions
+
+    Args:
+        model: The model object the graph was converted from
+        onnx_path: Path to the .onnx file
+        intra_op_num_threads: 1 for single-row latency, more for large batches
+
+    Returns:
+        True if attached, False if ONNX Runtime is unavailable or loading failed
+    """
+    if not ONNX_AVAILABLE:
+        return False
+
+    try:
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_num_threads
+        session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+    except Exception as e:
+        print(f"[!] Failed to load ONNX model {onnx_path}: {e}")
+        return False
+
+    # Regressors have one output; classifiers output (label, probabilities)
+    input_name = session.get_inputs()[0].name
+    output_name = session.get_outputs()[-1].name
+    _COMPILED[model] = lambda X: _per_row(
+        session.run([output_name], {input_name: np.asarray(X, dtype=np.float32)})[0], X.shape[0]
+    )
+    print(f"[+] ONNX Runtime session attached from {onnx_path}")
+    return True
+
+
+def compiled_predict(model: Any, X: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Predict with the attached compiled library or ONNX session
+
+    Args:
+        model: Model passed to attach_compiled
+        X: Features; a DataFrame must have exactly the training columns in order
+
+    Returns:
+        1-D predictions (2-D class probabilities for classifiers), or None when no
+        library is attached or the columns do not match (the caller then uses the
+        model, which also validates the input)
+    """
+    predict = _COMPILED.get(model)
+    if predict is None:
+        return None
+
+    if hasattr(X, "columns"):
+        feature_names = getattr(model, "feature_names_in_", None)
+        if feature_names is None and hasattr(model, "feature_name"):
+            feature_names = model.feature_name()  # Natively loaded lightgbm.Booster
+        if feature_names is None or list(X.columns) != list(feature_names):
+            return None
+        X = X.to_numpy(dtype=np.float64)
+
+    return predict(X)
+
+
+def _per_row(output: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    Reshape backend output to one row per sample
+
+    Args:
+        output: Raw Treelite/ONNX output
+        n_rows: Number of input rows
+
+    Returns:
+        1-D array for single-output models, (n_rows, n_classes) otherwise
+    """
+    output = output.reshape(n_rows, -1)
+    return output[:, 0] if output.shape[1] == 1 else output
+
+
+__all__ = [
+    "export_compiled", "attach_compiled", "export_onnx", "attach_onnx",
+    "compiled_predict", "TREELITE_AVAILABLE", "ONNX_AVAILABLE"
+]
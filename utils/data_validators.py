@@ -4,7 +4,12 @@ Utility Functions - Data Validation, Aggregation, Helpers
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional, Sequence
+
+
+# Largest window calculate_rolling_stats computes from shifted slices (one vector
+# pass per window position); pandas' O(n) rolling kernels are faster beyond it
+ROLLING_SLICE_MAX_WINDOW = 16
 
 
 def validate_telemetry(telemetry: pd.DataFrame) -> bool:
@@ -54,20 +59,35 @@ def normalize_features(
     Returns:
         Tuple of (normalized_X, means, stds)
     """
-    import pandas as pd
-    import numpy as np
-    
     if mean_dict is None:
         mean_dict = X.mean().to_dict()
     if std_dict is None:
         std_dict = X.std().to_dict()
     
+    # Columns with both statistics and a positive std are scaled, the rest are kept as is
+    scaled = np.array([
+        col in mean_dict and col in std_dict and std_dict[col] > 0
+        for col in X.columns
+    ], dtype=bool)
+    means = np.array([mean_dict[col] if keep else 0.0 for col, keep in zip(X.columns, scaled)], dtype=np.float64)
+    stds = np.array([std_dict[col] if keep else 1.0 for col, keep in zip(X.columns, scaled)], dtype=np.float64)
+    
+    # All float64/integer/bool columns, all scaled: one broadcast over the 2-D array
+    # (the per-column arithmetic would produce the same float64 columns)
+    if (scaled.all() and X.columns.is_unique
+            and all(dtype == np.float64 or dtype.kind in "iub" for dtype in X.dtypes)):
+        X_norm = pd.DataFrame(
+            (X.to_numpy(dtype=np.float64) - means) / stds,
+            index=X.index,
+            columns=X.columns,
+            copy=False
+        )
+        return X_norm, mean_dict, std_dict
+    
     X_norm = X.copy()
     
-    for col in X_norm.columns:
-        if col in mean_dict and col in std_dict:
-            if std_dict[col] > 0:
-                X_norm[col] = (X_norm[col] - mean_dict[col]) / std_dict[col]
+    for j in np.flatnonzero(scaled):
+        X_norm.isetitem(j, (X_norm.iloc[:, j] - means[j]) / stds[j])
     
     return X_norm, mean_dict, std_dict
 
@@ -84,20 +104,21 @@ def fill_missing_features(
         fill_value: "mean", "median", "ffill", or numeric value
     
     Returns:
-        DataFrame with filled values
+        DataFrame with filled values (X itself when it has no missing values)
     """
-    import pandas as pd
-    
-    X_filled = X.copy()
+    # Nothing to fill: skip the copy every branch below would make
+    if not X.isna().to_numpy().any():
+        return X
     
+    # fillna returns a new frame, so X is never modified
     if fill_value == "mean":
-        X_filled = X_filled.fillna(X_filled.mean())
+        X_filled = X.fillna(X.mean(numeric_only=True))
     elif fill_value == "median":
-        X_filled = X_filled.fillna(X_filled.median())
+        X_filled = X.fillna(X.median(numeric_only=True))
     elif fill_value == "ffill":
-        X_filled = X_filled.fillna(method="ffill").fillna(method="bfill")
+        X_filled = X.ffill().bfill()
     else:
-        X_filled = X_filled.fillna(fill_value)
+        X_filled = X.fillna(fill_value)
     
     return X_filled
 
@@ -116,26 +137,93 @@ def aggregate_telemetry(
     Returns:
         Aggregated features dictionary
     """
-    import pandas as pd
-    import numpy as np
+    values = telemetry_samples.drop(columns="timestamp", errors="ignore")
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in values.dtypes):
+        return _aggregate_columns(values)
+    
+    return aggregate_telemetry_array(values.to_numpy(dtype=np.float64, na_value=np.nan), values.columns)
+
+
+def aggregate_telemetry_array(
+    arr: np.ndarray,
+    names: Sequence[str]
+) -> Dict[str, float]:
+    """
+    aggregate_telemetry for samples already in a 2-D numeric array
+    
+    Args:
+        arr: Telemetry samples (n_samples, n_columns), without timestamps; NaN = missing
+        names: Column names, in arr's column order
+    
+    Returns:
+        Aggregated features dictionary (same keys and values as aggregate_telemetry)
+    """
+    # Every statistic is one reduction over the same 2-D array, one contiguous row
+    # per column (a DataFrame's float64 block already is, so this copies nothing)
+    data = np.ascontiguousarray(np.asarray(arr, dtype=np.float64).T)
+    n_rows = data.shape[1]
+    if n_rows == 0:
+        return {}
+    
+    counts = np.full(len(data), n_rows)
+    means = data.mean(axis=1)
+    stds = data.std(axis=1, ddof=1) if n_rows > 1 else np.full(len(data), np.nan)
+    mins = data.min(axis=1)
+    maxs = data.max(axis=1)
+    lasts = data[:, -1].copy()
+    
+    # Columns with NaNs are redone from their non-NaN values (the per-column
+    # dropna); all-NaN columns are left out
+    valid = ~np.isnan(data)
+    for j in np.flatnonzero(~valid.all(axis=1)):
+        column = data[j][valid[j]]
+        counts[j] = len(column)
+        if len(column):
+            means[j] = column.mean()
+            stds[j] = column.std(ddof=1) if len(column) > 1 else np.nan
+            mins[j] = column.min()
+            maxs[j] = column.max()
+            lasts[j] = column[-1]
     
     aggregates = {}
     
-    for col in telemetry_samples.columns:
-        if col == "timestamp":
+    for j, col in enumerate(names):
+        if counts[j] == 0:
             continue
         
-        values = telemetry_samples[col].dropna()
+        aggregates[f"{col}_mean"] = float(means[j])
+        aggregates[f"{col}_std"] = float(stds[j])
+        aggregates[f"{col}_min"] = float(mins[j])
+        aggregates[f"{col}_max"] = float(maxs[j])
+        aggregates[f"{col}_last"] = float(lasts[j])
+    
+    return aggregates
+
+
+def _aggregate_columns(values: pd.DataFrame) -> Dict[str, float]:
+    """
+    aggregate_telemetry one column at a time, for frames with non-numeric columns
+    
+    Args:
+        values: Telemetry samples without the timestamp column
+    
+    Returns:
+        Aggregated features dictionary
+    """
+    aggregates = {}
+    
+    for col in values.columns:
+        column = values[col].dropna()
         
-        if len(values) == 0:
+        if len(column) == 0:
             continue
         
         # Multiple aggregations
-        aggregates[f"{col}_mean"] = float(values.mean())
-        aggregates[f"{col}_std"] = float(values.std())
-        aggregates[f"{col}_min"] = float(values.min())
-        aggregates[f"{col}_max"] = float(values.max())
-        aggregates[f"{col}_last"] = float(values.iloc[-1])
+        aggregates[f"{col}_mean"] = float(column.mean())
+        aggregates[f"{col}_std"] = float(column.std())
+        aggregates[f"{col}_min"] = float(column.min())
+        aggregates[f"{col}_max"] = float(column.max())
+        aggregates[f"{col}_last"] = float(column.iloc[-1])
     
     return aggregates
 
@@ -148,8 +236,6 @@ def create_feature_dict(
     
     Usage: create_feature_dict(soc_current=85, speed_avg=35, motor_temp=45)
     """
-    import pandas as pd
-    
     return pd.DataFrame([kwargs])
 
 
@@ -165,14 +251,23 @@ def flatten_nested_dict(d: Dict[str, Any], parent_key: str = '', sep: str = '_')
     Returns:
         Flattened dictionary
     """
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_nested_dict(v, new_key, sep=sep).items())
+    flat = {}
+    
+    # Depth-first over a stack of (key prefix, items iterator), so nested dicts are
+    # walked in place (no intermediate dict per level) and keys keep their order
+    stack = [(parent_key, iter(d.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            new_key = f"{prefix}{sep}{k}" if prefix else k
+            if isinstance(v, dict):
+                stack.append((new_key, iter(v.items())))
+                break
+            flat[new_key] = v
         else:
-            items.append((new_key, v))
-    return dict(items)
+            stack.pop()
+    
+    return flat
 
 
 def calculate_rolling_stats(
@@ -189,16 +284,63 @@ def calculate_rolling_stats(
     Returns:
         Dictionary with rolling_mean, rolling_std, rolling_min, rolling_max
     """
-    import numpy as np
-    import pandas as pd
-    
-    s = pd.Series(data)
+    if not 1 <= window <= ROLLING_SLICE_MAX_WINDOW:
+        s = pd.Series(data)
+        
+        return {
+            "rolling_mean": s.rolling(window).mean().values,
+            "rolling_std": s.rolling(window).std().values,
+            "rolling_min": s.rolling(window).min().values,
+            "rolling_max": s.rolling(window).max().values
+        }
+    
+    values = np.asarray(data, dtype=np.float64)
+    infinite = np.isinf(values)
+    if infinite.any():
+        # pandas' rolling treats ±inf as missing, so those windows come out NaN
+        values = np.where(infinite, np.nan, values)
+    n_windows = len(values) - window + 1
+    
+    # Windows ending at each sample from the same NaN-padded outputs pandas gives:
+    # the first window - 1 samples (and all of them if the data is shorter) are NaN
+    rolling_mean = np.full(len(values), np.nan)
+    rolling_std = np.full(len(values), np.nan)
+    rolling_min = np.full(len(values), np.nan)
+    rolling_max = np.full(len(values), np.nan)
+    
+    if n_windows > 0:
+        # Window stats accumulated over the window's sample offsets: each step is
+        # one pass over a contiguous slice, and a NaN in a window propagates to all
+        # four stats like pandas' min_periods=window
+        total = values[:n_windows].copy()
+        low = total.copy()
+        high = total.copy()
+        for k in range(1, window):
+            shifted = values[k:k + n_windows]
+            total += shifted
+            np.minimum(low, shifted, out=low)
+            np.maximum(high, shifted, out=high)
+        
+        # Constant windows get exactly their value and a zero std, as in pandas
+        constant = low == high
+        mean = np.where(constant, low, total / window)
+        
+        if window > 1:
+            squares = np.zeros(n_windows)
+            for k in range(window):
+                deviation = values[k:k + n_windows] - mean
+                squares += deviation * deviation
+            rolling_std[window - 1:] = np.where(constant, 0.0, np.sqrt(squares / (window - 1)))
+        
+        rolling_mean[window - 1:] = mean
+        rolling_min[window - 1:] = low
+        rolling_max[window - 1:] = high
     
     return {
-        "rolling_mean": s.rolling(window).mean().values,
-        "rolling_std": s.rolling(window).std().values,
-        "rolling_min": s.rolling(window).min().values,
-        "rolling_max": s.rolling(window).max().values
+        "rolling_mean": rolling_mean,
+        "rolling_std": rolling_std,
+        "rolling_min": rolling_min,
+        "rolling_max": rolling_max
     }
 
 
@@ -216,10 +358,18 @@ def clip_outliers(
     Returns:
         Clipped array
     """
-    import numpy as np
-    
     mean = np.mean(data)
-    std = np.std(data)
+    if isinstance(data, np.ndarray) and data.size:
+        # np.std without recomputing the mean: same reductions, one pass fewer
+        deviations = data - mean
+        deviations *= deviations
+        std = np.sqrt(deviations.sum() / data.size)
+        
+        # The deviations buffer is free now; clip into it instead of a new array
+        if deviations.dtype == data.dtype:
+            return np.clip(data, mean - n_std * std, mean + n_std * std, out=deviations)
+    else:
+        std = np.std(data)  # Series etc. dispatch to their own (NaN-skipping) std
     
     lower = mean - n_std * std
     upper = mean + n_std * std
@@ -243,12 +393,29 @@ def interpolate_missing_time_series(
     Returns:
         DataFrame with interpolated values
     """
-    import pandas as pd
-    
-    df_sorted = df.sort_values(timestamp_col)
+    # Telemetry usually arrives in time order; only sort (a full copy) when it does not
+    if not df[timestamp_col].is_monotonic_increasing:
+        df = df.sort_values(timestamp_col)
     
     # Set index to timestamp for interpolation
-    df_interp = df_sorted.set_index(timestamp_col)
-    df_interp = df_interp.interpolate(method=method)
+    df_interp = df.set_index(timestamp_col)
+    if method != "linear" or not all(dtype == np.float64 or dtype.kind in "iu" for dtype in df_interp.dtypes):
+        return df_interp.interpolate(method=method).reset_index()
+    
+    # pandas' "linear" is np.interp over row positions for each column, NaNs before
+    # the first valid value kept; do that directly and replace only the filled columns
+    result = df_interp.reset_index()
+    for j in range(df_interp.shape[1]):
+        values = df_interp.iloc[:, j].to_numpy()
+        if values.dtype != np.float64:
+            continue
+        missing = np.isnan(values)
+        valid_positions = np.flatnonzero(~missing)
+        if not len(valid_positions) or len(valid_positions) == len(values):
+            continue
+        fill_positions = np.flatnonzero(missing[valid_positions[0]:]) + valid_positions[0]
+        filled = values.copy()
+        filled[fill_positions] = np.interp(fill_positions, valid_positions, values[valid_positions])
+        result.isetitem(j + 1, filled)
     
-    return df_interp.reset_index()
+    return result